@@ -0,0 +1,272 @@
+"""
+Benchmark etapów potoku newslettera
+Odtwarza nagrane kanały RSS (BBC, Gazeta Wyborcza, Bankier.pl) oraz odpowiedzi
+Stooq i NBP z lokalnego serwera zastępczego i mierzy każdy etap w kilku skalach
+(liczba wpisów kanału / wierszy notowań / wiadomości w wydaniu):
+
+    fetch     - pobranie kanałów przez współdzieloną sesję HTTP (+ API NBP)
+    parse     - strumieniowy parser RSS (iter_feed_stream)
+    strip     - strip_html_tags dla tytułów i opisów
+    stooq     - fetch_stooq_history (pobranie CSV, parsowanie, zapis, zmiany)
+    rank      - ranking sekcji i wybór najlepszych (rank_news) spośród wszystkich wiadomości
+    summarize - streszczenia TF-IDF (summarize_texts) opisów wszystkich wiadomości
+    render    - generate_newsletter_html
+    mime      - kodowanie MIME i wysyłka do lokalnego serwera SMTP
+
+Wyniki trafiają do benchmarks/results/<commit>.json i są porównywane
+z poprzednim zapisanym wynikiem (lub wskazanym przez --compare). Czasy zależą
+od maszyny, więc pliki wyników nie są przechowywane w repozytorium.
+
+Uruchomienie:
+    python benchmarks/bench_pipeline.py [--scales 10,1000,100000] [--repeat 3] [--compare REF] [--no-save]
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import smtplib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Konfiguracja musi być ustawiona przed importem modułów projektu
+WORK_DIR = tempfile.mkdtemp(prefix='newsletter-bench-')
+os.environ.update(
+    CACHE_DIR=WORK_DIR,
+    SEEN_INDEX_ENABLED='false',
+    HTTP_MAX_RETRIES='0',
+    METRICS_REPORT_FILE='',
+)
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+
+import fixtures  # noqa: E402
+import stand_in  # noqa: E402
+from smtp_sink import SmtpSink  # noqa: E402
+from http_client import get_session, http_get  # noqa: E402
+from html_template import generate_newsletter_html  # noqa: E402
+from mime_stream import iter_html_message, send_streamed_message  # noqa: E402
+from scrapers.feed_stream import CHUNK_SIZE, iter_feed_stream  # noqa: E402
+from scrapers.financial_news import fetch_stooq_history, get_gold_price_nbp  # noqa: E402
+from scrapers.rss_pipeline import load_registry  # noqa: E402
+from scrapers.text_cleaning import strip_html_tags  # noqa: E402
+from ranking import rank_news  # noqa: E402
+from summarizer import summarize_news, summarize_texts  # noqa: E402
+
+
+DEFAULT_SCALES = (10, 1000, 100000)
+
+FINANCIAL_DATA = {
+    'gold': {
+        'symbol': 'XAU/PLN', 'name': 'Złoto', 'price': 16425.5, 'currency': 'PLN', 'unit': 'uncja',
+        'daily_change': 42.1, 'daily_change_percent': 0.26, 'weekly_change': 310.4,
+        'weekly_change_percent': 1.93, 'trend': 'up',
+    },
+    'silver': {
+        'symbol': 'XAG/PLN', 'name': 'Srebro', 'price': 198.3, 'currency': 'PLN', 'unit': 'uncja',
+        'daily_change': -1.2, 'daily_change_percent': -0.6, 'weekly_change': 4.4,
+        'weekly_change_percent': 2.27, 'trend': 'down',
+    },
+}
+
+
+def chunked(data: bytes, size: int = CHUNK_SIZE):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def measure(func: Callable[[], int], repeat: int) -> Dict[str, float]:
+    """Wywołuje func `repeat` razy; func zwraca liczbę przetworzonych bajtów."""
+    times = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = func()
+        times.append(time.perf_counter() - started)
+    return {'best': min(times), 'median': statistics.median(times), 'bytes': size}
+
+
+def run_scale(scale: int, repeat: int, server: stand_in.StandInServer, sink: SmtpSink) -> Dict[str, Dict]:
+    """Mierzy wszystkie etapy dla jednej skali."""
+    server.scale = scale
+    feed_urls = [feed['url'] for section in load_registry()['sections'].values() for feed in section['feeds']]
+    documents = [fixtures.scaled_feed(name, scale) for name in fixtures.FEEDS]
+    entries = [entry for document in documents for entry in iter_feed_stream(chunked(document))]
+    news = fixtures.news_items(scale)
+    results = {}
+
+    def fetch() -> int:
+        size = sum(len(http_get(url).content) for url in feed_urls)
+        if get_gold_price_nbp() is None:
+            raise RuntimeError("Brak odpowiedzi NBP z serwera zastępczego")
+        return size
+    results['fetch'] = measure(fetch, repeat)
+
+    def parse() -> int:
+        for document in documents:
+            for _ in iter_feed_stream(chunked(document)):
+                pass
+        return sum(len(document) for document in documents)
+    results['parse'] = measure(parse, repeat)
+
+    def strip() -> int:
+        size = 0
+        for entry in entries:
+            size += len(strip_html_tags(entry.get('title', '')))
+            size += len(strip_html_tags(entry.get('summary', entry.get('description', ''))))
+        return size
+    results['strip'] = measure(strip, repeat)
+
+    def stooq() -> int:
+        shutil.rmtree(os.path.join(WORK_DIR, 'prices'), ignore_errors=True)
+        if fetch_stooq_history('xaupln') is None:
+            raise RuntimeError("Brak notowań Stooq z serwera zastępczego")
+        return len(fixtures.scaled_stooq_csv(scale))
+    results['stooq'] = measure(stooq, repeat)
+
+    sections = load_registry()['sections']
+
+    def rank() -> int:
+        rank_news(news, sections)
+        return sum(len(item['title'].encode('utf-8')) for items in news.values() for item in items)
+    results['rank'] = measure(rank, repeat)
+
+    summaries = [item['summary'] for items in news.values() for item in items]
+
+    def summarize() -> int:
+        summarize_texts(summaries)
+        return sum(len(summary.encode('utf-8')) for summary in summaries)
+    results['summarize'] = measure(summarize, repeat)
+
+    # Jak w potoku: renderowane i wysyłane są już streszczenia
+    summarize_news(news)
+    html = generate_newsletter_html(financial_data=FINANCIAL_DATA, **news)
+
+    results['render'] = measure(
+        lambda: len(generate_newsletter_html(financial_data=FINANCIAL_DATA, **news)), repeat
+    )
+
+    host, port = sink.server_address[:2]
+    with smtplib.SMTP(host, port) as server_connection:
+        def mime() -> int:
+            before = sink.bytes
+            message = iter_html_message("[NEWS] Benchmark", 'nadawca@example.com', 'odbiorca@example.com', html)
+            send_streamed_message(server_connection, 'nadawca@example.com', ['odbiorca@example.com'], message)
+            return sink.bytes - before
+        results['mime'] = measure(mime, repeat)
+
+    for stage in results.values():
+        stage['per_item_us'] = stage['best'] / scale * 1e6
+    return results
+
+
+def current_commit() -> str:
+    """Zwraca skrót bieżącego commita (z dopiskiem -dirty przy niezapisanych zmianach)."""
+    def git(*args) -> str:
+        return subprocess.run(['git', *args], cwd=BENCH_DIR, capture_output=True, text=True).stdout.strip()
+    commit = git('rev-parse', '--short', 'HEAD') or 'nieznany'
+    if git('status', '--porcelain', '--untracked-files=no'):
+        commit += '-dirty'
+    return commit
+
+
+def find_baseline(reference: Optional[str], exclude: str) -> Optional[str]:
+    """Zwraca plik wyników do porównania: wskazany (commit lub ścieżka) albo najnowszy inny."""
+    if reference:
+        if os.path.exists(reference):
+            return reference
+        matches = sorted(glob.glob(os.path.join(RESULTS_DIR, f"{reference}*.json")))
+        return matches[-1] if matches else None
+    candidates = [
+        path for path in glob.glob(os.path.join(RESULTS_DIR, '*.json'))
+        if os.path.basename(path) != f"{exclude}.json"
+    ]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def print_results(report: Dict, baseline: Optional[Dict], threshold: float) -> List[str]:
+    """Wypisuje tabelę wyników i zwraca listę regresji względem wyniku bazowego."""
+    regressions = []
+    print(f"\n{'skala':>8} {'etap':<9} {'najlepszy':>11} {'mediana':>11} {'µs/element':>11} {'MB':>8}  porównanie")
+    for scale, stages in report['scales'].items():
+        for stage, result in stages.items():
+            line = (
+                f"{scale:>8} {stage:<9} {result['best'] * 1000:>9.2f}ms {result['median'] * 1000:>9.2f}ms "
+                f"{result['per_item_us']:>11.2f} {result['bytes'] / 1e6:>8.2f}"
+            )
+            previous = (baseline or {}).get('scales', {}).get(scale, {}).get(stage)
+            if previous:
+                ratio = result['best'] / previous['best'] if previous['best'] else 1.0
+                line += f"  {ratio:5.2f}x"
+                if ratio > 1 + threshold:
+                    line += "  [REGRESJA]"
+                    regressions.append(f"{scale}/{stage}: {ratio:.2f}x")
+            print(line)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark etapów potoku newslettera')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='Skale oddzielone przecinkami (wpisy kanału / wiersze notowań / wiadomości)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--compare', help='Commit lub plik wyników do porównania (domyślnie poprzedni wynik)')
+    parser.add_argument('--threshold', type=float, default=0.15, help='Próg regresji (0.15 = 15%% wolniej)')
+    parser.add_argument('--no-save', action='store_true', help='Nie zapisuj wyników')
+    args = parser.parse_args()
+    scales = [int(scale) for scale in args.scales.split(',')]
+
+    server = stand_in.StandInServer().start()
+    sink = SmtpSink().start()
+    stand_in.install(get_session(), server)
+
+    commit = current_commit()
+    report = {
+        'commit': commit,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': args.repeat,
+        'scales': {},
+    }
+    try:
+        for scale in scales:
+            print(f"[BENCHMARK] Skala {scale}...")
+            report['scales'][str(scale)] = run_scale(scale, args.repeat, server, sink)
+    finally:
+        server.stop()
+        sink.stop()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    baseline_path = find_baseline(args.compare, commit)
+    baseline = None
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"[BENCHMARK] Porównanie z {baseline.get('commit')} ({baseline.get('date')})")
+    regressions = print_results(report, baseline, args.threshold)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{commit}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[OK] Zapisano wyniki: {os.path.relpath(path)}")
+
+    if regressions:
+        print(f"[OSTRZEŻENIE] Regresje powyżej {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Raport czasu startu (zimnego importu)
+Uruchamia w osobnym procesie `python -X importtime` dla punktów wejścia
+(src/main.py i newsletter_app.py) i podsumowuje, które pakiety najbardziej
+wydłużają start: łączny czas importu oraz najdroższe pakiety (czas
+skumulowany, razem z zależnościami). Ciężkie zależności opcjonalne
+(yfinance, feedparser w src/) są importowane dopiero w ścieżkach, które ich używają.
+
+Uruchomienie:
+    python benchmarks/bench_startup.py [--top 15] [--repeat 3] [--max-ms 500]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+# Nazwa -> (moduł do zaimportowania, katalog na sys.path)
+ENTRY_POINTS = {
+    'main': ('main', os.path.join(ROOT_DIR, 'src')),
+    'newsletter_app': ('newsletter_app', ROOT_DIR),
+}
+
+# "import time:       578 |     719781 | yfinance" (czasy w mikrosekundach)
+_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def parse_importtime(output: str) -> List[Tuple[int, int, int, str]]:
+    """
+    Parsuje wyjście `-X importtime`.
+
+    Zwraca:
+        Lista (czas własny µs, czas skumulowany µs, zagłębienie, moduł)
+    """
+    rows = []
+    for line in output.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            rows.append((int(match[1]), int(match[2]), len(match[3]) // 2, match[4]))
+    return rows
+
+
+def measure_imports(module: str, path: str) -> List[Tuple[int, int, int, str]]:
+    """Importuje moduł w świeżym interpreterze i zwraca sparsowany raport importów."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=path, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import {module} nie powiódł się:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def summarize(rows: List[Tuple[int, int, int, str]], module: str) -> Tuple[int, Dict[str, int]]:
+    """
+    Zwraca łączny czas importu punktu wejścia i czas skumulowany każdego pakietu,
+    liczony w miejscu, w którym pakiet został zaimportowany po raz pierwszy
+    (czasy pakietów zagnieżdżonych, np. pandas w yfinance, zawierają się w nadrzędnych).
+    """
+    total = 0
+    packages: Dict[str, int] = {}
+    stack: List[str] = []
+    in_entry = False
+    # -X importtime wypisuje moduł po jego zależnościach - odwrócona lista ma rodzica przed dziećmi
+    for _, cumulative, depth, name in reversed(rows):
+        package = name.split('.', 1)[0]
+        del stack[depth:]
+        if depth == 0:
+            in_entry = name == module
+            if in_entry:
+                total = cumulative
+        elif in_entry and package != stack[-1]:
+            packages[package] = packages.get(package, 0) + cumulative
+        stack.append(package)
+    return total, packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Raport czasu startu (python -X importtime)')
+    parser.add_argument('--top', type=int, default=15, help='Liczba najdroższych importów w raporcie')
+    parser.add_argument('--repeat', type=int, default=3, help='Liczba pomiarów (brany jest najlepszy)')
+    parser.add_argument('--max-ms', type=float, help='Zakończ kodem 1, jeśli import punktu wejścia trwa dłużej')
+    parser.add_argument('entry_points', nargs='*', help=f"Punkty wejścia: {', '.join(ENTRY_POINTS)} (domyślnie wszystkie)")
+    args = parser.parse_args()
+    unknown = set(args.entry_points) - set(ENTRY_POINTS)
+    if unknown:
+        parser.error(f"nieznany punkt wejścia: {', '.join(sorted(unknown))}")
+
+    too_slow = []
+    for name in args.entry_points or ENTRY_POINTS:
+        module, path = ENTRY_POINTS[name]
+        best_total, best_modules = None, {}
+        for _ in range(args.repeat):
+            total, modules = summarize(measure_imports(module, path), module)
+            if best_total is None or total < best_total:
+                best_total, best_modules = total, modules
+
+        print(f"\n[START] {name}: import {best_total / 1000:.1f} ms (najlepszy z {args.repeat})")
+        print(f"{'ms':>9}  {'udział':>6}  pakiet")
+        ranked = sorted(best_modules.items(), key=lambda item: item[1], reverse=True)
+        for module_name, cumulative in ranked[:args.top]:
+            share = cumulative / best_total if best_total else 0
+            print(f"{cumulative / 1000:>9.1f}  {share:>6.0%}  {module_name}")
+
+        if args.max_ms is not None and best_total / 1000 > args.max_ms:
+            too_slow.append(f"{name}: {best_total / 1000:.0f} ms")
+
+    if too_slow:
+        print(f"\n[OSTRZEŻENIE] Start wolniejszy niż {args.max_ms:.0f} ms: {', '.join(too_slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
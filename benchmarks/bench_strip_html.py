@@ -0,0 +1,90 @@
+"""
+Mikro-benchmark strip_html_tags
+Porównuje koszt czyszczenia treści z kanałów RSS: poprzednia implementacja
+(wiele re.sub + str.replace) vs sanitizer z prekompilowanymi wzorcami.
+Mierzy koszt na 1 MB opisów HTML oraz na pojedynczy opis i tytuł.
+
+Uruchomienie:
+    python benchmarks/bench_strip_html.py [--size-mb 1] [--repeat 5]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from scrapers.text_cleaning import strip_html_tags  # noqa: E402
+
+
+def legacy_strip_html_tags(text: str) -> str:
+    """Poprzednia implementacja (kopia referencyjna do porównania)."""
+    if not text:
+        return ""
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = text.replace('&nbsp;', ' ')
+    text = text.replace('&amp;', '&')
+    text = text.replace('&lt;', '<')
+    text = text.replace('&gt;', '>')
+    text = text.replace('&quot;', '"')
+    text = text.replace('&#39;', "'")
+    text = text.replace('<![CDATA[', '')
+    text = text.replace(']]>', '')
+    return text.strip()
+
+
+# Typowy opis wpisu z Gazety/Bankiera: zdjęcie, akapit, encje, polskie znaki
+SAMPLE_ENTRY = (
+    '<![CDATA[<a href="https://wyborcza.pl/7,75398,1.html"><img src="https://bi.im-g.pl/im/1/1.jpg" '
+    'alt="Zdjęcie" width="140" height="86"></a><br/>\n'
+    '<p>Rząd przyjął projekt ustawy &bdquo;o&nbsp;cenach energii&rdquo; &ndash; '
+    'poinformował rzecznik. Inflacja w&nbsp;październiku wyniosła 4,9&#37; r/r, '
+    'a kurs EUR/PLN spadł do 4,31 z&#322;. Zmiana &gt; prognoz &amp; oczekiwań.</p>\n\t  '
+    '<p>Więcej informacji w&nbsp;serwisie.</p>]]>\n'
+)
+
+
+# Typowy tytuł - zwykły tekst bez znaczników
+SAMPLE_TITLE = 'Rząd przyjął projekt ustawy o cenach energii. Premier: to dopiero początek'
+
+
+def build_document(size_mb: float) -> str:
+    """Buduje dokument o zadanym rozmiarze z powtórzonych opisów wpisów."""
+    target = int(size_mb * 1024 * 1024)
+    return SAMPLE_ENTRY * (target // len(SAMPLE_ENTRY) + 1)
+
+
+def measure(func, text: str, repeat: int) -> float:
+    """Zwraca najlepszy czas (w sekundach) pojedynczego wywołania."""
+    return min(timeit.repeat(lambda: func(text), number=1, repeat=repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark strip_html_tags')
+    parser.add_argument('--size-mb', type=float, default=1.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    document = build_document(args.size_mb)
+    size_mb = len(document.encode('utf-8')) / (1024 * 1024)
+
+    # Krótkie teksty - tak jak wywołuje to potok RSS (jeden opis lub tytuł na wywołanie)
+    entries = [SAMPLE_ENTRY] * 2000
+    titles = [SAMPLE_TITLE] * 2000
+
+    if legacy_strip_html_tags(SAMPLE_TITLE) != strip_html_tags(SAMPLE_TITLE):
+        raise SystemExit("[BŁĄD] Implementacje dają różne wyniki dla tytułu")
+
+    print(f"[BENCHMARK] strip_html_tags - dokument {size_mb:.2f} MB, najlepszy z {args.repeat}")
+    for label, func in (('poprzednia', legacy_strip_html_tags), ('prekompilowana', strip_html_tags)):
+        per_mb = measure(func, document, args.repeat) / size_mb
+        per_entry = measure(lambda _: [func(e) for e in entries], None, args.repeat) / len(entries)
+        per_title = measure(lambda _: [func(t) for t in titles], None, args.repeat) / len(titles)
+        print(f"  {label:<16} {per_mb * 1000:8.2f} ms/MB   {per_entry * 1e6:7.2f} µs/opis   {per_title * 1e6:6.2f} µs/tytuł")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Nagrane odpowiedzi źródeł do benchmarków
+Wczytuje zapisane kanały RSS (BBC, Gazeta Wyborcza, Bankier.pl), CSV ze Stooq
+i odpowiedź API NBP z katalogu fixtures/ oraz powiela je do zadanej skali
+(liczba wpisów kanału lub wierszy notowań), zachowując ich format.
+"""
+
+import os
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Nazwa nagrania -> plik
+FEEDS = {
+    'bbc': 'bbc_world.xml',
+    'gazeta': 'gazeta_kraj.xml',
+    'bankier': 'bankier.xml',
+}
+STOOQ_FILE = 'stooq_xaupln.csv'
+NBP_FILE = 'nbp_cenyzlota.json'
+
+_ITEM_RE = re.compile(r'[ \t]*<item>.*?</item>\s*', re.S)
+_LINK_RE = re.compile(r'(<link>)([^<]+)(</link>)')
+_GUID_RE = re.compile(r'(<guid[^>]*>)([^<]+)(</guid>)')
+_TITLE_RE = re.compile(r'(<title>(?:<!\[CDATA\[)?)')
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return f.read()
+
+
+@lru_cache(maxsize=None)
+def split_feed(name: str) -> Tuple[str, List[str], str]:
+    """Dzieli nagrany kanał na nagłówek, wpisy i zakończenie dokumentu."""
+    document = read_fixture(FEEDS[name]).decode('utf-8')
+    items = _ITEM_RE.findall(document)
+    head = document[:document.index(items[0])]
+    tail = document[document.rindex(items[-1]) + len(items[-1]):]
+    return head, items, tail
+
+
+@lru_cache(maxsize=16)
+def scaled_feed(name: str, count: int) -> bytes:
+    """
+    Zwraca nagrany kanał z `count` wpisami (kolejne kopie nagranych wpisów
+    z unikalnym linkiem i numerem w tytule, jak w kanale z długą historią).
+    """
+    head, items, tail = split_feed(name)
+    parts = [head]
+    for index in range(count):
+        item = items[index % len(items)]
+        if index >= len(items):
+            suffix = f"-{index}"
+            item = _LINK_RE.sub(lambda m: f"{m[1]}{m[2]}{suffix}{m[3]}", item, count=1)
+            item = _GUID_RE.sub(lambda m: f"{m[1]}{m[2]}{suffix}{m[3]}", item, count=1)
+            item = _TITLE_RE.sub(lambda m: f"{m[1]}[{index}] ", item, count=1)
+        parts.append(item)
+    parts.append(tail)
+    return ''.join(parts).encode('utf-8')
+
+
+@lru_cache(maxsize=16)
+def scaled_stooq_csv(rows: int) -> str:
+    """
+    Zwraca CSV Stooq z `rows` sesjami: nagrane wiersze poprzedzone starszymi
+    sesjami o tych samych cenach (dni robocze wstecz od pierwszej nagranej daty).
+    """
+    lines = read_fixture(STOOQ_FILE).decode('ascii').splitlines()
+    header, recorded = lines[0], lines[1:]
+    first_day = date.fromisoformat(recorded[0].split(',', 1)[0])
+
+    older = []
+    day = first_day
+    for index in range(max(0, rows - len(recorded))):
+        day -= timedelta(days=1)
+        while day.weekday() >= 5:
+            day -= timedelta(days=1)
+        prices = recorded[index % len(recorded)].split(',', 1)[1]
+        older.append(f"{day.isoformat()},{prices}")
+    older.reverse()
+
+    return '\r\n'.join([header] + (older + recorded)[-rows:]) + '\r\n'
+
+
+def nbp_gold_prices() -> bytes:
+    return read_fixture(NBP_FILE)
+
+
+def news_items(count: int) -> Dict[str, List[Dict[str, str]]]:
+    """Zwraca `count` wiadomości rozłożonych na trzy sekcje newslettera."""
+    sections = {'world_news': [], 'polish_news': [], 'bankier_news': []}
+    names = list(sections)
+    for index in range(count):
+        section = names[index % len(names)]
+        sections[section].append({
+            'title': f"Wiadomość {index}: Sejm przyjął ustawę o cenach energii",
+            'link': f"https://wyborcza.pl/7,75398,{31200000 + index}.html",
+            'source': 'Gazeta Wyborcza',
+            'published': 'Fri, 16 Oct 2026 10:52:00 +0200',
+            'summary': (
+                'Posłowie przegłosowali projekt zamrażający ceny prądu dla gospodarstw domowych '
+                'do końca przyszłego roku. Opozycja zapowiada poprawki w Senacie. ' * 2
+            ),
+        })
+    return sections
@@ -0,0 +1,73 @@
+"""
+Lokalny serwer SMTP do benchmarków
+Przyjmuje każdą wiadomość (EHLO, MAIL, RCPT, DATA) i zlicza wiadomości oraz
+bajty, nie zapisując treści. Pozwala zmierzyć budowanie i wysyłkę MIME bez
+zewnętrznego serwera i bez przestarzałego modułu smtpd.
+"""
+
+import socketserver
+import threading
+from typing import Tuple
+
+
+class SinkHandler(socketserver.StreamRequestHandler):
+    """Minimalna obsługa sesji SMTP (bez uwierzytelniania i TLS)."""
+
+    disable_nagle_algorithm = True
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self) -> None:
+        self.reply('220 sink ESMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command == b'EHLO':
+                self.wfile.write(b'250-sink\r\n250-8BITMIME\r\n250 SIZE 0\r\n')
+            elif command == b'HELO':
+                self.reply('250 sink')
+            elif command in (b'MAIL', b'RCPT', b'RSET', b'NOOP'):
+                self.reply('250 OK')
+            elif command == b'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                for data_line in self.rfile:
+                    if data_line == b'.\r\n':
+                        break
+                    size += len(data_line)
+                self.server.record(size)
+                self.reply('250 OK queued')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    """Serwer SMTP zliczający odebrane wiadomości i bajty."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int] = ('127.0.0.1', 0)):
+        super().__init__(address, SinkHandler)
+        self.messages = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def record(self, size: int) -> None:
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
+
+    def start(self) -> 'SmtpSink':
+        threading.Thread(target=self.serve_forever, name='smtp-sink', daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,106 @@
+"""
+Lokalny zastępnik serwerów źródeł
+Serwer HTTP odtwarzający nagrane odpowiedzi BBC, Gazety Wyborczej, Bankier.pl,
+Stooq i NBP w zadanej skali oraz adapter requests, który kieruje żądania
+współdzielonej sesji (http_client) pod prawdziwymi adresami do tego serwera.
+Kod produkcyjny działa bez zmian - zmienia się tylko miejsce, z którego
+przychodzą odpowiedzi.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from requests.adapters import HTTPAdapter
+
+import fixtures
+
+
+# Host źródła -> nagranie kanału
+FEED_HOSTS = {
+    'feeds.bbci.co.uk': 'bbc',
+    'rss.gazeta.pl': 'gazeta',
+    'www.bankier.pl': 'bankier',
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Odpowiada nagraniem wybranym po hoście i ścieżce (/<host>/<ścieżka>)."""
+
+    protocol_version = 'HTTP/1.1'
+    # Nagłówki i treść to osobne zapisy - bez TCP_NODELAY klient czekałby na opóźnione ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path)
+        host, _, path = parts.path.lstrip('/').partition('/')
+        scale = self.server.scale
+
+        if host in FEED_HOSTS:
+            self.reply(fixtures.scaled_feed(FEED_HOSTS[host], scale), 'application/rss+xml; charset=utf-8')
+        elif host == 'stooq.pl' and path.startswith('q/d/l'):
+            symbol = parse_qs(parts.query).get('s', [''])[0]
+            if symbol not in ('xaupln', 'xagpln'):
+                self.reply(b'Brak danych', 'text/plain', status=404)
+            else:
+                self.reply(fixtures.scaled_stooq_csv(scale).encode('ascii'), 'text/csv')
+        elif host == 'api.nbp.pl' and path.startswith('api/cenyzlota'):
+            self.reply(fixtures.nbp_gold_prices(), 'application/json')
+        else:
+            self.reply(b'Not Found', 'text/plain', status=404)
+
+    def reply(self, body: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Serwer zastępczy; `scale` to liczba wpisów kanału i wierszy notowań."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int] = ('127.0.0.1', 0)):
+        super().__init__(address, StandInHandler)
+        self.scale = 10
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StandInServer':
+        self._thread = threading.Thread(target=self.serve_forever, name='stand-in', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class StandInAdapter(HTTPAdapter):
+    """Adapter requests przepisujący adres https://host/ścieżka na <serwer>/host/ścieżka."""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f"{self.base_url}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else '')
+        return super().send(request, **kwargs)
+
+
+def install(session, server: StandInServer) -> None:
+    """Kieruje wszystkie żądania sesji do serwera zastępczego."""
+    adapter = StandInAdapter(server.base_url)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
@@ -1,15 +1,23 @@
 """
 SYSTEM NEWSLETTERA - Wersja Skonsolidowana (PythonAnywhere)
 Data konsolidacji: 2026-01-16
+
+Wersja starsza: wiadomości w kolejności kanałów, bez rankingu, scalania duplikatów
+i streszczeń. Workflow GitHub Actions uruchamia src/main.py.
 """
 
 # Importy bibliotek standardowych
 import os
 import sys
+import json
 import smtplib
 import ssl
 import re
+import html
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial, lru_cache
 from datetime import datetime
 from typing import List, Dict, Optional
 from email.mime.text import MIMEText
@@ -18,7 +26,6 @@ from email.mime.multipart import MIMEMultipart
 # Importy bibliotek zewnętrznych
 import requests
 import feedparser
-import yfinance as yf
 from dotenv import load_dotenv
 
 # -----------------------------------------------------------------------------
@@ -41,17 +48,27 @@ class Config:
     EMAIL_SENDER: str = os.getenv('EMAIL_SENDER', '')
     EMAIL_PASSWORD: str = os.getenv('EMAIL_PASSWORD', '')
     EMAIL_RECIPIENT: str = os.getenv('EMAIL_RECIPIENT', '')
+    # Lista odbiorców wysyłki zbiorczej (oddzieleni przecinkami, domyślnie EMAIL_RECIPIENT)
+    EMAIL_RECIPIENTS: List[str] = [
+        address.strip() for address in os.getenv('EMAIL_RECIPIENTS', EMAIL_RECIPIENT).split(',') if address.strip()
+    ]
+    # Po tylu wiadomościach połączenie SMTP jest otwierane od nowa
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', '100'))
     
     # Strefa czasowa
     TIMEZONE: str = os.getenv('TZ', 'Europe/Warsaw')
     
+    # Limity czasu pobierania (w sekundach)
+    FETCH_SOURCE_TIMEOUT: float = float(os.getenv('FETCH_SOURCE_TIMEOUT', '20'))
+    FETCH_GLOBAL_TIMEOUT: float = float(os.getenv('FETCH_GLOBAL_TIMEOUT', '45'))
+    
     @classmethod
     def validate(cls) -> bool:
         """Waliduje czy cała wymagana konfiguracja jest obecna."""
         required_fields = [
             ('EMAIL_SENDER', cls.EMAIL_SENDER),
             ('EMAIL_PASSWORD', cls.EMAIL_PASSWORD),
-            ('EMAIL_RECIPIENT', cls.EMAIL_RECIPIENT),
+            ('EMAIL_RECIPIENT', cls.EMAIL_RECIPIENT or cls.EMAIL_RECIPIENTS),
         ]
         
         missing_fields = []
@@ -81,27 +98,23 @@ class Config:
 # NARZĘDZIA (Utils)
 # -----------------------------------------------------------------------------
 
+# Znaczniki HTML/CDATA i encje - wzorce kompilowane raz przy imporcie
+_MARKUP_RE = re.compile(r'<!\[CDATA\[|\]\]>|<[^>]+>')
+_ENTITY_RE = re.compile(r'&(?:#[0-9]{1,7}|#[xX][0-9a-fA-F]{1,6}|[A-Za-z][A-Za-z0-9]{1,31});')
+_decode_entity = lru_cache(maxsize=2048)(html.unescape)
+
 def strip_html_tags(text: str) -> str:
-    """Usuwa znaczniki HTML i czyści treść tekstową."""
+    """Usuwa znaczniki HTML/CDATA, dekoduje wszystkie encje i zwija białe znaki."""
     if not text:
         return ""
     
-    # Usuwanie znaczników HTML
-    text = re.sub(r'<[^>]+>', '', text)
-    # Usuwanie nadmiarowych białych znaków
-    text = re.sub(r'\s+', ' ', text)
+    if '<' in text or ']]>' in text:
+        text = _MARKUP_RE.sub('', text)
+    if '&' in text:
+        text = _ENTITY_RE.sub(lambda m: _decode_entity(m.group()), text)
     
-    # Dekodowanie encji HTML
-    text = text.replace('&nbsp;', ' ')
-    text = text.replace('&amp;', '&')
-    text = text.replace('&lt;', '<')
-    text = text.replace('&gt;', '>')
-    text = text.replace('&quot;', '"')
-    text = text.replace('&#39;', "'")
-    text = text.replace('<![CDATA[', '')
-    text = text.replace(']]>', '')
-    
-    return text.strip()
+    # split() zwija wszystkie białe znaki (także &nbsp;) i obcina końce
+    return ' '.join(text.split())
 
 
 # -----------------------------------------------------------------------------
@@ -162,6 +175,98 @@ def send_email(subject: str, html_content: str, recipient: Optional[str] = None)
         return False
 
 
+def open_smtp_connection() -> smtplib.SMTP:
+    """Otwiera uwierzytelnione połączenie SMTP (SSL na porcie 465, w przeciwnym razie STARTTLS)."""
+    config = Config()
+    context = ssl.create_default_context()
+    
+    if config.SMTP_PORT == 465:
+        server = smtplib.SMTP_SSL(config.SMTP_SERVER, config.SMTP_PORT, context=context, timeout=30)
+    else:
+        server = smtplib.SMTP(config.SMTP_SERVER, config.SMTP_PORT, timeout=30)
+    try:
+        if config.SMTP_PORT != 465:
+            server.starttls(context=context)
+        server.login(config.EMAIL_SENDER, config.EMAIL_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def send_bulk_email(subject: str, html_content: str, recipients: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+    """
+    Wysyła newsletter do wielu odbiorców przez jedno (odnawiane) połączenie SMTP.
+    
+    Zwraca słownik odbiorca -> None (wysłano) lub opis błędu.
+    """
+    config = Config()
+    recipients = recipients if recipients is not None else config.EMAIL_RECIPIENTS
+    
+    if not config.validate():
+        print("[BŁĄD] Nieprawidłowa konfiguracja email")
+        return {recipient: 'Nieprawidłowa konfiguracja email' for recipient in recipients}
+    
+    from email.utils import formatdate, make_msgid
+    message = MIMEMultipart('alternative')
+    message['Subject'] = subject
+    message['From'] = config.EMAIL_SENDER
+    message.attach(MIMEText(html_content, 'html', 'utf-8'))
+    
+    results: Dict[str, Optional[str]] = {}
+    server = None
+    sent_on_connection = 0
+    print(f"[EMAIL] Wysyłka zbiorcza do {len(recipients)} odbiorców przez {config.SMTP_SERVER}:{config.SMTP_PORT}...")
+    
+    try:
+        for recipient in recipients:
+            for key in ('To', 'Date', 'Message-ID'):
+                del message[key]
+            message['To'] = recipient
+            message['Date'] = formatdate(localtime=True)
+            message['Message-ID'] = make_msgid()
+            
+            for attempt in range(2):
+                try:
+                    if server is None or sent_on_connection >= config.SMTP_MAX_MESSAGES_PER_CONNECTION:
+                        if server is not None:
+                            server.quit()
+                        server, sent_on_connection = open_smtp_connection(), 0
+                    server.send_message(message)
+                    sent_on_connection += 1
+                    results[recipient] = None
+                    break
+                except (smtplib.SMTPServerDisconnected, ConnectionError, ssl.SSLError, TimeoutError) as e:
+                    # Zerwane połączenie - jedna próba po ponownym połączeniu
+                    if server is not None:
+                        server.close()
+                    server = None
+                    if attempt:
+                        results[recipient] = str(e) or type(e).__name__
+                except smtplib.SMTPAuthenticationError:
+                    raise
+                except (smtplib.SMTPException, OSError) as e:
+                    results[recipient] = str(e) or type(e).__name__
+                    break
+            
+            if results[recipient]:
+                print(f"[OSTRZEŻENIE] Nie wysłano do {recipient}: {results[recipient]}")
+    except smtplib.SMTPAuthenticationError:
+        print("[BŁĄD] Błąd uwierzytelniania. Sprawdź email i hasło.")
+        for recipient in recipients:
+            results.setdefault(recipient, 'Błąd uwierzytelniania')
+    finally:
+        if server is not None:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                server.close()
+    
+    delivered = sum(1 for error in results.values() if error is None)
+    print(f"[EMAIL] Wysłano {delivered}/{len(recipients)}")
+    return results
+
+
 # -----------------------------------------------------------------------------
 # GENEROWANIE HTML (HTML Template)
 # -----------------------------------------------------------------------------
@@ -278,93 +383,87 @@ def generate_newsletter_html(world_news, polish_news, bankier_news, financial_da
     """
 
 # -----------------------------------------------------------------------------
-# SCRAPER: ŚWIAT (World News - BBC)
+# REJESTR ŹRÓDEŁ I POTOK RSS (Sources Registry)
 # -----------------------------------------------------------------------------
 
-def fetch_world_news() -> List[Dict[str, str]]:
-    """Pobiera wiadomości z BBC (Top Stories & World)."""
-    news_sources = [
-        {'url': 'http://feeds.bbci.co.uk/news/rss.xml', 'name': 'BBC Info'},
-        {'url': 'http://feeds.bbci.co.uk/news/world/rss.xml', 'name': 'BBC World'}
-    ]
-    all_news = []
-    seen_links = set()
-    
-    for source in news_sources:
+# Domyślny rejestr - używany, gdy obok aplikacji nie ma pliku src/sources.json
+DEFAULT_SOURCES = {
+    'defaults': {'feed_limit': 5, 'section_limit': 3,
+                 'cleaning': {'strip_html': True, 'max_summary_length': 200, 'dedupe_links': True}},
+    'sections': {
+        'world_news': {'label': 'ŚWIAT', 'limit': 3, 'cleaning': {'strip_html': False, 'max_summary_length': None},
+                       'feeds': [{'name': 'BBC Info', 'url': 'http://feeds.bbci.co.uk/news/rss.xml'},
+                                 {'name': 'BBC World', 'url': 'http://feeds.bbci.co.uk/news/world/rss.xml'}]},
+        'polish_news': {'label': 'POLSKA', 'limit': 3,
+                        'feeds': [{'name': 'Gazeta Wyborcza - Kraj', 'url': 'http://rss.gazeta.pl/pub/rss/gazetawyborcza_kraj.xml'}]},
+        'bankier_news': {'label': 'BANKIER', 'limit': 3,
+                         'feeds': [{'name': 'Bankier.pl', 'url': 'https://www.bankier.pl/rss/wiadomosci.xml'}]},
+    }
+}
+
+def load_sources() -> Dict:
+    """Wczytuje rejestr źródeł (SOURCES_FILE lub src/sources.json) i uzupełnia wartości domyślne."""
+    path = os.getenv('SOURCES_FILE') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'sources.json')
+    raw = DEFAULT_SOURCES
+    if os.path.exists(path):
         try:
-            feed = feedparser.parse(source['url'])
-            for entry in feed.entries[:5]:
-                link = entry.get('link', '')
-                if link in seen_links: continue
-                seen_links.add(link)
-                
-                all_news.append({
-                    'title': entry.get('title', 'Brak tytułu'),
-                    'summary': entry.get('summary', entry.get('description', 'Brak opisu')),
-                    'link': link,
-                    'source': source['name'],
-                    'published': entry.get('published', 'Nieznana data')
-                })
-        except Exception as e:
-            print(f"[OSTRZEŻENIE] Błąd pobierania z {source['name']}: {e}")
-            continue
-    return all_news[:3]
-
-# -----------------------------------------------------------------------------
-# SCRAPER: POLSKA (Polish News - Gazeta Wyborcza)
-# -----------------------------------------------------------------------------
+            with open(path, 'r', encoding='utf-8') as f: raw = json.load(f)
+        except Exception as e: print(f"[OSTRZEŻENIE] Nie można wczytać rejestru {path}: {e}")
+    
+    defaults = raw.get('defaults', {})
+    sections = {}
+    for name, section in raw.get('sections', {}).items():
+        feed_limit = section.get('feed_limit', defaults.get('feed_limit', 5))
+        sections[name] = {
+            'label': section.get('label', name.upper()),
+            'limit': section.get('limit', defaults.get('section_limit', 3)),
+            'cleaning': {**defaults.get('cleaning', {}), **section.get('cleaning', {})},
+            'feeds': [{**feed, 'limit': feed.get('limit', feed_limit)} for feed in section.get('feeds', [])],
+        }
+    return sections
 
-def fetch_polish_news() -> List[Dict[str, str]]:
-    """Pobiera wiadomości z Gazety Wyborczej (Kraj)."""
-    source = {'url': 'http://rss.gazeta.pl/pub/rss/gazetawyborcza_kraj.xml', 'name': 'Gazeta Wyborcza - Kraj'}
-    all_news = []
+def fetch_feed_items(feed: Dict, cleaning: Dict) -> List[Dict[str, str]]:
+    """
+    Pobiera i czyści wpisy jednego kanału według reguł sekcji.
     
+    Kanał pobiera requests z limitem czasu (feedparser.parse(url) używa urllib bez
+    limitu - zawieszony kanał blokowałby wątek, a interpreter czeka na wątki przy wyjściu).
+    """
+    all_news = []
     try:
-        feed = feedparser.parse(source['url'])
-        for entry in feed.entries[:5]:
-            raw_summary = entry.get('summary', entry.get('description', 'Brak opisu'))
-            clean_summary = strip_html_tags(raw_summary)
-            if len(clean_summary) > 200: clean_summary = clean_summary[:200] + '...'
+        response = requests.get(feed['url'], timeout=Config.FETCH_SOURCE_TIMEOUT)
+        response.raise_for_status()
+        parsed = feedparser.parse(response.content)
+        for entry in parsed.entries[:feed['limit']]:
+            title = entry.get('title', 'Brak tytułu')
+            summary = entry.get('summary', entry.get('description', 'Brak opisu'))
+            if cleaning.get('strip_html'):
+                title, summary = strip_html_tags(title), strip_html_tags(summary)
+            max_length = cleaning.get('max_summary_length')
+            if max_length and len(summary) > max_length: summary = summary[:max_length] + '...'
             
             all_news.append({
-                'title': strip_html_tags(entry.get('title', 'Brak tytułu')),
-                'summary': clean_summary,
+                'title': title,
+                'summary': summary,
                 'link': entry.get('link', ''),
-                'source': source['name'],
+                'source': feed['name'],
                 'published': entry.get('published', 'Nieznana data')
             })
     except Exception as e:
-        print(f"[OSTRZEŻENIE] Błąd pobierania z {source['name']}: {e}")
-            
-    return all_news[:3]
-
-# -----------------------------------------------------------------------------
-# SCRAPER: BANKIER (Financial News - Bankier.pl)
-# -----------------------------------------------------------------------------
+        print(f"[OSTRZEŻENIE] Błąd pobierania z {feed['name']}: {e}")
+    return all_news
 
-def fetch_bankier_news() -> List[Dict[str, str]]:
-    """Pobiera wiadomości z Bankier.pl."""
-    source = {'url': 'https://www.bankier.pl/rss/wiadomosci.xml', 'name': 'Bankier.pl'}
+def assemble_section(section: Dict, feed_items: List[List[Dict]]) -> List[Dict[str, str]]:
+    """Łączy wyniki kanałów sekcji, usuwa duplikaty linków i przycina do limitu."""
     all_news = []
-    
-    try:
-        feed = feedparser.parse(source['url'])
-        for entry in feed.entries[:5]:
-            raw_summary = entry.get('summary', entry.get('description', 'Brak opisu'))
-            clean_summary = strip_html_tags(raw_summary)
-            if len(clean_summary) > 200: clean_summary = clean_summary[:200] + '...'
-            
-            all_news.append({
-                'title': strip_html_tags(entry.get('title', 'Brak tytułu')),
-                'summary': clean_summary,
-                'link': entry.get('link', ''),
-                'source': source['name'],
-                'published': entry.get('published', 'Nieznana data')
-            })
-    except Exception as e:
-        print(f"[OSTRZEŻENIE] Błąd pobierania z {source['name']}: {e}")
-            
-    return all_news[:3]
+    seen_links = set()
+    for items in feed_items:
+        for item in items:
+            if section['cleaning'].get('dedupe_links', True):
+                if item['link'] in seen_links: continue
+                seen_links.add(item['link'])
+            all_news.append(item)
+    return all_news[:section['limit']]
 
 # -----------------------------------------------------------------------------
 # SCRAPER: DANE FINANSOWE (Metale, Waluty)
@@ -455,28 +554,45 @@ def fetch_financial_data() -> Dict:
 # -----------------------------------------------------------------------------
 
 def collect_all_news() -> Dict:
-    """Pobiera wiadomości ze wszystkich źródeł."""
-    news_data = {'world_news': [], 'polish_news': [], 'bankier_news': [], 'financial_data': {}}
+    """Pobiera wiadomości ze wszystkich źródeł jednocześnie (z limitami czasu)."""
+    sections = load_sources()
+    news_data = {name: [] for name in sections}
+    news_data['financial_data'] = {}
     
-    print("  [ŚWIAT] Pobieranie wiadomości ze świata...")
-    try: news_data['world_news'] = fetch_world_news()
-    except Exception as e: print(f"     [BŁĄD] {e}")
-    print(f"     [OK] Pobrano {len(news_data['world_news'])}")
+    # Jedno zadanie na kanał z rejestru + dane finansowe
+    tasks = {(name, i): partial(fetch_feed_items, feed, section['cleaning'])
+             for name, section in sections.items() for i, feed in enumerate(section['feeds'])}
+    tasks['financial_data'] = fetch_financial_data
+    results = {}
     
-    print("  [POLSKA] Pobieranie wiadomości z Polski...")
-    try: news_data['polish_news'] = fetch_polish_news()
-    except Exception as e: print(f"     [BŁĄD] {e}")
-    print(f"     [OK] Pobrano {len(news_data['polish_news'])}")
-    
-    print("  [BANKIER] Pobieranie wiadomości z Bankier.pl...")
-    try: news_data['bankier_news'] = fetch_bankier_news()
-    except Exception as e: print(f"     [BŁĄD] {e}")
-    print(f"     [OK] Pobrano {len(news_data['bankier_news'])}")
+    print(f"  [RÓWNOLEGLE] Uruchamianie {len(tasks)} źródeł jednocześnie...")
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix='fetch')
+    try:
+        futures = {executor.submit(func): key for key, func in tasks.items()}
+        # Każde źródło startuje od razu, więc termin źródła i globalny liczymy od startu
+        deadline = started + min(Config.FETCH_SOURCE_TIMEOUT, Config.FETCH_GLOBAL_TIMEOUT)
+        done, not_done = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+        
+        for future in done:
+            try: results[futures[future]] = future.result()
+            except Exception as e: print(f"     [BŁĄD] {futures[future]}: {e}")
+        for future in not_done:
+            print(f"     [OSTRZEŻENIE] {futures[future]}: przekroczono limit czasu - pomijam źródło")
+    finally:
+        # Nie czekamy na zawieszone źródła - wysyłamy wyniki częściowe; każde zapytanie HTTP
+        # ma własny limit czasu, więc wątki kończą się też przed wyjściem z programu
+        executor.shutdown(wait=False, cancel_futures=True)
     
-    print("  [FINANSE] Pobieranie danych finansowych...")
-    try: news_data['financial_data'] = fetch_financial_data()
-    except Exception as e: print(f"     [BŁĄD] {e}")
-    print(f"     [OK] Pobrano dane finansowe")
+    for name, section in sections.items():
+        news_data[name] = assemble_section(section, [results.get((name, i), []) for i in range(len(section['feeds']))])
+        print(f"     [{section['label']}] [OK] Pobrano {len(news_data[name])}")
+    news_data['financial_data'] = results.get('financial_data', {})
+    if 'financial_data' in results:
+        print("     [FINANSE] [OK] Pobrano dane finansowe")
+    else:
+        print("     [FINANSE] [OSTRZEŻENIE] Brak danych finansowych")
+    print(f"  [CZAS] Pobieranie zakończone w {time.monotonic() - started:.1f}s")
     
     return news_data
 
@@ -498,8 +614,8 @@ def main() -> int:
         
         print("\n[3/4] Generowanie HTML...")
         html_content = generate_newsletter_html(
-            news_data['world_news'], news_data['polish_news'],
-            news_data['bankier_news'], news_data['financial_data']
+            news_data.get('world_news', []), news_data.get('polish_news', []),
+            news_data.get('bankier_news', []), news_data['financial_data']
         )
         
         print("\n[4/4] Wysyłanie emaila...")
@@ -508,7 +624,8 @@ def main() -> int:
         current_date = datetime.now().strftime("%d.%m.%Y")
         subject = f"[NEWS] Codzienny Newsletter - {current_date}"
         
-        if send_email(subject, html_content):
+        results = send_bulk_email(subject, html_content)
+        if results and all(error is None for error in results.values()):
             print("\n" + "=" * 60)
             print("[OK] NEWSLETTER WYSŁANY POMYŚLNIE!")
             print("=" * 60)
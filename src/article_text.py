@@ -0,0 +1,247 @@
+"""
+Pełna treść artykułów
+Opcjonalny etap po scaleniu duplikatów: dla wybranych wiadomości pobiera
+strony artykułów (ograniczona liczba równoczesnych pobrań, w tym na jeden
+host), wyciąga główny tekst BeautifulSoup i zapisuje go w pamięci podręcznej
+na dysku adresowanej skrótem znormalizowanego URL. Kolejne uruchomienia
+i wydania innych subskrybentów nie pobierają tego samego artykułu ponownie.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from functools import partial
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from config import Config
+from fetch_engine import run_concurrently
+from http_client import http_get
+from metrics import get_metrics
+from seen_index import normalize_url
+
+
+# Elementy, które nigdy nie są treścią artykułu
+NOISE_TAGS = ('script', 'style', 'noscript', 'template', 'svg', 'form', 'nav', 'header', 'footer', 'aside', 'figure')
+# Krótsze akapity to zwykle podpisy, odnośniki i przyciski
+MIN_PARAGRAPH_LENGTH = 40
+MAX_TEXT_LENGTH = 20000
+
+_host_limits: Dict[str, threading.BoundedSemaphore] = defaultdict(
+    lambda: threading.BoundedSemaphore(Config.ARTICLE_PER_HOST)
+)
+_host_limits_lock = threading.Lock()
+
+
+def get_article_path(url: str) -> str:
+    """Zwraca ścieżkę wpisu pamięci podręcznej (skrót SHA-256 znormalizowanego URL)."""
+    key = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+    return os.path.join(Config.CACHE_DIR, 'articles', key[:2], f"{key}.json")
+
+
+def load_cached_article(url: str) -> Optional[Dict]:
+    """
+    Wczytuje zapisany wynik dla artykułu.
+
+    Zwraca:
+        Słownik z kluczami url, fetched_at, text (None po nieudanym pobraniu) lub None,
+        gdy artykułu nie ma w pamięci podręcznej albo nieudaną próbę można powtórzyć
+    """
+    try:
+        with open(get_article_path(url), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('text') is None and time.time() - cached.get('fetched_at', 0) > Config.ARTICLE_RETRY_HOURS * 3600:
+        return None
+    return cached
+
+
+def save_cached_article(url: str, text: Optional[str], error: Optional[str] = None) -> None:
+    """Zapisuje wynik pobrania atomowo (plik tymczasowy + zamiana nazwy)."""
+    path = get_article_path(url)
+    data = {'url': url, 'fetched_at': time.time(), 'text': text}
+    if error:
+        data['error'] = error
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[OSTRZEŻENIE] Nie można zapisać treści artykułu {url}: {e}")
+
+
+def extract_main_text(document: bytes, encoding: Optional[str] = None) -> str:
+    """
+    Wyciąga główny tekst artykułu ze strony HTML.
+
+    Każdy akapit dodaje swoją długość do elementu nadrzędnego (i połowę do
+    dalszego przodka); tekst to akapity z elementu o najwyższym wyniku.
+
+    Argumenty:
+        document: Treść strony
+        encoding: Kodowanie z nagłówka HTTP (domyślnie wykrywane ze strony)
+
+    Zwraca:
+        Akapity oddzielone pustą linią (pusty tekst, gdy strona nie ma treści)
+    """
+    from bs4 import BeautifulSoup, FeatureNotFound
+
+    try:
+        soup = BeautifulSoup(document, 'lxml', from_encoding=encoding)
+    except FeatureNotFound:
+        # Bez lxml - wbudowany parser (wolniejszy, ten sam wynik dla typowych stron)
+        soup = BeautifulSoup(document, 'html.parser', from_encoding=encoding)
+
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+
+    scores: Dict[int, float] = defaultdict(float)
+    containers = {}
+    for paragraph in soup.find_all('p'):
+        length = len(paragraph.get_text(' ', strip=True))
+        if length < MIN_PARAGRAPH_LENGTH:
+            continue
+        parent = paragraph.parent
+        if parent is None:
+            continue
+        containers[id(parent)] = parent
+        scores[id(parent)] += length
+        if parent.parent is not None:
+            containers[id(parent.parent)] = parent.parent
+            scores[id(parent.parent)] += length / 2
+
+    if not scores:
+        return ''
+    best = containers[max(scores, key=scores.get)]
+    paragraphs = [
+        ' '.join(paragraph.get_text(' ', strip=True).split())
+        for paragraph in best.find_all('p')
+    ]
+    return '\n\n'.join(text for text in paragraphs if len(text) >= MIN_PARAGRAPH_LENGTH)[:MAX_TEXT_LENGTH]
+
+
+def fetch_article_text(url: str) -> str:
+    """
+    Pobiera stronę artykułu (co najwyżej Config.ARTICLE_MAX_BYTES) i wyciąga jej tekst.
+
+    Wyjątki:
+        requests.RequestException: Błąd pobierania
+        ValueError: Odpowiedź nie jest stroną HTML
+    """
+    host = urlsplit(url).netloc.lower()
+    with _host_limits_lock:
+        limit = _host_limits[host]
+    with limit:
+        response = http_get(url, timeout=Config.ARTICLE_TIMEOUT, stream=True)
+        try:
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '')
+            if 'html' not in content_type:
+                raise ValueError(f"nieobsługiwany typ treści {content_type or 'brak'}")
+            chunks, size = [], 0
+            for chunk in get_metrics().iter_counted(response.iter_content(64 * 1024)):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= Config.ARTICLE_MAX_BYTES:
+                    break
+        finally:
+            response.close()
+    # Kodowanie tylko z nagłówka; bez niego BeautifulSoup czyta <meta charset>
+    encoding = response.encoding if 'charset=' in content_type.lower() else None
+    return extract_main_text(b''.join(chunks), encoding)
+
+
+def add_article_texts(news_data: Dict) -> int:
+    """
+    Uzupełnia wiadomości w sekcjach o pole 'article_text' (pełny tekst artykułu).
+
+    Artykuły z pamięci podręcznej nie są pobierane; pozostałe są pobierane
+    równolegle (Config.ARTICLE_WORKERS wątków, Config.ARTICLE_PER_HOST na host).
+    Artykuł, którego nie udało się pobrać, zostaje z samym opisem z kanału.
+
+    Argumenty:
+        news_data: Dane wiadomości (sekcje jako listy), modyfikowane w miejscu
+
+    Zwraca:
+        Liczba pobranych (nie z pamięci podręcznej) artykułów
+    """
+    try:
+        import bs4  # noqa: F401
+    except ImportError:
+        print("[OSTRZEŻENIE] Brak beautifulsoup4 - pomijanie pobierania treści artykułów")
+        return 0
+
+    # Ten sam artykuł z różnymi parametrami śledzącymi pobieramy raz (pierwszy adres)
+    items_by_url: Dict[str, List[Dict]] = {}
+    urls: Dict[str, str] = {}
+    for items in news_data.values():
+        if isinstance(items, list):
+            for item in items:
+                if item.get('link', '').startswith(('http://', 'https://')):
+                    url = urls.setdefault(normalize_url(item['link']), item['link'])
+                    items_by_url.setdefault(url, []).append(item)
+
+    texts: Dict[str, str] = {}
+    tasks = {}
+    for url in items_by_url:
+        cached = load_cached_article(url)
+        if cached is None:
+            # Osobna kopia kontekstu dla każdego zadania - pobrane bajty trafiają do bieżącego etapu
+            tasks[url] = partial(contextvars.copy_context().run, fetch_article_text, url)
+        elif cached['text']:
+            texts[url] = cached['text']
+
+    if tasks:
+        results, errors = run_concurrently(
+            tasks,
+            source_timeout=Config.ARTICLE_TIMEOUT,
+            global_timeout=Config.ARTICLE_GLOBAL_TIMEOUT,
+            max_workers=Config.ARTICLE_WORKERS
+        )
+        for url, text in results.items():
+            save_cached_article(url, text)
+            if text:
+                texts[url] = text
+        for url, error in errors.items():
+            save_cached_article(url, None, error)
+        if errors:
+            get_metrics().count(errors=len(errors))
+            print(f"  [ARTYKUŁY] [OSTRZEŻENIE] Nie pobrano {len(errors)} artykułów")
+
+    for url, text in texts.items():
+        for item in items_by_url[url]:
+            item['article_text'] = text
+    get_metrics().count(items=len(texts))
+    print(f"  [ARTYKUŁY] Treść {len(texts)}/{len(items_by_url)} artykułów "
+          f"(pobrano {len(tasks)}, z pamięci podręcznej {len(items_by_url) - len(tasks)})")
+    return len(tasks)
+
+
+def prune_article_cache(max_age_days: Optional[float] = None) -> int:
+    """
+    Usuwa wpisy pamięci podręcznej starsze niż max_age_days (domyślnie Config.ARTICLE_CACHE_DAYS).
+
+    Zwraca:
+        Liczba usuniętych wpisów
+    """
+    max_age_days = Config.ARTICLE_CACHE_DAYS if max_age_days is None else max_age_days
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for directory, _, files in os.walk(os.path.join(Config.CACHE_DIR, 'articles')):
+        for name in files:
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+    return removed
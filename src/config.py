@@ -5,7 +5,7 @@ Moduł zarządzania konfiguracją
 
 import os
 from dotenv import load_dotenv
-from typing import Optional
+from typing import List, Optional
 
 # Ładowanie zmiennych środowiskowych z pliku .env
 load_dotenv()
@@ -20,10 +20,100 @@ class Config:
     EMAIL_SENDER: str = os.getenv('EMAIL_SENDER', '')
     EMAIL_PASSWORD: str = os.getenv('EMAIL_PASSWORD', '')
     EMAIL_RECIPIENT: str = os.getenv('EMAIL_RECIPIENT', '')
+    # Lista odbiorców wysyłki zbiorczej (oddzieleni przecinkami, domyślnie EMAIL_RECIPIENT)
+    EMAIL_RECIPIENTS: List[str] = [
+        address.strip() for address in os.getenv('EMAIL_RECIPIENTS', EMAIL_RECIPIENT).split(',') if address.strip()
+    ]
+    # Po tylu wiadomościach połączenie SMTP jest otwierane od nowa (limity serwerów na sesję)
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', '100'))
+    SMTP_TIMEOUT: float = float(os.getenv('SMTP_TIMEOUT', '30'))
+    # Równoległe połączenia SMTP i limit tempa dostawcy (wiadomości na minutę, 0 = bez limitu)
+    SMTP_WORKERS: int = int(os.getenv('SMTP_WORKERS', '2'))
+    SMTP_RATE_PER_MINUTE: float = float(os.getenv('SMTP_RATE_PER_MINUTE', '0'))
+    SMTP_RATE_BURST: int = int(os.getenv('SMTP_RATE_BURST', '5'))
+    # Ponowienia odpowiedzi tymczasowych (4xx): liczba prób i odstęp bazowy (podwajany)
+    SMTP_RETRY_ATTEMPTS: int = int(os.getenv('SMTP_RETRY_ATTEMPTS', '4'))
+    SMTP_RETRY_BACKOFF: float = float(os.getenv('SMTP_RETRY_BACKOFF', '5'))
+    
+    # Baza subskrybentów z preferencjami (SQLite); pusta lub brak = EMAIL_RECIPIENTS
+    SUBSCRIBERS_DB: str = os.getenv('SUBSCRIBERS_DB', 'subscribers.db')
     
     # Strefa czasowa
     TIMEZONE: str = os.getenv('TZ', 'Europe/Warsaw')
     
+    # Tryb demona: harmonogram cron w strefie TIMEZONE (kilka wyrażeń oddzielonych średnikami)
+    # oraz endpoint /health (port 0 = wyłączony)
+    DAEMON_SCHEDULE: str = os.getenv('DAEMON_SCHEDULE', '30 11 * * *')
+    # Osobny harmonogram fazy pobierania (migawka wiadomości); puste = pobieranie w trakcie wydania
+    DAEMON_COLLECT_SCHEDULE: str = os.getenv('DAEMON_COLLECT_SCHEDULE', '')
+    DAEMON_HEALTH_HOST: str = os.getenv('DAEMON_HEALTH_HOST', '127.0.0.1')
+    DAEMON_HEALTH_PORT: int = int(os.getenv('DAEMON_HEALTH_PORT', '8080'))
+    
+    # Limity czasu pobierania (w sekundach)
+    FETCH_SOURCE_TIMEOUT: float = float(os.getenv('FETCH_SOURCE_TIMEOUT', '20'))
+    FETCH_GLOBAL_TIMEOUT: float = float(os.getenv('FETCH_GLOBAL_TIMEOUT', '45'))
+    
+    # Klient HTTP (wspólna pula połączeń dla wszystkich skraperów)
+    HTTP_POOL_SIZE: int = int(os.getenv('HTTP_POOL_SIZE', '10'))
+    HTTP_MAX_RETRIES: int = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+    HTTP_BACKOFF_FACTOR: float = float(os.getenv('HTTP_BACKOFF_FACTOR', '0.5'))
+    HTTP_TIMEOUT: float = float(os.getenv('HTTP_TIMEOUT', '10'))
+    USER_AGENT: str = os.getenv(
+        'USER_AGENT',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    )
+    
+    # Rejestr źródeł RSS (kanały, sekcje, limity, reguły czyszczenia)
+    SOURCES_FILE: str = os.getenv(
+        'SOURCES_FILE',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sources.json')
+    )
+    
+    # Katalog pamięci podręcznej (kanały RSS itp.)
+    CACHE_DIR: str = os.getenv('CACHE_DIR', '.cache')
+    
+    # Trwała kolejka wysyłki (wznawianie przerwanej wysyłki) i wiek, po którym
+    # niedokończone wydanie uznajemy za nieaktualne (w godzinach)
+    OUTBOX_DB: str = os.getenv('OUTBOX_DB', os.path.join(CACHE_DIR, 'outbox.db'))
+    OUTBOX_MAX_AGE_HOURS: float = float(os.getenv('OUTBOX_MAX_AGE_HOURS', '12'))
+    
+    # Migawka wiadomości z fazy pobierania (main.py collect) i jej maksymalny wiek dla fazy wysyłki
+    SNAPSHOT_FILE: str = os.getenv('SNAPSHOT_FILE', os.path.join(CACHE_DIR, 'news_snapshot.json'))
+    SNAPSHOT_MAX_AGE_MINUTES: float = float(os.getenv('SNAPSHOT_MAX_AGE_MINUTES', '120'))
+    # Zapasowi kandydaci w sekcji migawki - zastępują artykuły wysłane po jej utworzeniu
+    SNAPSHOT_SPARE_ITEMS: int = int(os.getenv('SNAPSHOT_SPARE_ITEMS', '3'))
+    
+    # Raport metryk uruchomienia (JSON) i opcjonalny plik dla Prometheusa (puste = wyłączony)
+    METRICS_REPORT_FILE: str = os.getenv('METRICS_REPORT_FILE', os.path.join(CACHE_DIR, 'run_report.json'))
+    METRICS_PROMETHEUS_FILE: str = os.getenv('METRICS_PROMETHEUS_FILE', '')
+    # Osobny raport fazy pobierania (nie nadpisuje raportu wydania)
+    COLLECT_METRICS_REPORT_FILE: str = os.getenv(
+        'COLLECT_METRICS_REPORT_FILE', os.path.join(CACHE_DIR, 'collect_report.json')
+    )
+    
+    # Deduplikacja między uruchomieniami (indeks wysłanych artykułów)
+    SEEN_INDEX_ENABLED: bool = os.getenv('SEEN_INDEX_ENABLED', 'true').lower() in ('1', 'true', 'tak', 'yes')
+    SEEN_RETENTION_DAYS: float = float(os.getenv('SEEN_RETENTION_DAYS', '7'))
+    # Ile wpisów kanału maksymalnie przejrzeć, szukając nowych artykułów
+    FEED_MAX_SCAN: int = int(os.getenv('FEED_MAX_SCAN', '50'))
+    
+    # Pełna treść artykułów (pobieranie stron wybranych wiadomości): równoległość łączna
+    # i na host, limity czasu i rozmiaru, przechowywanie w pamięci podręcznej
+    ARTICLE_TEXT_ENABLED: bool = os.getenv('ARTICLE_TEXT_ENABLED', 'false').lower() in ('1', 'true', 'tak', 'yes')
+    ARTICLE_WORKERS: int = int(os.getenv('ARTICLE_WORKERS', '8'))
+    ARTICLE_PER_HOST: int = int(os.getenv('ARTICLE_PER_HOST', '2'))
+    ARTICLE_TIMEOUT: float = float(os.getenv('ARTICLE_TIMEOUT', '15'))
+    ARTICLE_GLOBAL_TIMEOUT: float = float(os.getenv('ARTICLE_GLOBAL_TIMEOUT', '40'))
+    ARTICLE_MAX_BYTES: int = int(os.getenv('ARTICLE_MAX_BYTES', str(2 * 1024 * 1024)))
+    ARTICLE_CACHE_DAYS: float = float(os.getenv('ARTICLE_CACHE_DAYS', '7'))
+    ARTICLE_RETRY_HOURS: float = float(os.getenv('ARTICLE_RETRY_HOURS', '6'))
+    
+    # Limit streszczenia wiadomości (bajty UTF-8, całe zdania wybrane TF-IDF)
+    SUMMARY_MAX_BYTES: int = int(os.getenv('SUMMARY_MAX_BYTES', '320'))
+    
+    # Próg podobieństwa (Jaccard), od którego wiadomości z różnych źródeł są scalane
+    DUPLICATE_THRESHOLD: float = float(os.getenv('DUPLICATE_THRESHOLD', '0.5'))
+    
     # Opcjonalne klucze API
     OPENAI_API_KEY: Optional[str] = os.getenv('OPENAI_API_KEY', None)
     
@@ -38,7 +128,7 @@ class Config:
         required_fields = [
             ('EMAIL_SENDER', cls.EMAIL_SENDER),
             ('EMAIL_PASSWORD', cls.EMAIL_PASSWORD),
-            ('EMAIL_RECIPIENT', cls.EMAIL_RECIPIENT),
+            ('EMAIL_RECIPIENT', cls.EMAIL_RECIPIENT or cls.EMAIL_RECIPIENTS or os.path.exists(cls.SUBSCRIBERS_DB)),
         ]
         
         missing_fields = []
@@ -60,8 +150,13 @@ class Config:
         print(f"  Serwer SMTP: {cls.SMTP_SERVER}:{cls.SMTP_PORT}")
         print(f"  Nadawca: {cls.EMAIL_SENDER}")
         print(f"  Odbiorca: {cls.EMAIL_RECIPIENT}")
+        if len(cls.EMAIL_RECIPIENTS) > 1:
+            print(f"  Odbiorcy wysyłki zbiorczej: {len(cls.EMAIL_RECIPIENTS)}")
+            rate = f"{cls.SMTP_RATE_PER_MINUTE:.0f}/min" if cls.SMTP_RATE_PER_MINUTE > 0 else "bez limitu"
+            print(f"  Wysyłka: {cls.SMTP_WORKERS} połączeń SMTP, tempo {rate}")
         print(f"  Hasło: {'*' * len(cls.EMAIL_PASSWORD) if cls.EMAIL_PASSWORD else 'NIE USTAWIONO'}")
         print(f"  Strefa czasowa: {cls.TIMEZONE}")
+        print(f"  Limity pobierania: {cls.FETCH_SOURCE_TIMEOUT:.0f}s / źródło, {cls.FETCH_GLOBAL_TIMEOUT:.0f}s łącznie")
         print(f"  OpenAI API: {'Skonfigurowano' if cls.OPENAI_API_KEY else 'Nie skonfigurowano'}")
 
 
@@ -0,0 +1,276 @@
+"""
+Tryb demona newslettera
+Długo działający proces, który sam uruchamia wydania według harmonogramu cron
+(Config.DAEMON_SCHEDULE w strefie Config.TIMEZONE). Między wydaniami zostaje
+w pamięci to, co jednorazowe uruchomienie przygotowuje od zera: zaimportowane
+moduły, skompilowane szablony, rejestr źródeł, sesja HTTP z pulą połączeń,
+indeks wysłanych artykułów i wpisy kanałów RSS. Stan procesu udostępnia
+endpoint HTTP /health (dla monitoringu lub healthchecka kontenera).
+Z harmonogramem pobierania (Config.DAEMON_COLLECT_SCHEDULE) pobieranie
+działa osobno, a wydanie wysyła gotową migawkę wiadomości (snapshot.py).
+
+Uruchomienie:
+    python src/daemon.py [--schedule "30 11 * * *"] [--collect-schedule "*/10 * * * *"]
+                         [--health-port 8080] [--next 5]
+"""
+
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+import pytz
+
+from config import Config
+from http_client import get_session
+from scheduler import Schedule
+from scrapers.rss_pipeline import load_registry
+from seen_index import get_seen_index
+import main as newsletter
+
+# Najdłuższa pojedyncza drzemka - zegar jest sprawdzany ponownie (zmiana czasu, uśpienie systemu)
+MAX_SLEEP_SECONDS = 60.0
+
+
+class Job:
+    """Zadanie demona: nazwa, harmonogram i funkcja zwracająca kod wyjścia."""
+
+    def __init__(self, name: str, schedule: Schedule, run: Callable[[], int]):
+        self.name = name
+        self.schedule = schedule
+        self.run = run
+        self.next_run: Optional[datetime] = None
+        self.runs = 0
+        self.last_run: Optional[Dict] = None
+
+
+class NewsletterDaemon:
+    """
+    Pętla harmonogramu uruchamiająca zadania w bieżącym procesie, jedno po drugim.
+
+    Domyślnie jedynym zadaniem jest pełne wydanie (main.main). Z harmonogramem
+    pobierania są dwa: faza pobierania zapisuje migawkę wiadomości, a wydanie
+    tylko renderuje i wysyła z niej (main.main('send')).
+    """
+
+    def __init__(self, schedule: Schedule, run_edition: Callable[[], int] = newsletter.main,
+                 collect_schedule: Optional[Schedule] = None,
+                 run_collect: Callable[[], int] = newsletter.collect_main):
+        self.jobs = [Job('edition', schedule, run_edition)]
+        if collect_schedule is not None:
+            # Przy równych terminach najpierw pobieranie, potem wysyłka
+            self.jobs.insert(0, Job('collect', collect_schedule, run_collect))
+        self.timezone = schedule.crons[0].timezone
+        self.started_at = time.time()
+        self.running: Optional[str] = None
+        self.running_since: Optional[float] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def warm_up(self) -> None:
+        """Przygotowuje współdzielony stan przed pierwszym wydaniem."""
+        load_registry()
+        get_session()
+        get_seen_index()
+
+    def run_forever(self) -> None:
+        """Czeka na kolejne terminy i uruchamia zadania aż do wywołania stop()."""
+        now = datetime.now(self.timezone)
+        for job in self.jobs:
+            job.next_run = job.schedule.next_after(now)
+            self.announce(job)
+
+        while not self._stop.is_set():
+            job = min(self.jobs, key=lambda candidate: candidate.next_run)
+            remaining = (job.next_run - datetime.now(self.timezone)).total_seconds()
+            if remaining > 0:
+                self._stop.wait(min(remaining, MAX_SLEEP_SECONDS))
+                continue
+
+            scheduled = job.next_run
+            self.run_job(job)
+
+            # Terminy tego zadania, które minęły w trakcie jego wykonania, są pomijane
+            now = datetime.now(self.timezone)
+            job.next_run = job.schedule.next_after(max(now, scheduled))
+            skipped = job.schedule.next_after(scheduled)
+            if skipped < job.next_run:
+                print(f"[OSTRZEŻENIE] Zadanie {job.name} trwało do {now.strftime('%H:%M')} - pominięto termin "
+                      f"{skipped.strftime('%Y-%m-%d %H:%M')}")
+            if not self._stop.is_set():
+                self.announce(job)
+
+    def announce(self, job: Job) -> None:
+        label = 'Następne wydanie' if job.name == 'edition' else 'Następne pobieranie'
+        print(f"[DEMON] {label}: {job.next_run.strftime('%Y-%m-%d %H:%M %Z')}")
+
+    def run_job(self, job: Job) -> int:
+        """Uruchamia zadanie; wyjątek nie zatrzymuje demona."""
+        with self._lock:
+            self.running, self.running_since = job.name, time.time()
+        exit_code, error = 1, None
+        try:
+            exit_code = job.run()
+        except Exception as e:
+            error = str(e)
+            print(f"[BŁĄD] Zadanie {job.name} zakończone wyjątkiem: {e}")
+        finally:
+            sys.stdout.flush()
+            with self._lock:
+                job.last_run = {
+                    'started_at': iso(self.running_since),
+                    'finished_at': iso(time.time()),
+                    'exit_code': exit_code,
+                    'error': error,
+                }
+                job.runs += 1
+                self.running, self.running_since = None, None
+        return exit_code
+
+    def stop(self) -> None:
+        """Kończy pętlę po bieżącym zadaniu (wysyłka nie jest przerywana)."""
+        self._stop.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def status(self) -> Dict:
+        """Zwraca stan demona dla endpointu /health."""
+        with self._lock:
+            healthy = all(job.last_run is None or job.last_run['exit_code'] == 0 for job in self.jobs)
+            return {
+                'status': 'ok' if healthy else 'error',
+                'started_at': iso(self.started_at),
+                'uptime_seconds': round(time.time() - self.started_at),
+                'timezone': Config.TIMEZONE,
+                'running': self.running,
+                'running_since': iso(self.running_since) if self.running_since else None,
+                'jobs': {
+                    job.name: {
+                        'schedule': job.schedule.expressions,
+                        'next_run': job.next_run.isoformat() if job.next_run else None,
+                        'runs': job.runs,
+                        'last_run': job.last_run,
+                    }
+                    for job in self.jobs
+                },
+            }
+
+
+def iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, pytz.timezone(Config.TIMEZONE)).isoformat(timespec='seconds')
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """GET /health: 200 gdy ostatnie uruchomienie każdego zadania się powiodło (lub jeszcze go nie było), inaczej 503."""
+
+    def do_GET(self) -> None:
+        if self.path.split('?', 1)[0] not in ('/', '/health'):
+            self.send_error(404)
+            return
+        status = self.server.newsletter_daemon.status()
+        body = json.dumps(status, ensure_ascii=False).encode('utf-8')
+        self.send_response(200 if status['status'] == 'ok' else 503)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def start_health_server(daemon: NewsletterDaemon, host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Uruchamia endpoint /health w wątku w tle.
+
+    Argumenty:
+        daemon: Demon, którego stan jest raportowany
+        host: Adres nasłuchiwania
+        port: Port nasłuchiwania
+
+    Zwraca:
+        Uruchomiony serwer HTTP
+    """
+    server = ThreadingHTTPServer((host, port), HealthHandler)
+    server.daemon_threads = True
+    server.newsletter_daemon = daemon
+    threading.Thread(target=server.serve_forever, name='health', daemon=True).start()
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Newsletter w trybie demona z wbudowanym harmonogramem')
+    parser.add_argument('--schedule', help='Wyrażenia cron oddzielone średnikami (domyślnie DAEMON_SCHEDULE)')
+    parser.add_argument('--health-port', type=int, default=Config.DAEMON_HEALTH_PORT,
+                        help='Port endpointu /health (0 = wyłączony)')
+    parser.add_argument('--collect-schedule',
+                        help='Harmonogram fazy pobierania (domyślnie DAEMON_COLLECT_SCHEDULE, puste = wyłączona)')
+    parser.add_argument('--next', type=int, metavar='N', help='Wypisz N najbliższych terminów i zakończ')
+    args = parser.parse_args()
+
+    try:
+        schedule = Schedule.from_config(args.schedule)
+        collect_text = Config.DAEMON_COLLECT_SCHEDULE if args.collect_schedule is None else args.collect_schedule
+        collect_schedule = Schedule.from_config(collect_text) if collect_text.strip() else None
+    except ValueError as e:
+        print(f"[BŁĄD] Niepoprawny harmonogram: {e}")
+        return 1
+
+    if args.next:
+        now = datetime.now(schedule.crons[0].timezone)
+        for name, job_schedule in (('pobieranie', collect_schedule), ('wydanie', schedule)):
+            if job_schedule is not None:
+                for moment in job_schedule.upcoming(now, args.next):
+                    print(f"{name:<11} {moment.strftime('%Y-%m-%d %H:%M %Z')}")
+        return 0
+
+    # Logi demona trafiają zwykle do pliku lub journald - bez buforowania całych bloków
+    sys.stdout.reconfigure(line_buffering=True)
+
+    if collect_schedule is None:
+        daemon = NewsletterDaemon(schedule)
+    else:
+        # Dwie fazy: wydanie nie czeka na źródła, tylko renderuje i wysyła z migawki
+        daemon = NewsletterDaemon(schedule, partial(newsletter.main, 'send'), collect_schedule)
+
+    def handle_signal(signum, frame):
+        if daemon.stopping:
+            raise KeyboardInterrupt
+        print(f"\n[DEMON] Otrzymano sygnał {signal.Signals(signum).name} - zakończenie po bieżącym wydaniu")
+        daemon.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    print(f"[DEMON] Harmonogram: {'; '.join(schedule.expressions)} ({Config.TIMEZONE})")
+    if collect_schedule is not None:
+        print(f"[DEMON] Harmonogram pobierania: {'; '.join(collect_schedule.expressions)}")
+    daemon.warm_up()
+    server = None
+    if args.health_port:
+        try:
+            server = start_health_server(daemon, Config.DAEMON_HEALTH_HOST, args.health_port)
+            print(f"[DEMON] Endpoint zdrowia: http://{Config.DAEMON_HEALTH_HOST}:{args.health_port}/health")
+        except OSError as e:
+            print(f"[OSTRZEŻENIE] Nie można uruchomić endpointu zdrowia: {e}")
+
+    try:
+        daemon.run_forever()
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    print("[DEMON] Zatrzymano")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Harmonogram wysyłki
+Rozsyła wiadomości przez kilka równoległych połączeń SMTP z limitem tempa
+(token bucket - limity dostawcy na minutę) i ponawia odpowiedzi tymczasowe (4xx)
+z wykładniczym odstępem. Wszystkie parametry pochodzą z konfiguracji.
+Nieudane połączenie z serwerem przerywa wysyłkę - pozostali odbiorcy czekają
+w kolejce na kolejne uruchomienie zamiast kolejnych prób połączenia.
+"""
+
+import errno
+import heapq
+import smtplib
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+
+# Zadanie wysyłki: (odbiorca, funkcja zwracająca bloki wiadomości)
+DeliveryJob = Tuple[str, Callable[[], Iterable[bytes]]]
+
+# Błędy połączenia, po których ponowienie ma sens (zerwane lub odrzucone połączenie,
+# przekroczony czas, błąd DNS); pozostałe OSError (np. błąd certyfikatu SSL) są trwałe
+TRANSIENT_CONNECTION_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    ConnectionRefusedError,
+    BrokenPipeError,
+    TimeoutError,
+    socket.gaierror,
+)
+# Niedostępna sieć lub host (OSError bez osobnej podklasy)
+TRANSIENT_ERRNOS = frozenset([errno.ENETUNREACH, errno.ENETDOWN, errno.EHOSTUNREACH, errno.EHOSTDOWN])
+
+# Powiadomienie o ostatecznym wyniku: (odbiorca, opis błędu lub None, czy błąd tymczasowy)
+ResultCallback = Callable[[str, Optional[str], bool], None]
+
+
+class TokenBucket:
+    """Ogranicznik tempa: średnio rate_per_minute zdarzeń na minutę, chwilowo do burst naraz."""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Pobiera jeden żeton, czekając na jego uzupełnienie, jeśli trzeba.
+
+        Zwraca:
+            Czas oczekiwania w sekundach (0, gdy limit jest wyłączony)
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ConnectFailed(Exception):
+    """
+    Nie udało się nawiązać połączenia SMTP (sesja zgłasza go zamiast błędu połączenia).
+
+    Dotyczy wszystkich odbiorców, więc harmonogram przerywa wysyłkę po pierwszym
+    takim błędzie. Pierwotny błąd jest w atrybucie `error`.
+    """
+
+    def __init__(self, error: Exception):
+        super().__init__(describe_error(error))
+        self.error = error
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Sprawdza, czy błąd wysyłki jest tymczasowy: odpowiedź 4xx, zerwane lub odrzucone
+    połączenie, przekroczony czas, błąd DNS albo niedostępna sieć.
+    """
+    if isinstance(error, ConnectFailed):
+        return is_transient(error.error)
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, TRANSIENT_CONNECTION_ERRORS):
+        return True
+    return type(error) is OSError and error.errno in TRANSIENT_ERRNOS
+
+
+def describe_error(error: Exception) -> str:
+    """Zwraca krótki opis błędu wysyłki."""
+    return str(error) or type(error).__name__
+
+
+class DeliveryScheduler:
+    """
+    Równoległa wysyłka zadań przez pulę połączeń SMTP.
+
+    Każdy wątek roboczy ma własną sesję (session_factory, np. email_sender.SmtpSession -
+    menedżer kontekstu z metodą send), wspólny jest limit tempa i kolejka ponowień
+    uporządkowana według czasu następnej próby.
+
+    Błąd logowania lub połączenia (ConnectFailed) kończy wysyłkę: pozostałe zadania
+    dostają ten sam błąd bez kolejnych prób - jako tymczasowy, jeśli nim jest
+    (np. serwer chwilowo niedostępny), więc trwała kolejka ponowi je później.
+    """
+
+    def __init__(self, session_factory: Callable,
+                 workers: Optional[int] = None,
+                 rate_per_minute: Optional[float] = None,
+                 burst: Optional[int] = None,
+                 max_attempts: Optional[int] = None,
+                 backoff: Optional[float] = None):
+        self.session_factory = session_factory
+        self.workers = workers or Config.SMTP_WORKERS
+        self.bucket = TokenBucket(
+            Config.SMTP_RATE_PER_MINUTE if rate_per_minute is None else rate_per_minute,
+            Config.SMTP_RATE_BURST if burst is None else burst
+        )
+        self.max_attempts = max_attempts or Config.SMTP_RETRY_ATTEMPTS
+        self.backoff = Config.SMTP_RETRY_BACKOFF if backoff is None else backoff
+        self.stats: Dict[str, float] = {}
+
+    def run(self, sender: str, jobs: List[DeliveryJob],
+            on_result: Optional[ResultCallback] = None) -> Dict[str, Optional[str]]:
+        """
+        Wysyła wszystkie zadania i czeka na zakończenie (łącznie z ponowieniami).
+
+        Argumenty:
+            sender: Adres nadawcy
+            jobs: Lista zadań (odbiorca, fabryka wiadomości)
+            on_result: Wywoływana od razu po ostatecznym wyniku każdego zadania
+                (np. zapis stanu w trwałej kolejce)
+
+        Zwraca:
+            Słownik odbiorca -> None (wysłano) lub opis błędu
+        """
+        results: Dict[str, Optional[str]] = {}
+        # Kolejka: (czas następnej próby, numer, numer próby, odbiorca, fabryka)
+        queue = [(0.0, seq, 0, recipient, factory) for seq, (recipient, factory) in enumerate(jobs)]
+        heapq.heapify(queue)
+        # abort: (opis błędu, czy tymczasowy) po błędzie logowania lub połączenia
+        state = {'pending': len(jobs), 'seq': len(jobs), 'retries': 0, 'abort': None}
+        condition = threading.Condition()
+
+        def next_job():
+            with condition:
+                while True:
+                    if state['abort']:
+                        # Błąd logowania lub połączenia - pozostałe zadania kończą się tym samym błędem
+                        message, transient = state['abort']
+                        while queue:
+                            recipient = heapq.heappop(queue)[3]
+                            results[recipient] = message
+                            state['pending'] -= 1
+                            if on_result is not None:
+                                on_result(recipient, message, transient)
+                        condition.notify_all()
+                    if state['pending'] == 0 or (state['abort'] and not queue):
+                        return None
+                    now = time.monotonic()
+                    if queue and queue[0][0] <= now:
+                        return heapq.heappop(queue)
+                    condition.wait(queue[0][0] - now if queue else None)
+
+        def finish(job, error: Optional[Exception]) -> None:
+            _, _, attempt, recipient, factory = job
+            with condition:
+                retry = not isinstance(error, ConnectFailed) and attempt + 1 < self.max_attempts
+                if error is not None and is_transient(error) and retry and not state['abort']:
+                    delay = self.backoff * (2 ** attempt)
+                    heapq.heappush(queue, (time.monotonic() + delay, state['seq'], attempt + 1, recipient, factory))
+                    state['seq'] += 1
+                    state['retries'] += 1
+                    print(f"[OSTRZEŻENIE] {recipient}: {describe_error(error)} - ponowienie za {delay:.1f}s")
+                else:
+                    results[recipient] = None if error is None else describe_error(error)
+                    state['pending'] -= 1
+                    if error is not None:
+                        print(f"[OSTRZEŻENIE] Nie wysłano do {recipient}: {describe_error(error)}")
+                    transient = error is not None and is_transient(error)
+                    if isinstance(error, smtplib.SMTPAuthenticationError):
+                        transient = True
+                        state['abort'] = ('Błąd uwierzytelniania. Sprawdź email i hasło.', True)
+                    elif isinstance(error, ConnectFailed) and not state['abort']:
+                        state['abort'] = (f"Brak połączenia z serwerem SMTP: {describe_error(error)}", transient)
+                    if on_result is not None:
+                        on_result(recipient, results[recipient], transient)
+                condition.notify_all()
+
+        def worker() -> None:
+            with self.session_factory() as session:
+                while True:
+                    job = next_job()
+                    if job is None:
+                        return
+                    self.bucket.acquire()
+                    try:
+                        session.send(sender, job[3], job[4])
+                    except Exception as e:
+                        finish(job, e)
+                    else:
+                        finish(job, None)
+
+        started = time.monotonic()
+        threads = [
+            threading.Thread(target=worker, name=f"smtp-{index}", daemon=True)
+            for index in range(max(1, min(self.workers, len(jobs))))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.monotonic() - started
+        delivered = sum(1 for error in results.values() if error is None)
+        self.stats = {
+            'delivered': delivered,
+            'failed': len(results) - delivered,
+            'retries': state['retries'],
+            'elapsed': elapsed,
+            'messages_per_second': delivered / elapsed if elapsed > 0 else 0.0,
+        }
+        print(
+            f"[EMAIL] Wysłano {delivered}/{len(jobs)} w {elapsed:.1f}s "
+            f"({self.stats['messages_per_second']:.1f} wiad./s, połączenia: {len(threads)}, "
+            f"ponowienia: {state['retries']})"
+        )
+        return results
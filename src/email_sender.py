@@ -4,20 +4,30 @@ Obsługuje tworzenie i wysyłanie emaili przez SMTP.
 """
 
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Union
 import ssl
 from config import Config
+from delivery import ConnectFailed, DeliveryScheduler
+from metrics import get_metrics
+from outbox import Outbox
+from mime_stream import encode_html_body, iter_html_message, iter_mime_message, send_streamed_message
 
 
-def send_email(subject: str, html_content: str, recipient: Optional[str] = None) -> bool:
+# Błędy oznaczające zerwane połączenie - wiadomość można ponowić po ponownym połączeniu
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, ssl.SSLError, TimeoutError)
+
+
+def send_email(subject: str, html_content: Union[str, Iterable[str]], recipient: Optional[str] = None) -> bool:
     """
     Wysyła email HTML przez SMTP.
     
+    Treść może być iteratorem fragmentów (np. iter_newsletter_html) - jest wtedy
+    kodowana do base64 i wysyłana do serwera w trakcie renderowania.
+    
     Argumenty:
         subject: Temat emaila
-        html_content: Treść HTML emaila
+        html_content: Treść HTML emaila (cały tekst lub iterator fragmentów)
         recipient: Email odbiorcy (używa domyślnego z konfiguracji jeśli nie podano)
         
     Zwraca:
@@ -34,15 +44,8 @@ def send_email(subject: str, html_content: str, recipient: Optional[str] = None)
     to_email = recipient or config.EMAIL_RECIPIENT
     
     try:
-        # Tworzenie wiadomości
-        message = MIMEMultipart('alternative')
-        message['Subject'] = subject
-        message['From'] = config.EMAIL_SENDER
-        message['To'] = to_email
-        
-        # Dołączanie treści HTML
-        html_part = MIMEText(html_content, 'html', 'utf-8')
-        message.attach(html_part)
+        # Tworzenie wiadomości (generowana blokami podczas wysyłania)
+        message = iter_html_message(subject, config.EMAIL_SENDER, to_email, html_content)
         
         # Tworzenie połączenia SMTP
         print(f"[EMAIL] Łączenie z {config.SMTP_SERVER}:{config.SMTP_PORT}...")
@@ -57,7 +60,7 @@ def send_email(subject: str, html_content: str, recipient: Optional[str] = None)
             
             # Wysyłanie emaila
             print(f"Wysyłanie emaila do {to_email}...")
-            server.send_message(message)
+            send_streamed_message(server, config.EMAIL_SENDER, [to_email], message)
             
         print("[OK] Email wysłany pomyślnie!")
         return True
@@ -73,6 +76,184 @@ def send_email(subject: str, html_content: str, recipient: Optional[str] = None)
         return False
 
 
+class SmtpSession:
+    """
+    Uwierzytelnione połączenie SMTP używane do wysyłki wielu wiadomości.
+    
+    Łączy się przy pierwszej wysyłce, po zerwaniu połączenia łączy się ponownie
+    i ponawia wiadomość, a po max_messages wiadomościach otwiera nowe połączenie.
+    """
+    
+    def __init__(self, max_messages: Optional[int] = None,
+                 connect: Optional[Callable[[], smtplib.SMTP]] = None):
+        self.max_messages = max_messages or Config.SMTP_MAX_MESSAGES_PER_CONNECTION
+        self._connect = connect or open_smtp_connection
+        self.server: Optional[smtplib.SMTP] = None
+        self.sent_on_connection = 0
+        self.connections = 0
+    
+    def open(self) -> smtplib.SMTP:
+        """
+        Otwiera i uwierzytelnia nowe połączenie (zamykając poprzednie).
+        
+        Wyjątki:
+            smtplib.SMTPAuthenticationError przy błędnym loginie lub haśle
+            delivery.ConnectFailed, gdy nie udało się połączyć z serwerem
+        """
+        self.close()
+        try:
+            self.server = self._connect()
+        except smtplib.SMTPAuthenticationError:
+            raise
+        except (smtplib.SMTPException, OSError) as e:
+            raise ConnectFailed(e) from e
+        self.sent_on_connection = 0
+        self.connections += 1
+        return self.server
+    
+    def close(self) -> None:
+        """Zamyka połączenie (QUIT), ignorując błędy zerwanego połączenia."""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+    
+    def send(self, sender: str, recipient: str, message_factory: Callable[[], Iterable[bytes]]) -> None:
+        """
+        Wysyła jedną wiadomość, w razie zerwania połączenia łącząc się ponownie (jedna próba).
+        
+        Argumenty:
+            sender: Adres nadawcy
+            recipient: Adres odbiorcy
+            message_factory: Funkcja zwracająca bloki wiadomości (wywoływana przy każdej próbie)
+            
+        Wyjątki:
+            smtplib.SMTPException dla odrzuconej wiadomości
+            delivery.ConnectFailed, gdy nie udało się połączyć z serwerem
+        """
+        for attempt in range(2):
+            if self.server is None or self.sent_on_connection >= self.max_messages:
+                self.open()
+            try:
+                send_streamed_message(self.server, sender, [recipient], message_factory())
+            except CONNECTION_ERRORS:
+                # Serwer zamknął bezczynne połączenie lub przerwał transmisję
+                self.server.close()
+                self.server = None
+                if attempt:
+                    raise
+                continue
+            self.sent_on_connection += 1
+            return
+    
+    def __enter__(self) -> 'SmtpSession':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_smtp_connection() -> smtplib.SMTP:
+    """
+    Otwiera uwierzytelnione połączenie SMTP (SSL, port 465).
+    
+    Zwraca:
+        Obiekt połączenia SMTP
+        
+    Wyjątki:
+        smtplib.SMTPException lub OSError, jeśli połączenie albo logowanie się nie powiedzie
+    """
+    config = Config()
+    context = ssl.create_default_context()
+    server = smtplib.SMTP_SSL(config.SMTP_SERVER, config.SMTP_PORT, context=context, timeout=config.SMTP_TIMEOUT)
+    try:
+        server.login(config.EMAIL_SENDER, config.EMAIL_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def send_bulk_email(subject: str, html_content: Union[str, Iterable[str]],
+                    recipients: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+    """
+    Wysyła ten sam email HTML do wielu odbiorców przez pulę połączeń SMTP.
+    
+    Treść jest kodowana do base64 raz; każdy odbiorca dostaje osobną wiadomość
+    (z własnym nagłówkiem To). Liczbę połączeń, limit tempa i ponowienia
+    odpowiedzi 4xx ustawia konfiguracja (SMTP_WORKERS, SMTP_RATE_PER_MINUTE, ...).
+    
+    Argumenty:
+        subject: Temat emaila
+        html_content: Treść HTML emaila (cały tekst lub iterator fragmentów)
+        recipients: Lista odbiorców (domyślnie Config.EMAIL_RECIPIENTS)
+        
+    Zwraca:
+        Słownik odbiorca -> None (wysłano) lub opis błędu
+    """
+    config = Config()
+    recipients = recipients if recipients is not None else config.EMAIL_RECIPIENTS
+    
+    if not config.validate():
+        print("[BŁĄD] Nieprawidłowa konfiguracja email")
+        return {recipient: 'Nieprawidłowa konfiguracja email' for recipient in recipients}
+    
+    encoded_body = encode_html_body(html_content)
+    print(f"[EMAIL] Wysyłka zbiorcza do {len(recipients)} odbiorców przez {config.SMTP_SERVER}:{config.SMTP_PORT}...")
+    
+    jobs = [
+        (recipient, partial(iter_mime_message, subject, config.EMAIL_SENDER, recipient, encoded_body))
+        for recipient in recipients
+    ]
+    return DeliveryScheduler(SmtpSession).run(config.EMAIL_SENDER, jobs)
+
+
+def send_queued_email(outbox: Outbox, run_id: int, subject: str) -> Dict[str, Optional[str]]:
+    """
+    Wysyła oczekujących odbiorców wydania z trwałej kolejki przez pulę połączeń SMTP.
+    
+    Treść każdego segmentu jest już zakodowana w kolejce; wiadomości członków
+    segmentu różnią się jedynie nagłówkami (To, granica MIME). Wynik dla każdego
+    odbiorcy trafia do kolejki od razu po odpowiedzi serwera, więc przerwaną
+    wysyłkę można wznowić bez duplikatów.
+    
+    Argumenty:
+        outbox: Trwała kolejka wysyłki
+        run_id: Identyfikator wydania w kolejce
+        subject: Temat emaila
+        
+    Zwraca:
+        Słownik odbiorca -> None (wysłano) lub opis błędu (tylko odbiorcy z tej próby)
+    """
+    config = Config()
+    segments = list(outbox.pending(run_id))
+    
+    if not config.validate():
+        print("[BŁĄD] Nieprawidłowa konfiguracja email")
+        return {recipient: 'Nieprawidłowa konfiguracja email' for _, recipients in segments for recipient in recipients}
+    
+    jobs = []
+    for encoded, recipients in segments:
+        encoded_body = (encoded,)
+        jobs.extend(
+            (recipient, partial(iter_mime_message, subject, config.EMAIL_SENDER, recipient, encoded_body))
+            for recipient in recipients
+        )
+    print(
+        f"[EMAIL] Wysyłka do {len(jobs)} odbiorców ({len(segments)} wersji wydania) "
+        f"przez {config.SMTP_SERVER}:{config.SMTP_PORT}..."
+    )
+    scheduler = DeliveryScheduler(SmtpSession)
+    results = scheduler.run(config.EMAIL_SENDER, jobs, on_result=partial(outbox.record, run_id))
+    get_metrics().count(
+        items=scheduler.stats['delivered'], errors=scheduler.stats['failed'], retries=scheduler.stats['retries']
+    )
+    return results
+
+
 def create_smtp_connection() -> Optional[smtplib.SMTP_SSL]:
     """
     Tworzy i zwraca połączenie SMTP.
@@ -80,13 +261,8 @@ def create_smtp_connection() -> Optional[smtplib.SMTP_SSL]:
     Zwraca:
         Obiekt połączenia SMTP lub None w przypadku błędu
     """
-    config = Config()
-    
     try:
-        context = ssl.create_default_context()
-        server = smtplib.SMTP_SSL(config.SMTP_SERVER, config.SMTP_PORT, context=context)
-        server.login(config.EMAIL_SENDER, config.EMAIL_PASSWORD)
-        return server
+        return open_smtp_connection()
     except Exception as e:
         print(f"[BŁĄD] Nie udało się utworzyć połączenia SMTP: {e}")
         return None
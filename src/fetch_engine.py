@@ -0,0 +1,98 @@
+"""
+Silnik współbieżnego pobierania danych
+Uruchamia wszystkie źródła jednocześnie w puli wątków z limitami czasu
+dla pojedynczego źródła oraz dla całego przebiegu.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def run_concurrently(
+    tasks: Dict[Hashable, Callable[[], Any]],
+    source_timeout: float,
+    global_timeout: float,
+    max_workers: Optional[int] = None
+) -> Tuple[Dict[Hashable, Any], Dict[Hashable, str]]:
+    """
+    Uruchamia zadania pobierania równolegle i zbiera wyniki częściowe.
+
+    Zadania po terminie są porzucane, ale ich wątków nie da się przerwać - działają
+    do końca bieżącego żądania, a interpreter czeka na nie przy zakończeniu procesu.
+    Każde zadanie musi więc ograniczać swoje operacje sieciowe limitem czasu
+    (http_get domyślnie używa Config.HTTP_TIMEOUT).
+
+    Argumenty:
+        tasks: Słownik klucz źródła (np. nazwa lub krotka (sekcja, numer kanału)) -> funkcja
+               bez argumentów zwracająca dane
+        source_timeout: Maksymalny czas (s) pracy pojedynczego źródła
+        global_timeout: Maksymalny czas (s) oczekiwania na wszystkie źródła
+        max_workers: Liczba wątków (domyślnie po jednym na źródło)
+
+    Zwraca:
+        Krotka (wyniki, błędy):
+        - wyniki: klucz źródła -> zwrócone dane (tylko zakończone sukcesem)
+        - błędy: klucz źródła -> opis błędu lub przekroczenia czasu
+    """
+    results: Dict[Hashable, Any] = {}
+    errors: Dict[Hashable, str] = {}
+
+    if not tasks:
+        return results, errors
+
+    # Czas startu każdego zadania - termin źródła liczymy od chwili, gdy dostało wątek
+    start_times: Dict[Hashable, float] = {}
+
+    def timed(name: Hashable, func: Callable[[], Any]) -> Callable[[], Any]:
+        def runner() -> Any:
+            start_times[name] = time.monotonic()
+            return func()
+        return runner
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers or len(tasks),
+        thread_name_prefix='fetch'
+    )
+    global_deadline = time.monotonic() + global_timeout
+
+    try:
+        pending = {executor.submit(timed(name, func)): name for name, func in tasks.items()}
+
+        while pending:
+            now = time.monotonic()
+
+            # Odrzuć źródła, które przekroczyły swój własny limit czasu
+            for future, name in list(pending.items()):
+                started = start_times.get(name)
+                if started is not None and now - started >= source_timeout and not future.done():
+                    pending.pop(future)
+                    errors[name] = f"przekroczono limit czasu źródła ({source_timeout:g}s)"
+
+            if not pending or now >= global_deadline:
+                break
+
+            # Czekaj do najbliższego terminu: globalnego lub któregoś ze źródeł
+            deadline = global_deadline
+            for name in pending.values():
+                started = start_times.get(name)
+                if started is not None:
+                    deadline = min(deadline, started + source_timeout)
+
+            done, _ = wait(pending, timeout=max(deadline - now, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    errors[name] = str(e)
+
+        # Źródła niezakończone przed terminem globalnym
+        for future, name in pending.items():
+            future.cancel()
+            errors[name] = f"przekroczono globalny limit czasu ({global_timeout:g}s)"
+    finally:
+        # Nie czekamy na zawieszone wątki - zwracamy wyniki częściowe od razu
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results, errors
@@ -1,84 +1,21 @@
 """
 Generator szablonów HTML
 Tworzy piękne szablony wiadomości email dla newslettera.
+Szkielet dokumentu, style CSS i szablony sekcji są kompilowane raz przy imporcie,
+a każde renderowanie tylko wstawia dane i łączy fragmenty jeden raz.
+Pola wiadomości pochodzą z kanałów (bez sanityzacji feedparsera), więc są
+wstawiane jako tekst z kodowaniem HTML, a linki tylko ze schematem http(s).
 """
 
-from typing import List, Dict
+from html import escape
+from typing import List, Dict, Iterator, Optional
 from datetime import datetime
 
-
-def generate_newsletter_html(
-    world_news: List[Dict],
-    polish_news: List[Dict],
-    bankier_news: List[Dict],
-    financial_data: Dict
-) -> str:
-    """
-    Generuje kompletny newsletter HTML z pobranych danych.
-    
-    Argumenty:
-        world_news: Lista wiadomości ze świata
-        polish_news: Lista wiadomości z Polski
-        bankier_news: Lista wiadomości z Bankier.pl
-        financial_data: Słownik z danymi finansowymi
-        
-    Zwraca:
-        Kompletny ciąg HTML
-    """
-    current_date = datetime.now().strftime("%d.%m.%Y")
-    
-    html = f"""
-    <!DOCTYPE html>
-    <html lang="pl">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Codzienny Newsletter - {current_date}</title>
-        <style>
-            {get_css_styles()}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <!-- Nagłówek -->
-            <div class="header">
-                <h1>[NEWS] Codzienny Newsletter</h1>
-                <p class="date">{current_date}</p>
-            </div>
-            
-            <!-- Sekcja Wiadomości ze Świata -->
-            {create_news_section("[ŚWIAT] Wiadomości ze Świata", world_news, "world")}
-            
-            <!-- Sekcja Wiadomości z Polski -->
-            {create_news_section("[POLSKA] Wiadomości z Polski", polish_news, "poland")}
-            
-            <!-- Sekcja Wiadomości Bankier.pl -->
-            {create_news_section("💰 [FINANSE] Bankier.pl", bankier_news, "finance")}
-            
-            <!-- Sekcja Finansowa -->
-            {create_financial_section(financial_data.get('gold', {}), financial_data.get('silver', {}))}
-            
-            <!-- Stopka -->
-            <div class="footer">
-                <p>Newsletter wygenerowany automatycznie</p>
-                <p class="small">Dane pobrane: {datetime.now().strftime("%d.%m.%Y %H:%M")}</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    
-    return html
+from template_engine import CompiledTemplate, Fragment
 
 
-def get_css_styles() -> str:
-    """
-    Pobiera style CSS dla szablonu emaila.
-    
-    Zwraca:
-        Ciąg CSS
-    """
-    return """
+# Style CSS - stały tekst, wstawiany do każdego wydania bez ponownego budowania
+CSS_STYLES = """
         * {
             margin: 0;
             padding: 0;
@@ -180,6 +117,16 @@ def get_css_styles() -> str:
             line-height: 1.5;
         }
         
+        .news-alternatives {
+            font-size: 12px;
+            color: #7f8c8d;
+            margin-top: 6px;
+        }
+        
+        .news-alternatives a {
+            color: #667eea;
+        }
+        
         .authors {
             font-size: 13px;
             color: #7f8c8d;
@@ -275,6 +222,194 @@ def get_css_styles() -> str:
         }
     """
 
+DOCUMENT_TEMPLATE = CompiledTemplate("""
+    <!DOCTYPE html>
+    <html lang="pl">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Codzienny Newsletter - {current_date}</title>
+        <style>
+            {css}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <!-- Nagłówek -->
+            <div class="header">
+                <h1>[NEWS] Codzienny Newsletter</h1>
+                <p class="date">{current_date}</p>
+            </div>
+            
+            <!-- Sekcja Wiadomości ze Świata -->
+            {world_section}
+            
+            <!-- Sekcja Wiadomości z Polski -->
+            {polish_section}
+            
+            <!-- Sekcja Wiadomości Bankier.pl -->
+            {bankier_section}
+            
+            <!-- Sekcja Finansowa -->
+            {financial_section}
+            
+            <!-- Stopka -->
+            <div class="footer">
+                <p>Newsletter wygenerowany automatycznie</p>
+                <p class="small">Dane pobrane: {generated_at}</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """, 'document')
+
+NEWS_SECTION_TEMPLATE = CompiledTemplate("""
+    <div class="section {section_class}">
+        <h2 class="section-title">{title}</h2>
+        {items}
+    </div>
+    """, 'news_section')
+
+EMPTY_SECTION_TEMPLATE = CompiledTemplate("""
+        <div class="section {section_class}">
+            <h2 class="section-title">{title}</h2>
+            <p>{message}</p>
+        </div>
+        """, 'empty_section')
+
+NEWS_ITEM_TEMPLATE = CompiledTemplate("""
+        <div class="news-item">
+            <h3><a href="{link}" target="_blank">{title}</a></h3>
+            <div class="news-meta">[NEWS] {source} • {published}</div>
+            <div class="news-summary">{summary}</div>
+            {alternatives}
+            <a href="{link}" class="read-more" target="_blank">Czytaj więcej →</a>
+        </div>
+        """, 'news_item')
+
+ALTERNATIVE_LINK_TEMPLATE = CompiledTemplate("""<a href="{link}" target="_blank">{source}</a>""", 'alternative_link')
+
+ALTERNATIVES_TEMPLATE = CompiledTemplate('<div class="news-alternatives">Także: {links}</div>', 'alternatives')
+
+SCIENTIFIC_ITEM_TEMPLATE = CompiledTemplate("""
+        <div class="news-item">
+            <h3><a href="{link}" target="_blank">{title}</a></h3>
+            <div class="news-meta">📚 {source} • {published}</div>
+            <div class="authors">👥 {authors}</div>
+            <div class="news-summary">{summary}</div>
+            <a href="{link}" class="read-more" target="_blank">Czytaj publikację →</a>
+        </div>
+        """, 'scientific_item')
+
+INSTRUMENT_CARD_TEMPLATE = CompiledTemplate("""
+        <div class="metal-card">
+            <div class="metal-name">[{label}] {name}</div>
+            <div class="metal-price">{price}<span style="font-size: 16px; color: #7f8c8d;">{unit}</span></div>
+            <div class="metal-change {change_class}">
+                {arrow} Dziś: {daily_change}
+            </div>
+            <div class="metal-change {change_class}">
+                Miesiąc: {monthly_change}
+            </div>
+        </div>
+        """, 'instrument_card')
+
+INSTRUMENT_ERROR_TEMPLATE = CompiledTemplate("""
+        <div class="metal-card">
+            <div class="metal-name">⚠️ [{label}] {name}</div>
+            <div class="news-summary" style="text-align: center; padding: 20px;">
+                {error}
+            </div>
+        </div>
+        """, 'instrument_error')
+
+FINANCIAL_SECTION_TEMPLATE = CompiledTemplate("""
+    <div class="section financial">
+        <h2 class="section-title">📊 Rynki Finansowe</h2>
+        <div class="financial-grid">
+            {cards}
+        </div>
+        {trends}
+    </div>
+    """, 'financial_section')
+
+
+def generate_newsletter_html(
+    world_news: List[Dict],
+    polish_news: List[Dict],
+    bankier_news: List[Dict],
+    financial_data: Dict
+) -> str:
+    """
+    Generuje kompletny newsletter HTML z pobranych danych.
+    
+    Argumenty:
+        world_news: Lista wiadomości ze świata
+        polish_news: Lista wiadomości z Polski
+        bankier_news: Lista wiadomości z Bankier.pl
+        financial_data: Słownik z danymi finansowymi
+        
+    Sekcja przekazana jako None (niewybrana przez subskrybenta) jest pomijana.
+        
+    Zwraca:
+        Kompletny ciąg HTML
+    """
+    return ''.join(iter_newsletter_html(world_news, polish_news, bankier_news, financial_data))
+
+
+def iter_newsletter_html(
+    world_news: List[Dict],
+    polish_news: List[Dict],
+    bankier_news: List[Dict],
+    financial_data: Dict
+) -> Iterator[str]:
+    """
+    Renderuje newsletter jako kolejne fragmenty HTML (argumenty jak w generate_newsletter_html).
+    
+    Zwraca:
+        Iterator fragmentów dokumentu
+    """
+    now = datetime.now()
+    
+    return DOCUMENT_TEMPLATE.iter_render(
+        current_date=now.strftime("%d.%m.%Y"),
+        css=CSS_STYLES,
+        world_section=optional_section(world_news, "[ŚWIAT] Wiadomości ze Świata", "world"),
+        polish_section=optional_section(polish_news, "[POLSKA] Wiadomości z Polski", "poland"),
+        bankier_section=optional_section(bankier_news, "💰 [FINANSE] Bankier.pl", "finance"),
+        financial_section='' if financial_data is None else iter_financial_section(
+            financial_data.get('gold', {}),
+            financial_data.get('silver', {}),
+            [data for key, data in financial_data.items() if key not in ('gold', 'silver') and isinstance(data, dict)]
+        ),
+        generated_at=now.strftime("%d.%m.%Y %H:%M")
+    )
+
+
+def optional_section(news_items: Optional[List[Dict]], title: str, section_class: str) -> Fragment:
+    """Renderuje sekcję wiadomości albo pomija ją, gdy nie została wybrana (None)."""
+    if news_items is None:
+        return ''
+    return iter_news_section(title, news_items, section_class)
+
+
+def get_css_styles() -> str:
+    """
+    Pobiera style CSS dla szablonu emaila.
+    
+    Zwraca:
+        Ciąg CSS
+    """
+    return CSS_STYLES
+
+
+def safe_link(url: str) -> str:
+    """Zwraca adres do atrybutu href: http(s) z kodowaniem HTML, inne schematy (np. javascript:) jako '#'."""
+    url = url.strip()
+    if not url.lower().startswith(('http://', 'https://')):
+        return '#'
+    return escape(url)
+
 
 def create_news_section(title: str, news_items: List[Dict], section_class: str) -> str:
     """
@@ -288,31 +423,56 @@ def create_news_section(title: str, news_items: List[Dict], section_class: str)
     Zwraca:
         Ciąg HTML dla sekcji
     """
+    return ''.join(iter_news_section(title, news_items, section_class))
+
+
+def iter_news_section(title: str, news_items: List[Dict], section_class: str) -> Iterator[str]:
+    """
+    Renderuje sekcję wiadomości jako kolejne fragmenty (argumenty jak w create_news_section).
+    
+    Zwraca:
+        Iterator fragmentów HTML sekcji
+    """
     if not news_items:
-        return f"""
-        <div class="section {section_class}">
-            <h2 class="section-title">{title}</h2>
-            <p>Brak dostępnych wiadomości.</p>
-        </div>
-        """
+        return EMPTY_SECTION_TEMPLATE.iter_render(
+            section_class=section_class, title=title, message="Brak dostępnych wiadomości."
+        )
     
-    items_html = ""
-    for item in news_items:
-        items_html += f"""
-        <div class="news-item">
-            <h3><a href="{item.get('link', '#')}" target="_blank">{item.get('title', 'Brak tytułu')}</a></h3>
-            <div class="news-meta">[NEWS] {item.get('source', 'Nieznane źródło')} • {item.get('published', 'Nieznana data')}</div>
-            <div class="news-summary">{item.get('summary', 'Brak opisu')[:200]}...</div>
-            <a href="{item.get('link', '#')}" class="read-more" target="_blank">Czytaj więcej →</a>
-        </div>
-        """
+    # Jeden fragment na wiadomość
+    items = (
+        NEWS_ITEM_TEMPLATE.render(
+            link=safe_link(item.get('link', '#')),
+            title=escape(item.get('title', 'Brak tytułu')),
+            source=escape(item.get('source', 'Nieznane źródło')),
+            published=escape(item.get('published', 'Nieznana data')),
+            summary=escape(item.get('summary', 'Brak opisu')),
+            alternatives=create_alternatives_html(item.get('alternative_sources', []))
+        )
+        for item in news_items
+    )
+    return NEWS_SECTION_TEMPLATE.iter_render(section_class=section_class, title=title, items=items)
+
+
+def create_alternatives_html(alternatives: List[Dict]) -> str:
+    """
+    Tworzy listę innych źródeł, które opisały ten sam temat.
     
-    return f"""
-    <div class="section {section_class}">
-        <h2 class="section-title">{title}</h2>
-        {items_html}
-    </div>
+    Argumenty:
+        alternatives: Lista słowników z kluczami source i link
+        
+    Zwraca:
+        Ciąg HTML (pusty, jeśli brak innych źródeł)
     """
+    if not alternatives:
+        return ""
+    
+    links = ", ".join(
+        ALTERNATIVE_LINK_TEMPLATE.render(
+            link=safe_link(alt.get('link', '#')), source=escape(alt.get('source', 'Nieznane źródło'))
+        )
+        for alt in alternatives
+    )
+    return ALTERNATIVES_TEMPLATE.render(links=links)
 
 
 def create_scientific_section(title: str, articles: List[Dict]) -> str:
@@ -327,121 +487,95 @@ def create_scientific_section(title: str, articles: List[Dict]) -> str:
         Ciąg HTML dla sekcji
     """
     if not articles:
-        return f"""
-        <div class="section science">
-            <h2 class="section-title">{title}</h2>
-            <p>Brak dostępnych artykułów.</p>
-        </div>
-        """
+        return EMPTY_SECTION_TEMPLATE.render(
+            section_class="science", title=title, message="Brak dostępnych artykułów."
+        )
     
-    items_html = ""
-    for article in articles:
-        items_html += f"""
-        <div class="news-item">
-            <h3><a href="{article.get('link', '#')}" target="_blank">{article.get('title', 'Brak tytułu')}</a></h3>
-            <div class="news-meta">📚 {article.get('source', 'Nieznane źródło')} • {article.get('published', 'Nieznana data')}</div>
-            <div class="authors">👥 {article.get('authors', 'Nieznani autorzy')}</div>
-            <div class="news-summary">{article.get('summary', 'Brak abstraktu')}</div>
-            <a href="{article.get('link', '#')}" class="read-more" target="_blank">Czytaj publikację →</a>
-        </div>
-        """
+    items = ''.join(
+        SCIENTIFIC_ITEM_TEMPLATE.render(
+            link=safe_link(article.get('link', '#')),
+            title=escape(article.get('title', 'Brak tytułu')),
+            source=escape(article.get('source', 'Nieznane źródło')),
+            published=escape(article.get('published', 'Nieznana data')),
+            authors=escape(article.get('authors', 'Nieznani autorzy')),
+            summary=escape(article.get('summary', 'Brak abstraktu'))
+        )
+        for article in articles
+    )
+    return NEWS_SECTION_TEMPLATE.render(section_class="science", title=title, items=items)
+
+
+def create_instrument_card(instrument: Dict, label: Optional[str] = None, default_name: str = '') -> str:
+    """
+    Tworzy kartę instrumentu finansowego (złoto, srebro lub dowolny instrument z rejestru).
     
-    return f"""
-    <div class="section science">
-        <h2 class="section-title">{title}</h2>
-        {items_html}
-    </div>
+    Argumenty:
+        instrument: Słownik z danymi instrumentu
+        label: Etykieta karty (domyślnie z danych instrumentu)
+        default_name: Nazwa, gdy dane jej nie zawierają
+        
+    Zwraca:
+        Ciąg HTML karty
     """
+    name = instrument.get('name', default_name)
+    label = label or instrument.get('label', name.upper())
+    
+    # Nazwy z rejestru i opisy błędów (tekst wyjątków) wstawiane z kodowaniem HTML, jak pola kanałów
+    if 'error' in instrument:
+        return INSTRUMENT_ERROR_TEMPLATE.render(
+            label=escape(label), name=escape(name),
+            error=escape(str(instrument.get('error', 'Dane tymczasowo niedostępne')))
+        )
+    
+    rising = instrument.get('daily_change', 0) >= 0
+    currency = instrument.get('currency', 'USD')
+    symbol = '$' if currency == 'USD' else f' {currency}'
+    price_display = f"{symbol}{instrument.get('price', 'N/A')}" if currency == 'USD' else f"{instrument.get('price', 'N/A')}{symbol}"
+    
+    return INSTRUMENT_CARD_TEMPLATE.render(
+        label=escape(label),
+        name=escape(name),
+        price=escape(price_display),
+        unit=escape(f" / {instrument['unit']}") if instrument.get('unit') else "",
+        change_class='positive' if rising else 'negative',
+        arrow='↑' if rising else '↓',
+        daily_change=f"{instrument.get('daily_change', 0):+.2f} ({instrument.get('daily_change_percent', 0):+.2f}%)",
+        monthly_change=f"{instrument.get('weekly_change', 0):+.2f} ({instrument.get('weekly_change_percent', 0):+.2f}%)"
+    )
 
 
-def create_financial_section(gold, silver) -> str:
+def create_financial_section(gold, silver, extra_instruments: Optional[List[Dict]] = None) -> str:
     """
     Tworzy sekcję danych finansowych z cenami metali szlachetnych.
     
     Argumenty:
         gold: Słownik z danymi złota
         silver: Słownik z danymi srebra
+        extra_instruments: Pozostałe instrumenty z rejestru (karty w tej samej siatce)
         
     Zwraca:
         Ciąg HTML dla sekcji
     """
-    # Karta Złota
-    gold_has_error = 'error' in gold
-    if gold_has_error:
-        gold_html = f"""
-        <div class="metal-card">
-            <div class="metal-name">⚠️ [ZŁOTO] {gold.get('name', 'Złoto')}</div>
-            <div class="news-summary" style="text-align: center; padding: 20px;">
-                {gold.get('error', 'Dane tymczasowo niedostępne')}
-            </div>
-        </div>
-        """
-    else:
-        gold_change_class = 'positive' if gold.get('daily_change', 0) >= 0 else 'negative'
-        gold_arrow = '↑' if gold.get('daily_change', 0) >= 0 else '↓'
-        currency = gold.get('currency', 'USD')
-        symbol = '$' if currency == 'USD' else f' {currency}'
-        price_display = f"{symbol}{gold.get('price', 'N/A')}" if currency == 'USD' else f"{gold.get('price', 'N/A')}{symbol}"
-        unit_display = f" / {gold.get('unit', '')}" if gold.get('unit') else ""
-        
-        gold_html = f"""
-        <div class="metal-card">
-            <div class="metal-name">[ZŁOTO] {gold.get('name', 'Złoto')}</div>
-            <div class="metal-price">{price_display}<span style="font-size: 16px; color: #7f8c8d;">{unit_display}</span></div>
-            <div class="metal-change {gold_change_class}">
-                {gold_arrow} Dziś: {gold.get('daily_change', 0):+.2f} ({gold.get('daily_change_percent', 0):+.2f}%)
-            </div>
-            <div class="metal-change {gold_change_class}">
-                Miesiąc: {gold.get('weekly_change', 0):+.2f} ({gold.get('weekly_change_percent', 0):+.2f}%)
-            </div>
-        </div>
-        """
+    return ''.join(iter_financial_section(gold, silver, extra_instruments))
+
+
+def iter_financial_section(gold, silver, extra_instruments: Optional[List[Dict]] = None) -> Iterator[str]:
+    """
+    Renderuje sekcję finansową jako kolejne fragmenty (argumenty jak w create_financial_section).
     
-    # Karta Srebra
-    silver_has_error = 'error' in silver
-    if silver_has_error:
-        silver_html = f"""
-        <div class="metal-card">
-            <div class="metal-name">⚠️ [SREBRO] {silver.get('name', 'Srebro')}</div>
-            <div class="news-summary" style="text-align: center; padding: 20px;">
-                {silver.get('error', 'Dane tymczasowo niedostępne')}
-            </div>
-        </div>
-        """
-    else:
-        silver_change_class = 'positive' if silver.get('daily_change', 0) >= 0 else 'negative'
-        silver_arrow = '↑' if silver.get('daily_change', 0) >= 0 else '↓'
-        currency = silver.get('currency', 'USD')
-        symbol = '$' if currency == 'USD' else f' {currency}'
-        price_display = f"{symbol}{silver.get('price', 'N/A')}" if currency == 'USD' else f"{silver.get('price', 'N/A')}{symbol}"
-        
-        silver_html = f"""
-        <div class="metal-card">
-            <div class="metal-name">[SREBRO] {silver.get('name', 'Srebro')}</div>
-            <div class="metal-price">{price_display}</div>
-            <div class="metal-change {silver_change_class}">
-                {silver_arrow} Dziś: {silver.get('daily_change', 0):+.2f} ({silver.get('daily_change_percent', 0):+.2f}%)
-            </div>
-            <div class="metal-change {silver_change_class}">
-                Miesiąc: {silver.get('weekly_change', 0):+.2f} ({silver.get('weekly_change_percent', 0):+.2f}%)
-            </div>
-        </div>
-        """
+    Zwraca:
+        Iterator fragmentów HTML sekcji
+    """
+    cards = [
+        create_instrument_card(gold, 'ZŁOTO', 'Złoto'),
+        create_instrument_card(silver, 'SREBRO', 'Srebro'),
+    ]
+    cards.extend(create_instrument_card(instrument) for instrument in extra_instruments or [])
 
     # Trendy (Usunięte zgodnie z prośbą o czyszczenie)
     trends_html = "" # Brak trendów na razie
 
-    section_html = f"""
-    <div class="section financial">
-        <h2 class="section-title">📊 Rynki Finansowe</h2>
-        <div class="financial-grid">
-            {gold_html}
-            {silver_html}
-        </div>
-        {trends_html}
-    </div>
-    """
-    return section_html
+    return FINANCIAL_SECTION_TEMPLATE.iter_render(cards='\n            '.join(cards), trends=trends_html)
 
 
 if __name__ == "__main__":
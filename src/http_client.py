@@ -0,0 +1,89 @@
+"""
+Wspólny klient HTTP
+Jedna sesja requests dla wszystkich skraperów: pula połączeń keep-alive
+dla każdego hosta, ograniczone ponowienia z narastającym opóźnieniem
+oraz jeden nagłówek User-Agent.
+"""
+
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+from metrics import get_metrics
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def create_session() -> requests.Session:
+    """
+    Tworzy sesję HTTP z pulą połączeń i polityką ponowień.
+
+    Zwraca:
+        Skonfigurowana sesja requests
+    """
+    retry = Retry(
+        total=Config.HTTP_MAX_RETRIES,
+        backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=Config.HTTP_POOL_SIZE,
+        pool_maxsize=Config.HTTP_POOL_SIZE,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = Config.USER_AGENT
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Zwraca współdzieloną sesję HTTP (tworzoną przy pierwszym użyciu).
+
+    Zwraca:
+        Sesja requests używana przez wszystkie skrapery
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def http_get(url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+    """
+    Wykonuje żądanie GET przez współdzieloną sesję.
+    Ponowienia i rozmiar odpowiedzi (poza strumieniowymi) trafiają do metryk bieżącego źródła.
+
+    Argumenty:
+        url: Adres zasobu
+        timeout: Limit czasu w sekundach (domyślnie Config.HTTP_TIMEOUT)
+        **kwargs: Dodatkowe argumenty przekazywane do requests (headers, params, stream...)
+
+    Zwraca:
+        Odpowiedź HTTP
+    """
+    response = get_session().get(url, timeout=timeout or Config.HTTP_TIMEOUT, **kwargs)
+    get_metrics().record_response(response, streamed=kwargs.get('stream', False))
+    return response
+
+
+def close_session() -> None:
+    """Zamyka współdzieloną sesję i jej połączenia."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
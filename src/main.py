@@ -3,25 +3,44 @@ Główny koordynator Newslettera
 Zarządza wszystkimi komponentami w celu pobrania wiadomości i wysłania codziennego newslettera.
 """
 
+import argparse
 import sys
+import time
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 import traceback
+from functools import partial
 
 # Import wszystkich modułów
 from config import Config
-from scrapers.world_news import fetch_world_news
-from scrapers.polish_news import fetch_polish_news
-from scrapers.bankier_news import fetch_bankier_news
+from article_text import add_article_texts, prune_article_cache
+from scrapers.rss_pipeline import load_registry, fetch_feed_items, assemble_section
 from scrapers.financial_news import fetch_financial_data
-from html_template import generate_newsletter_html
-from email_sender import send_email
+from fetch_engine import run_concurrently
+from html_template import iter_newsletter_html
+from seen_index import get_seen_index
+from snapshot import load_snapshot, save_snapshot
+from ranking import rank_news
+from story_clustering import cluster_news
+from summarizer import summarize_news
+from email_sender import send_queued_email
+from metrics import get_metrics, reset_metrics
+from mime_stream import encode_html_body
+from outbox import FAILED, PENDING, Outbox
+from subscribers import (
+    all_served_today, candidate_depth, get_active_subscribers, get_due_subscribers, group_by_preferences, mark_subscribers_sent, merge_editions, select_edition
+)
 
 
-def main() -> int:
+def main(phase: str = 'all') -> int:
     """
     Główny punkt wejścia dla systemu newslettera.
     
+    Argumenty:
+        phase: 'all' - pobieranie, renderowanie i wysyłka w jednym przebiegu;
+               'send' - renderowanie i wysyłka z migawki fazy pobierania
+               (bez aktualnej migawki wiadomości są pobierane na miejscu)
+    
     Zwraca:
         Kod wyjścia (0 dla sukcesu, 1 dla błędu)
     """
@@ -30,6 +49,9 @@ def main() -> int:
     print("=" * 60)
     print(f"[CZAS] Rozpoczęto: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
+    # Czas, rozmiary i błędy etapów oraz źródeł - raport zapisuje log_execution
+    metrics = reset_metrics()
+    outbox = None
     
     try:
         # Krok 1: Walidacja konfiguracji
@@ -37,23 +59,59 @@ def main() -> int:
         config = Config()
         if not config.validate():
             print("[BŁĄD] Walidacja konfiguracji nie powiodła się!")
+            log_execution(success=False, error="Walidacja konfiguracji nie powiodła się")
             return 1
         config.display_config()
         print("[OK] Konfiguracja poprawna\n")
         
-        # Krok 2: Pobieranie wiadomości
-        print("[POBIERANIE] Krok 2: Pobieranie wiadomości ze wszystkich źródeł...")
-        news_data = collect_all_news()
-        print("[OK] Pobieranie wiadomości zakończone\n")
+        outbox = Outbox()
+        expired = outbox.expire()
+        if expired:
+            print(f"[OSTRZEŻENIE] Porzucono nieaktualne niedokończone wydania: {expired}")
         
-        # Krok 3: Generowanie newslettera HTML
-        print("[HTML] Krok 3: Generowanie newslettera HTML...")
-        html_content = generate_newsletter(news_data)
-        print("[OK] Newsletter HTML wygenerowany\n")
+        run = outbox.unfinished_run()
+        if run is not None:
+            # Przerwana wysyłka - treść jest już w kolejce, bez pobierania i renderowania
+            started = datetime.fromtimestamp(run['created_at']).strftime('%Y-%m-%d %H:%M')
+            print(f"[KOLEJKA] Wznawianie przerwanej wysyłki wydania z {started}\n")
+            run_id, subject = run['id'], run['subject']
+        else:
+            # Subskrybenci, którym należy się dzisiejsze wydanie
+            subscribers = get_due_subscribers()
+            if not subscribers:
+                print("[INFO] Brak subskrybentów oczekujących na wydanie - pomijanie uruchomienia")
+                log_execution(success=True)
+                return 0
+            print(f"[INFO] Subskrybenci do obsłużenia: {len(subscribers)}\n")
+            
+            # Krok 2: Pobieranie wiadomości (raz na uruchomienie, wspólne dla wszystkich)
+            news_data = load_snapshot() if phase == 'send' else None
+            if news_data is None:
+                print("[POBIERANIE] Krok 2: Pobieranie wiadomości ze wszystkich źródeł...")
+                news_data = gather_news(depth=candidate_depth(subscribers))
+                print("[OK] Pobieranie wiadomości zakończone\n")
+            else:
+                print("[MIGAWKA] Krok 2: Wiadomości z migawki fazy pobierania\n")
+            
+            # Krok 3: Generowanie newslettera HTML
+            print("[HTML] Krok 3: Generowanie newslettera HTML...")
+            with metrics.stage('render'):
+                run_id, subject = enqueue_newsletter(outbox, news_data, subscribers)
+            print("[OK] Wydania zapisane w kolejce wysyłki\n")
         
         # Krok 4: Wysyłanie emaila
         print("[EMAIL] Krok 4: Wysyłanie emaila z newsletterem...")
-        success = send_newsletter(html_content)
+        with metrics.stage('send'):
+            send_newsletter(outbox, run_id, subject)
+        
+        counts = outbox.counts(run_id)
+        delivered = outbox.delivered(run_id)
+        if delivered:
+            mark_subscribers_sent(delivered)
+            mark_articles_sent(merge_editions(outbox.delivered_editions(run_id)))
+        if not outbox.finish_if_done(run_id):
+            print(f"[KOLEJKA] Oczekuje na ponowienie: {counts[PENDING]} (wznowienie przy następnym uruchomieniu)")
+        success = counts[PENDING] == 0 and counts[FAILED] == 0
         
         if success:
             print("\n" + "=" * 60)
@@ -65,7 +123,7 @@ def main() -> int:
             print("\n" + "=" * 60)
             print("[BŁĄD] WYSYŁANIE NEWSLETTERA NIE POWIODŁO SIĘ!")
             print("=" * 60)
-            log_execution(success=False, error="Wysyłanie emaila nie powiodło się")
+            log_execution(success=False, error=f"Wysłano {len(delivered)}/{sum(counts.values())} wydań")
             return 1
             
     except Exception as e:
@@ -74,58 +132,128 @@ def main() -> int:
         traceback.print_exc()
         log_execution(success=False, error=str(e))
         return 1
+    finally:
+        # Połączenie z kolejką zamykane także po wyjątku (demon działa dalej)
+        if outbox is not None:
+            outbox.close()
+
+
+def collect_main() -> int:
+    """
+    Faza pobierania: zbiera i scala wiadomości, a wynik zapisuje jako migawkę
+    dla fazy wysyłki (main(phase='send')). Nie wymaga konfiguracji SMTP.
+    
+    Migawka zawiera Config.SNAPSHOT_SPARE_ITEMS kandydatów ponad potrzeby subskrybentów -
+    zastępują artykuły, które zostaną wysłane przed fazą wysyłki. Metryki trafiają do
+    Config.COLLECT_METRICS_REPORT_FILE; raport wydania i newsletter.log zapisuje tylko wysyłka.
+    
+    Zwraca:
+        Kod wyjścia (0 dla sukcesu, 1 dla błędu)
+    """
+    print(f"[MIGAWKA] Faza pobierania: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    metrics = reset_metrics()
+    try:
+        limits = [section['limit'] for section in load_registry()['sections'].values()]
+        depth = max([candidate_depth(get_active_subscribers()), *limits]) + Config.SNAPSHOT_SPARE_ITEMS
+        news_data = gather_news(depth=depth)
+        save_snapshot(news_data)
+        print(f"[OK] Zapisano migawkę wiadomości: {Config.SNAPSHOT_FILE}")
+        metrics.write(success=True, report_file=Config.COLLECT_METRICS_REPORT_FILE)
+        return 0
+    except Exception as e:
+        print(f"[BŁĄD] Faza pobierania nie powiodła się: {e}")
+        traceback.print_exc()
+        metrics.write(success=False, error=str(e), report_file=Config.COLLECT_METRICS_REPORT_FILE)
+        return 1
+
+
+def gather_news(depth: int = 0) -> Dict:
+    """
+    Pobiera wiadomości ze wszystkich źródeł i scala duplikaty (etapy collect i cluster),
+    wybiera najlepsze wiadomości każdej sekcji (etap rank),
+    przy Config.ARTICLE_TEXT_ENABLED dołącza pełną treść artykułów (etap extract),
+    a na koniec zastępuje opisy streszczeniami (etap summarize).
+    
+    Argumenty:
+        depth: Liczba kandydatów zostawianych w sekcji, gdy jest większa niż jej limit
+               (największe items_per_section subskrybentów)
+    
+    Zwraca:
+        Dane wiadomości gotowe do renderowania
+    """
+    metrics = get_metrics()
+    with metrics.stage('collect'):
+        news_data = collect_all_news()
+    with metrics.stage('cluster'):
+        news_data = cluster_news(news_data)
+    # Przed pobieraniem treści artykułów - pobierane są tylko wybrane wiadomości
+    with metrics.stage('rank'):
+        news_data = rank_news(news_data, load_registry()['sections'], depth=depth)
+    if Config.ARTICLE_TEXT_ENABLED:
+        with metrics.stage('extract'):
+            add_article_texts(news_data)
+            prune_article_cache()
+    with metrics.stage('summarize'):
+        metrics.count(items=summarize_news(news_data))
+    return news_data
 
 
 def collect_all_news() -> Dict:
     """
-    Pobiera wiadomości ze wszystkich źródeł.
+    Pobiera wiadomości ze wszystkich źródeł jednocześnie.
+    
+    Każdy kanał z rejestru źródeł oraz dane finansowe to osobne zadanie.
+    Źródło, które nie zmieści się w limicie czasu, zostaje pominięte,
+    a newsletter powstaje z wyników częściowych.
     
     Zwraca:
         Słownik zawierający wszystkie pobrane dane wiadomości
     """
-    news_data = {
-        'world_news': [],
-        'polish_news': [],
-        'bankier_news': [],
-        'financial_data': {}
-    }
+    sections = load_registry()['sections']
+    news_data = {name: [] for name in sections}
+    news_data['financial_data'] = {}
     
-    # Pobieranie wiadomości ze świata
-    try:
-        print("  [ŚWIAT] Pobieranie wiadomości ze świata...")
-        news_data['world_news'] = fetch_world_news()
-        print(f"     [OK] Pobrano {len(news_data['world_news'])} wiadomości ze świata")
-    except Exception as e:
-        print(f"     [OSTRZEŻENIE] Błąd podczas pobierania wiadomości ze świata: {e}")
+    # Jedno zadanie na kanał - sekcje składamy dopiero po zebraniu wyników
+    metrics = get_metrics()
+    source_names = {'financial_data': 'financial_data'}
+    tasks = {}
+    for name, section in sections.items():
+        for index, feed in enumerate(section['feeds']):
+            source_names[(name, index)] = f"{name}/{feed['name']}"
+            tasks[(name, index)] = partial(fetch_feed_items, feed, section['cleaning'])
+    tasks['financial_data'] = fetch_financial_data
+    tasks = {key: metrics.track(source_names[key], task) for key, task in tasks.items()}
     
-    # Pobieranie wiadomości z Polski
-    try:
-        print("  [POLSKA] Pobieranie wiadomości z Polski...")
-        news_data['polish_news'] = fetch_polish_news()
-        print(f"     [OK] Pobrano {len(news_data['polish_news'])} wiadomości z Polski")
-    except Exception as e:
-        print(f"     [OSTRZEŻENIE] Błąd podczas pobierania wiadomości z Polski: {e}")
+    print(f"  [RÓWNOLEGLE] Uruchamianie {len(tasks)} źródeł jednocześnie...")
+    started = time.monotonic()
+    results, errors = run_concurrently(
+        tasks,
+        source_timeout=Config.FETCH_SOURCE_TIMEOUT,
+        global_timeout=Config.FETCH_GLOBAL_TIMEOUT
+    )
+    for key, error in errors.items():
+        metrics.error(error, source=source_names[key])
     
-    # Pobieranie wiadomości z Bankiera (zamiast Tech)
-    try:
-        print("  [BANKIER] Pobieranie wiadomości z Bankier.pl...")
-        news_data['bankier_news'] = fetch_bankier_news()
-        print(f"     [OK] Pobrano {len(news_data['bankier_news'])} wiadomości z Bankiera")
-    except Exception as e:
-        print(f"     [OSTRZEŻENIE] Błąd podczas pobierania wiadomości z Bankiera: {e}")
+    for name, section in sections.items():
+        feed_items = []
+        for index, feed in enumerate(section['feeds']):
+            if (name, index) in errors:
+                print(f"     [{section['label']}] [OSTRZEŻENIE] {feed['name']}: {errors[(name, index)]}")
+            feed_items.append(results.get((name, index), []))
+        news_data[name] = assemble_section(section, feed_items)
+        print(f"     [{section['label']}] [OK] Pobrano {len(news_data[name])} kandydatów - {section['description']}")
     
-    # Pobieranie danych finansowych
-    try:
-        print("  [FINANSE] Pobieranie danych finansowych...")
-        news_data['financial_data'] = fetch_financial_data()
-        print(f"     [OK] Pobrano dane finansowe (Złoto, Srebro, Trendy)")
-    except Exception as e:
-        print(f"     [OSTRZEŻENIE] Błąd podczas pobierania danych finansowych: {e}")
+    if 'financial_data' in results:
+        news_data['financial_data'] = results['financial_data']
+        print("     [FINANSE] [OK] Pobrano dane finansowe (Złoto, Srebro, Trendy)")
+    else:
+        print(f"     [FINANSE] [OSTRZEŻENIE] Błąd podczas pobierania danych finansowych: {errors.get('financial_data')}")
     
+    print(f"  [CZAS] Pobieranie zakończone w {time.monotonic() - started:.1f}s")
     return news_data
 
 
-def generate_newsletter(news_data: Dict) -> str:
+def generate_newsletter(news_data: Dict) -> Iterator[str]:
     """
     Generuje newsletter HTML z pobranych danych.
     
@@ -133,33 +261,88 @@ def generate_newsletter(news_data: Dict) -> str:
         news_data: Słownik zawierający wszystkie pobrane wiadomości
         
     Zwraca:
-        Treść HTML newslettera
+        Iterator fragmentów HTML newslettera (renderowanych przy odczycie)
     """
     # Generowanie HTML
-    html_content = generate_newsletter_html(
-        world_news=news_data['world_news'],
-        polish_news=news_data['polish_news'],
-        bankier_news=news_data['bankier_news'],
-        financial_data=news_data['financial_data']
+    html_content = iter_newsletter_html(
+        world_news=news_data.get('world_news', []),
+        polish_news=news_data.get('polish_news', []),
+        bankier_news=news_data.get('bankier_news', []),
+        financial_data=news_data.get('financial_data', {})
     )
     
     return html_content
 
 
-def send_newsletter(html_content: str) -> bool:
+def enqueue_newsletter(outbox: Outbox, news_data: Dict, subscribers: List[Dict]) -> Tuple[int, str]:
     """
-    Wysyła email z newsletterem.
+    Renderuje wydania i zapisuje je w trwałej kolejce wysyłki.
+    
+    Subskrybenci o jednakowych preferencjach tworzą segment - jego wydanie
+    jest renderowane i kodowane raz, a w kolejce zapisane jeden raz.
     
     Argumenty:
-        html_content: Treść HTML do wysłania
+        outbox: Trwała kolejka wysyłki
+        news_data: Wspólne dane pobrane w tym uruchomieniu
+        subscribers: Subskrybenci do obsłużenia
         
     Zwraca:
-        True jeśli wysłano pomyślnie, False w przeciwnym razie
+        Para (identyfikator wydania w kolejce, temat emaila)
     """
     current_date = datetime.now().strftime("%d.%m.%Y")
     subject = f"[NEWS] Codzienny Newsletter - {current_date}"
     
-    return send_email(subject=subject, html_content=html_content)
+    segments = []
+    for members in group_by_preferences(subscribers).values():
+        edition = select_edition(news_data, members[0])
+        encoded = b''.join(encode_html_body(generate_newsletter(edition)))
+        segments.append((encoded, edition, [member['email'] for member in members]))
+    print(f"  Wersje wydania: {len(segments)} dla {len(subscribers)} subskrybentów")
+    get_metrics().count(items=len(segments), bytes=sum(len(encoded) for encoded, _, _ in segments))
+    
+    return outbox.create_run(subject, segments), subject
+
+
+def send_newsletter(outbox: Outbox, run_id: int, subject: str) -> Dict[str, Optional[str]]:
+    """
+    Wysyła oczekujących odbiorców wydania z kolejki.
+    
+    Argumenty:
+        outbox: Trwała kolejka wysyłki
+        run_id: Identyfikator wydania w kolejce
+        subject: Temat emaila
+        
+    Zwraca:
+        Słownik odbiorca -> None (wysłano) lub opis błędu
+    """
+    return send_queued_email(outbox, run_id, subject)
+
+
+def mark_articles_sent(news_data: Dict) -> None:
+    """
+    Zapisuje wysłane artykuły w indeksie, aby nie powtarzały się w kolejnych wydaniach.
+    
+    Dopóki tego dnia czekają jeszcze inni subskrybenci (np. z późniejszą godziną wysyłki),
+    artykuły są zapisywane jako oczekujące i trafią także do ich wydań.
+    
+    Argumenty:
+        news_data: Słownik z pobranymi wiadomościami (sekcje jako listy)
+    """
+    seen = get_seen_index()
+    if seen is None:
+        return
+    
+    for key, items in news_data.items():
+        if isinstance(items, list):
+            seen.add(items, pending=True)
+            # Scalone duplikaty z innych źródeł też uznajemy za wysłane
+            seen.add((alt for item in items for alt in item.get('alternative_sources', [])), pending=True)
+    if all_served_today():
+        seen.commit_pending()
+        print(f"[INDEKS] Zapamiętano wysłane artykuły (w indeksie: {len(seen)} kluczy)")
+    else:
+        print("[INDEKS] Wysłane artykuły oczekują na obsłużenie pozostałych subskrybentów dzisiaj")
+    seen.save()
 
 
 def log_execution(success: bool, error: str = None) -> None:
@@ -179,6 +362,9 @@ def log_execution(success: bool, error: str = None) -> None:
     
     print(f"\n[LOG] {log_message}")
     
+    # Raport metryk uruchomienia (JSON i opcjonalnie Prometheus)
+    get_metrics().write(success, error)
+    
     # Opcjonalnie zapisz do pliku logów
     try:
         with open('newsletter.log', 'a', encoding='utf-8') as f:
@@ -188,5 +374,10 @@ def log_execution(success: bool, error: str = None) -> None:
 
 
 if __name__ == "__main__":
-    exit_code = main()
+    parser = argparse.ArgumentParser(description='Codzienny newsletter')
+    parser.add_argument('phase', nargs='?', choices=('all', 'collect', 'send'), default='all',
+                        help="all - jeden przebieg (domyślnie); collect - tylko migawka wiadomości; "
+                             "send - renderowanie i wysyłka z migawki")
+    args = parser.parse_args()
+    exit_code = collect_main() if args.phase == 'collect' else main(args.phase)
     sys.exit(exit_code)
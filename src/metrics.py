@@ -0,0 +1,238 @@
+"""
+Metryki uruchomienia
+Zbiera czas trwania, pobrane bajty, liczbę elementów, ponowienia i błędy
+dla etapów potoku (pobieranie, renderowanie, wysyłka) i dla każdego źródła.
+Na koniec uruchomienia zapisuje raport JSON oraz opcjonalnie plik tekstowy
+w formacie Prometheus (np. dla node_exporter textfile collector).
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from config import Config
+
+
+# Liczniki zbierane dla każdego etapu i źródła
+COUNTERS = ('seconds', 'bytes', 'items', 'retries', 'errors')
+
+# Bieżący etap i źródło (ustawiane w wątku, który wykonuje pracę)
+_current_stage: ContextVar[Optional[str]] = ContextVar('metrics_stage', default=None)
+_current_source: ContextVar[Optional[str]] = ContextVar('metrics_source', default=None)
+
+
+def new_entry() -> Dict:
+    return {counter: 0 for counter in COUNTERS}
+
+
+class RunMetrics:
+    """Metryki jednego uruchomienia newslettera (bezpieczne wątkowo)."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.stages: Dict[str, Dict] = {}
+        self.sources: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, kind: str, name: str) -> Dict:
+        entries = self.stages if kind == 'stage' else self.sources
+        if name not in entries:
+            entries[name] = new_entry()
+        return entries[name]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Mierzy etap potoku; liczniki bez bieżącego źródła trafiają do etapu."""
+        token = _current_stage.set(name)
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.error(str(e), stage=name)
+            raise
+        finally:
+            _current_stage.reset(token)
+            with self._lock:
+                self._entry('stage', name)['seconds'] += time.monotonic() - started
+
+    @contextmanager
+    def source(self, name: str) -> Iterator[None]:
+        """Mierzy źródło danych; liczniki w tym bloku (i żądania HTTP) trafiają do źródła."""
+        token = _current_source.set(name)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            _current_source.reset(token)
+            with self._lock:
+                self._entry('source', name)['seconds'] += time.monotonic() - started
+
+    def track(self, name: str, func: Callable) -> Callable:
+        """
+        Opakowuje zadanie pobierania: mierzy je jako źródło i liczy zwrócone elementy.
+
+        Argumenty:
+            name: Nazwa źródła w raporcie
+            func: Funkcja bez argumentów (np. zadanie dla run_concurrently)
+        """
+        def tracked():
+            with self.source(name):
+                result = func()
+                if isinstance(result, (list, dict)):
+                    self.count(items=len(result))
+                return result
+        return tracked
+
+    def _target(self, source: Optional[str], stage: Optional[str]) -> Optional[Dict]:
+        """Wybiera wpis: podane źródło lub etap, domyślnie bieżące źródło, potem bieżący etap."""
+        if source is None and stage is None:
+            source = _current_source.get()
+            if source is None:
+                stage = _current_stage.get()
+        if source is not None:
+            return self._entry('source', source)
+        if stage is not None:
+            return self._entry('stage', stage)
+        return None
+
+    def count(self, source: Optional[str] = None, stage: Optional[str] = None, **counters: float) -> None:
+        """
+        Dodaje wartości liczników (bytes, items, retries, errors) do źródła lub etapu.
+
+        Liczniki poza jakimkolwiek etapem i źródłem są pomijane.
+        """
+        with self._lock:
+            entry = self._target(source, stage)
+            if entry is not None:
+                for counter, value in counters.items():
+                    entry[counter] = entry.get(counter, 0) + value
+
+    def error(self, message: str, source: Optional[str] = None, stage: Optional[str] = None) -> None:
+        """Zlicza błąd i zapamiętuje jego opis (ostatni dla danego źródła lub etapu)."""
+        with self._lock:
+            entry = self._target(source, stage)
+            if entry is not None:
+                entry['errors'] += 1
+                entry['last_error'] = message
+
+    def record_response(self, response, streamed: bool = False) -> None:
+        """Zlicza ponowienia żądania HTTP i (dla odpowiedzi niestrumieniowych) pobrane bajty."""
+        retries = getattr(getattr(response.raw, 'retries', None), 'history', ())
+        counters = {'retries': len(retries)} if retries else {}
+        if not streamed:
+            counters['bytes'] = len(response.content)
+        if counters:
+            self.count(**counters)
+
+    def iter_counted(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Przekazuje bloki odpowiedzi strumieniowej, zliczając pobrane bajty."""
+        # Konsument generatora może działać poza kontekstem źródła - cel ustalamy od razu
+        with self._lock:
+            entry = self._target(None, None)
+        for chunk in chunks:
+            if entry is not None:
+                with self._lock:
+                    entry['bytes'] += len(chunk)
+            yield chunk
+
+    def report(self, success: bool, error: Optional[str] = None) -> Dict:
+        """Zwraca raport uruchomienia jako słownik gotowy do zapisu w JSON."""
+        finished_at = time.time()
+        with self._lock:
+            return {
+                'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+                'finished_at': datetime.fromtimestamp(finished_at).isoformat(timespec='seconds'),
+                'duration_seconds': round(finished_at - self.started_at, 3),
+                'success': success,
+                'error': error,
+                'stages': {name: rounded(entry) for name, entry in self.stages.items()},
+                'sources': {name: rounded(entry) for name, entry in sorted(self.sources.items())},
+            }
+
+    def write(self, success: bool, error: Optional[str] = None, report_file: Optional[str] = None) -> Dict:
+        """
+        Zapisuje raport JSON (Config.METRICS_REPORT_FILE) i plik Prometheus
+        (Config.METRICS_PROMETHEUS_FILE, jeśli ustawiony).
+
+        Argumenty:
+            success: Czy uruchomienie się powiodło
+            error: Komunikat błędu
+            report_file: Zapisz tylko raport JSON pod tą ścieżką (np. faza pobierania),
+                         bez nadpisywania raportu wydania i pliku Prometheus
+
+        Zwraca:
+            Zapisany raport
+        """
+        report = self.report(success, error)
+        if report_file:
+            write_atomic(report_file, json.dumps(report, ensure_ascii=False, indent=2))
+            return report
+        if Config.METRICS_REPORT_FILE:
+            write_atomic(Config.METRICS_REPORT_FILE, json.dumps(report, ensure_ascii=False, indent=2))
+        if Config.METRICS_PROMETHEUS_FILE:
+            write_atomic(Config.METRICS_PROMETHEUS_FILE, to_prometheus(report))
+        return report
+
+
+def rounded(entry: Dict) -> Dict:
+    return {key: round(value, 3) if isinstance(value, float) else value for key, value in entry.items()}
+
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_prometheus(report: Dict) -> str:
+    """Zamienia raport na format tekstowy Prometheus (wartości typu gauge)."""
+    lines = [
+        '# HELP newsletter_run_success Czy ostatnie uruchomienie zakończyło się sukcesem.',
+        '# TYPE newsletter_run_success gauge',
+        f"newsletter_run_success {int(report['success'])}",
+        '# HELP newsletter_run_duration_seconds Czas trwania ostatniego uruchomienia.',
+        '# TYPE newsletter_run_duration_seconds gauge',
+        f"newsletter_run_duration_seconds {report['duration_seconds']}",
+        '# HELP newsletter_run_timestamp_seconds Czas zakończenia ostatniego uruchomienia (epoch).',
+        '# TYPE newsletter_run_timestamp_seconds gauge',
+        f"newsletter_run_timestamp_seconds {int(time.time())}",
+    ]
+    for kind, label in (('stages', 'stage'), ('sources', 'source')):
+        for counter in COUNTERS:
+            metric = f"newsletter_{label}_{counter}"
+            lines.append(f"# TYPE {metric} gauge")
+            for name, entry in report[kind].items():
+                lines.append(f'{metric}{{{label}="{escape_label(name)}"}} {entry.get(counter, 0)}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_atomic(path: str, content: str) -> None:
+    """Zapisuje plik atomowo (plik tymczasowy + zamiana nazwy)."""
+    try:
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[OSTRZEŻENIE] Nie można zapisać raportu metryk {path}: {e}")
+
+
+_metrics = RunMetrics()
+
+
+def get_metrics() -> RunMetrics:
+    """Zwraca metryki bieżącego uruchomienia."""
+    return _metrics
+
+
+def reset_metrics() -> RunMetrics:
+    """Rozpoczyna nowy zestaw metryk (kolejne uruchomienie w tym samym procesie)."""
+    global _metrics
+    _metrics = RunMetrics()
+    return _metrics
@@ -0,0 +1,215 @@
+"""
+Strumieniowe kodowanie wiadomości MIME
+Buduje wiadomość multipart/alternative z treścią HTML fragment po fragmencie:
+każdy fragment z renderera jest od razu kodowany do base64 i wysyłany do
+serwera SMTP, więc w pamięci nie powstaje ani pełny HTML, ani pełna wiadomość.
+"""
+
+import base64
+import smtplib
+import socket
+import uuid
+from email.policy import SMTP as SMTP_POLICY
+from email.utils import formatdate, make_msgid, parseaddr
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+
+# Bajty treści na linię base64 (57 bajtów -> 76 znaków, limit RFC 2045)
+LINE_BYTES = 57
+
+# Rozmiar porcji kodowanej naraz - wielokrotność LINE_BYTES, by linie nie były dzielone
+BLOCK_BYTES = LINE_BYTES * 128
+
+# Minimalny rozmiar pojedynczego zapisu do gniazda podczas DATA
+SEND_BYTES = 64 * 1024
+
+CRLF = b'\r\n'
+
+
+def iter_base64_lines(chunks: Iterable[str], encoding: str = 'utf-8') -> Iterator[bytes]:
+    """
+    Koduje kolejne fragmenty tekstu do base64 w liniach po 76 znaków (CRLF).
+
+    Argumenty:
+        chunks: Fragmenty tekstu (np. z iter_newsletter_html)
+        encoding: Kodowanie znaków treści
+
+    Zwraca:
+        Iterator bloków bajtów złożonych z pełnych linii base64
+    """
+    pending = bytearray()
+    for chunk in chunks:
+        pending += chunk.encode(encoding)
+        if len(pending) >= BLOCK_BYTES:
+            usable = len(pending) - len(pending) % LINE_BYTES
+            yield base64.encodebytes(pending[:usable]).replace(b'\n', CRLF)
+            del pending[:usable]
+
+    if pending:
+        yield base64.encodebytes(pending).replace(b'\n', CRLF)
+
+
+def fold_header(name: str, value: str) -> str:
+    """Zwraca nagłówek zawinięty do 78 znaków, ze znakami spoza ASCII zakodowanymi wg RFC 2047."""
+    return SMTP_POLICY.header_factory(name, value).fold(policy=SMTP_POLICY)
+
+
+def encode_html_body(html_chunks: Union[str, Iterable[str]]) -> List[bytes]:
+    """
+    Koduje treść HTML do base64 jeden raz - do wielokrotnego użycia w wielu wiadomościach.
+
+    Zwraca:
+        Lista bloków linii base64 (jedyna pełna kopia treści w pamięci)
+    """
+    if isinstance(html_chunks, str):
+        html_chunks = (html_chunks,)
+    return list(iter_base64_lines(html_chunks))
+
+
+@lru_cache(maxsize=None)
+def local_domain() -> str:
+    """Nazwa hosta do Message-ID (socket.getfqdn może pytać DNS - raz na proces)."""
+    return socket.getfqdn()
+
+
+def message_id(sender: str) -> str:
+    """Zwraca nowy nagłówek Message-ID w domenie nadawcy (bez niej - w domenie hosta)."""
+    _, at, domain = parseaddr(sender)[1].rpartition('@')
+    return make_msgid(domain=domain if at and domain else local_domain())
+
+
+def iter_mime_message(subject: str, sender: str, recipient: str,
+                      encoded_body: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Otacza zakodowaną (base64) treść HTML nagłówkami wiadomości multipart/alternative.
+
+    Struktura jest taka sama jak przy MIMEMultipart('alternative') z jedną częścią
+    MIMEText(html, 'html', 'utf-8'); nagłówki z polskimi znakami są kodowane (RFC 2047).
+    Każda wiadomość dostaje własne nagłówki Date i Message-ID (jak w newsletter_app.py).
+
+    Argumenty:
+        subject: Temat emaila
+        sender: Adres nadawcy
+        recipient: Adres odbiorcy (lub kilka, oddzielonych przecinkami)
+        encoded_body: Bloki linii base64 treści HTML
+
+    Zwraca:
+        Iterator bloków bajtów wiadomości (linie zakończone CRLF)
+    """
+    boundary = f"==============={uuid.uuid4().hex}=="
+    headers = [
+        f'Content-Type: multipart/alternative; boundary="{boundary}"\r\n',
+        'MIME-Version: 1.0\r\n',
+        fold_header('Subject', subject),
+        fold_header('From', sender),
+        fold_header('To', recipient),
+        f'Date: {formatdate(localtime=True)}\r\n',
+        f'Message-ID: {message_id(sender)}\r\n',
+        '\r\n',
+        f'--{boundary}\r\n',
+        'Content-Type: text/html; charset="utf-8"\r\n',
+        'MIME-Version: 1.0\r\n',
+        'Content-Transfer-Encoding: base64\r\n',
+        '\r\n',
+    ]
+    yield ''.join(headers).encode('ascii')
+    yield from encoded_body
+    yield f'--{boundary}--\r\n'.encode('ascii')
+
+
+def iter_html_message(subject: str, sender: str, recipient: str,
+                      html_chunks: Union[str, Iterable[str]]) -> Iterator[bytes]:
+    """
+    Zwraca wiadomość z treścią HTML jako kolejne bloki bajtów, kodując treść w locie.
+
+    Argumenty:
+        subject: Temat emaila
+        sender: Adres nadawcy
+        recipient: Adres odbiorcy
+        html_chunks: Treść HTML - cały tekst albo iterator fragmentów
+
+    Zwraca:
+        Iterator bloków bajtów wiadomości (linie zakończone CRLF)
+    """
+    if isinstance(html_chunks, str):
+        html_chunks = (html_chunks,)
+    return iter_mime_message(subject, sender, recipient, iter_base64_lines(html_chunks))
+
+
+def send_streamed_message(server: smtplib.SMTP, sender: str, recipients: List[str],
+                          message_chunks: Iterable[bytes]) -> Dict[str, Tuple[int, bytes]]:
+    """
+    Wysyła wiadomość blokami przez otwarte połączenie SMTP (MAIL, RCPT, DATA).
+
+    Odpowiednik server.sendmail(), który nie wymaga całej wiadomości w pamięci.
+    Bloki muszą zawierać pełne linie zakończone CRLF; linie base64, nagłówki
+    i granice MIME nie zaczynają się od kropki, więc nie wymagają podwajania kropek.
+    Błąd w trakcie generowania treści zamyka połączenie - rozpoczętej transmisji
+    DATA nie da się przerwać inaczej.
+
+    Argumenty:
+        server: Połączenie SMTP (po zalogowaniu)
+        sender: Adres nadawcy (MAIL FROM)
+        recipients: Adresy odbiorców (RCPT TO)
+        message_chunks: Bloki bajtów wiadomości (np. z iter_html_message)
+
+    Zwraca:
+        Słownik odrzuconych odbiorców: adres -> (kod, odpowiedź serwera)
+
+    Wyjątki:
+        smtplib.SMTPSenderRefused, SMTPRecipientsRefused, SMTPDataError - jak sendmail()
+    """
+    server.ehlo_or_helo_if_needed()
+
+    code, response = server.mail(sender)
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPSenderRefused(code, response, sender)
+
+    refused = {}
+    for recipient in recipients:
+        code, response = server.rcpt(recipient)
+        if code not in (250, 251):
+            refused[recipient] = (code, response)
+    if len(refused) == len(recipients):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    server.putcmd('data')
+    code, response = server.getreply()
+    if code != 354:
+        server.rset()
+        raise smtplib.SMTPDataError(code, response)
+
+    # Małe bloki są łączone w większe zapisy, a kropka kończąca DATA dołączana do
+    # ostatniego - inaczej algorytm Nagle'a czeka na opóźnione ACK serwera (~40 ms na wiadomość).
+    # Duże bloki (np. cała treść segmentu z kolejki) idą do gniazda bez kopiowania:
+    # pełne wielokrotności SEND_BYTES jako memoryview, do bufora trafia tylko reszta.
+    pending = bytearray()
+    try:
+        for chunk in message_chunks:
+            if len(chunk) >= SEND_BYTES:
+                if pending:
+                    server.send(pending)
+                    pending.clear()
+                view = memoryview(chunk)
+                split = len(view) - len(view) % SEND_BYTES
+                server.send(view[:split])
+                pending += view[split:]
+                continue
+            pending += chunk
+            if len(pending) >= SEND_BYTES:
+                server.send(pending)
+                pending.clear()
+    except Exception:
+        server.close()
+        raise
+    pending += b'.' + CRLF
+    server.send(pending)
+
+    code, response = server.getreply()
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPDataError(code, response)
+    return refused
@@ -0,0 +1,219 @@
+"""
+Trwała kolejka wysyłki
+Przed wysyłką zapisuje w SQLite zakodowane wydania (raz na segment) oraz stan
+dostarczenia dla każdego odbiorcy. Po przerwaniu procesu kolejne uruchomienie
+wznawia wysyłkę od miejsca przerwania - bez ponownego pobierania i renderowania.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+
+
+# Stany dostarczenia odbiorcy
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    status TEXT NOT NULL DEFAULT 'sending'
+);
+CREATE TABLE IF NOT EXISTS bodies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    encoded BLOB NOT NULL,
+    edition TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    recipient TEXT NOT NULL,
+    body_id INTEGER NOT NULL REFERENCES bodies(id) ON DELETE CASCADE,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL,
+    PRIMARY KEY (run_id, recipient)
+);
+CREATE INDEX IF NOT EXISTS deliveries_status ON deliveries(run_id, status);
+"""
+
+
+class Outbox:
+    """
+    Kolejka wydań do wysłania ze stanem dostarczenia każdego odbiorcy.
+
+    Stan odbiorcy jest zapisywany zaraz po odpowiedzi serwera SMTP, więc po awarii
+    wznowienie pomija tych, którzy już dostali wiadomość. Awaria pomiędzy akceptacją
+    przez serwer a zapisem stanu może skutkować jednym duplikatem (dostarczenie
+    "co najmniej raz").
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.OUTBOX_DB
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            # WAL + NORMAL: zapis stanu po każdej wiadomości bez pełnego fsync,
+            # odporny na przerwanie procesu
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+
+    def create_run(self, subject: str, segments: List[Tuple[bytes, Dict, List[str]]]) -> int:
+        """
+        Zapisuje nowe wydanie do wysłania.
+
+        Argumenty:
+            subject: Temat emaila
+            segments: Lista trójek (treść HTML zakodowana base64, dane wydania, odbiorcy)
+
+        Zwraca:
+            Identyfikator wydania w kolejce
+        """
+        with self._lock, self._conn:
+            run_id = self._conn.execute(
+                "INSERT INTO runs (subject, created_at) VALUES (?, ?)", (subject, time.time())
+            ).lastrowid
+            for encoded, edition, recipients in segments:
+                body_id = self._conn.execute(
+                    "INSERT INTO bodies (run_id, encoded, edition) VALUES (?, ?, ?)",
+                    (run_id, encoded, json.dumps(edition, ensure_ascii=False, default=str))
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO deliveries (run_id, recipient, body_id) VALUES (?, ?, ?)",
+                    [(run_id, recipient, body_id) for recipient in recipients]
+                )
+        return run_id
+
+    def unfinished_run(self) -> Optional[Dict]:
+        """Zwraca najstarsze niedokończone wydanie (id, subject, created_at) lub None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, subject, created_at FROM runs WHERE status = 'sending' ORDER BY id LIMIT 1"
+            ).fetchone()
+        return dict(row) if row else None
+
+    def pending(self, run_id: int) -> Iterator[Tuple[bytes, List[str]]]:
+        """
+        Zwraca oczekujących odbiorców wydania pogrupowanych według treści.
+
+        Zwraca:
+            Iterator par (treść zakodowana base64, odbiorcy oczekujący na tę treść)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT body_id, recipient FROM deliveries WHERE run_id = ? AND status = ? ORDER BY body_id, recipient",
+                (run_id, PENDING)
+            ).fetchall()
+        recipients: Dict[int, List[str]] = {}
+        for row in rows:
+            recipients.setdefault(row['body_id'], []).append(row['recipient'])
+
+        for body_id, members in recipients.items():
+            with self._lock:
+                encoded = self._conn.execute("SELECT encoded FROM bodies WHERE id = ?", (body_id,)).fetchone()[0]
+            yield encoded, members
+
+    def record(self, run_id: int, recipient: str, error: Optional[str], transient: bool = False) -> None:
+        """
+        Zapisuje wynik wysyłki do odbiorcy.
+
+        Błąd tymczasowy (4xx, zerwane połączenie, błąd logowania) zostawia odbiorcę
+        w kolejce do ponowienia przy następnym uruchomieniu; błąd trwały kończy jego wysyłkę.
+        """
+        status = SENT if error is None else (PENDING if transient else FAILED)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                UPDATE deliveries SET status = ?, error = ?, attempts = attempts + 1, updated_at = ?
+                WHERE run_id = ? AND recipient = ?
+                """,
+                (status, error, time.time(), run_id, recipient)
+            )
+
+    def finish_if_done(self, run_id: int) -> bool:
+        """Zamyka wydanie, jeśli nikt nie czeka już na wysyłkę. Zwraca True, gdy zamknięto."""
+        with self._lock, self._conn:
+            waiting = self._conn.execute(
+                "SELECT COUNT(*) FROM deliveries WHERE run_id = ? AND status = ?", (run_id, PENDING)
+            ).fetchone()[0]
+            if waiting:
+                return False
+            self._conn.execute(
+                "UPDATE runs SET status = 'done', finished_at = ? WHERE id = ?", (time.time(), run_id)
+            )
+        return True
+
+    def counts(self, run_id: int) -> Dict[str, int]:
+        """Zwraca liczbę odbiorców wydania w każdym stanie."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM deliveries WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall()
+        counts = {PENDING: 0, SENT: 0, FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def delivered(self, run_id: int) -> List[str]:
+        """Zwraca odbiorców, którzy otrzymali wydanie (łącznie z poprzednimi próbami)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT recipient FROM deliveries WHERE run_id = ? AND status = ? ORDER BY recipient", (run_id, SENT)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delivered_editions(self, run_id: int) -> List[Dict]:
+        """Zwraca dane wydań, które trafiły do co najmniej jednego odbiorcy."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT edition FROM bodies WHERE run_id = ? AND id IN (
+                    SELECT body_id FROM deliveries WHERE run_id = ? AND status = ?
+                )
+                """,
+                (run_id, run_id, SENT)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def expire(self, max_age_hours: Optional[float] = None, retention_days: float = 7) -> int:
+        """
+        Porzuca niedokończone wydania starsze niż max_age_hours (nieaktualne wiadomości)
+        i usuwa z bazy wydania starsze niż retention_days.
+
+        Zwraca:
+            Liczba porzuconych wydań
+        """
+        max_age_hours = Config.OUTBOX_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+        now = time.time()
+        with self._lock, self._conn:
+            abandoned = self._conn.execute(
+                "UPDATE runs SET status = 'abandoned', finished_at = ? WHERE status = 'sending' AND created_at < ?",
+                (now, now - max_age_hours * 3600)
+            ).rowcount
+            self._conn.execute("DELETE FROM runs WHERE created_at < ?", (now - retention_days * 86400,))
+        return abandoned
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> 'Outbox':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
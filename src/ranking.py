@@ -0,0 +1,152 @@
+"""
+Ranking wiadomości
+Kanały podają wpisy we własnej kolejności (nie zawsze od najnowszych), więc
+sekcja nie jest już przycinana do pierwszych wpisów kanału. Każda wiadomość
+dostaje ocenę z aktualności (data publikacji), liczby źródeł, które podały
+tę samą historię (scalone duplikaty), i wag słów kluczowych sekcji,
+a do wydania trafia section['limit'] najlepszych - wybieranych kopcem
+(heapq.nlargest, O(n log k) przy tysiącach kandydatów).
+"""
+
+import heapq
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from seen_index import normalize_url
+
+
+def parse_published(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parsuje datę publikacji z kanału (RFC 822 w RSS, ISO 8601 w Atom).
+
+    Argumenty:
+        value: Tekst daty z wpisu kanału
+
+    Zwraca:
+        Data ze strefą czasową (UTC, gdy kanał jej nie podał) lub None, gdy daty nie da się odczytać
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        published = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            published = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published
+
+
+def compile_keywords(keywords: Dict[str, float]) -> Optional[Tuple[Pattern, Dict[str, float]]]:
+    """
+    Przygotowuje wagi słów kluczowych sekcji.
+
+    Słowo kluczowe pasuje do początku słowa w tytule lub opisie, bez względu
+    na wielkość liter ("inflac" pasuje do "inflacja" i "inflacji").
+
+    Zwraca:
+        Wyrażenie dopasowujące wszystkie słowa naraz i wagi według słowa
+        (małymi literami) lub None, gdy sekcja nie ma słów kluczowych
+    """
+    weights = {keyword.casefold(): weight for keyword, weight in keywords.items() if keyword.strip()}
+    if not weights:
+        return None
+    # Dłuższe najpierw - "stopy procentowe" przed "stopy"
+    alternatives = '|'.join(re.escape(keyword) for keyword in sorted(weights, key=len, reverse=True))
+    return re.compile(rf'\b(?:{alternatives})'), weights
+
+
+def score_item(item: Dict, now: datetime, ranking: Dict,
+               keywords: Optional[Tuple[Pattern, Dict[str, float]]] = None) -> float:
+    """
+    Ocenia wiadomość.
+
+    Ocena = 2^(-wiek / half_life_hours) + coverage_weight * liczba innych źródeł
+    + suma wag dopasowanych słów kluczowych (każde słowo liczone raz).
+    Wiadomość bez czytelnej daty nie dostaje punktów za aktualność.
+
+    Argumenty:
+        item: Element wiadomości
+        now: Chwila odniesienia (ze strefą czasową)
+        ranking: Reguły rankingu sekcji z rejestru
+        keywords: Wynik compile_keywords dla sekcji
+
+    Zwraca:
+        Ocena (większa = wyżej w sekcji)
+    """
+    score = 0.0
+    published = parse_published(item.get('published'))
+    if published is not None:
+        # Daty z przyszłości (złe strefy w kanałach) traktujemy jak bieżące
+        age_hours = max((now - published).total_seconds() / 3600, 0.0)
+        score += 0.5 ** (age_hours / ranking['half_life_hours'])
+
+    score += ranking['coverage_weight'] * len(item.get('alternative_sources', ()))
+
+    if keywords is not None:
+        pattern, weights = keywords
+        text = f"{item.get('title', '')} {item.get('summary', '')}".casefold()
+        score += sum(weights[keyword] for keyword in set(pattern.findall(text)))
+    return score
+
+
+def rank_items(items: List[Dict], limit: int, ranking: Dict, now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Usuwa duplikaty i wybiera `limit` najlepszych wiadomości.
+
+    Duplikaty to ten sam znormalizowany link lub ten sam tytuł (zostaje
+    pierwszy). Przy równej ocenie wyżej jest wiadomość wcześniejsza na liście.
+
+    Argumenty:
+        items: Kandydaci (np. wpisy wszystkich kanałów sekcji)
+        limit: Liczba wybieranych wiadomości
+        ranking: Reguły rankingu sekcji z rejestru
+        now: Chwila odniesienia (domyślnie teraz)
+
+    Zwraca:
+        Co najwyżej `limit` wiadomości od najwyżej ocenionej
+    """
+    now = now or datetime.now(timezone.utc)
+    keywords = compile_keywords(ranking.get('keywords', {}))
+
+    seen_links = set()
+    seen_titles = set()
+    scored = []
+    for index, item in enumerate(items):
+        link = normalize_url(item['link']) if item.get('link') else None
+        title = ' '.join(item.get('title', '').casefold().split())
+        if (link and link in seen_links) or (title and title in seen_titles):
+            continue
+        seen_links.add(link)
+        seen_titles.add(title)
+        scored.append((score_item(item, now, ranking, keywords), -index, item))
+
+    best = heapq.nlargest(limit, scored, key=lambda entry: entry[:2])
+    return [item for _, _, item in best]
+
+
+def rank_news(news_data: Dict, sections: Dict, now: Optional[datetime] = None, depth: int = 0) -> Dict:
+    """
+    Szereguje sekcje wiadomości i przycina je do ich limitów.
+
+    Argumenty:
+        news_data: Dane wiadomości (sekcje jako listy kandydatów)
+        sections: Opisy sekcji z rejestru (limit i reguły rankingu)
+        now: Chwila odniesienia (domyślnie teraz)
+        depth: Liczba wiadomości zostawianych w sekcji, gdy jest większa niż jej limit
+               (np. subskrybent z większym items_per_section, zapas migawki)
+
+    Zwraca:
+        Nowy słownik news_data z wybranymi wiadomościami (od najwyżej ocenionej)
+    """
+    now = now or datetime.now(timezone.utc)
+    return {
+        key: rank_items(value, max(sections[key]['limit'], depth), sections[key]['ranking'], now)
+        if key in sections and isinstance(value, list) else value
+        for key, value in news_data.items()
+    }
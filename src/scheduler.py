@@ -0,0 +1,161 @@
+"""
+Harmonogram w składni cron
+Wyrażenia pięciopolowe (minuta godzina dzień-miesiąca miesiąc dzień-tygodnia)
+liczone w strefie czasowej Config.TIMEZONE - jak wpis crontab lub harmonogram
+GitHub Actions, ale w czasie lokalnym (bez przeliczania na UTC przy zmianie czasu).
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set
+
+import pytz
+
+from config import Config
+
+
+# Skróty w stylu crontab
+ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+}
+MONTH_NAMES = {name: index for index, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1
+)}
+DAY_NAMES = {name: index for index, name in enumerate(['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'])}
+
+# Zakres szukania następnego terminu (np. "0 0 29 2 *" wypada raz na 4 lata)
+MAX_SEARCH_DAYS = 8 * 366
+
+
+def parse_field(field: str, low: int, high: int, names: Optional[dict] = None) -> Set[int]:
+    """
+    Parsuje jedno pole wyrażenia cron (*, */n, a-b, a-b/n, listy po przecinku, nazwy).
+
+    Argumenty:
+        field: Tekst pola
+        low: Najmniejsza dozwolona wartość
+        high: Największa dozwolona wartość
+        names: Nazwy wartości (np. jan, mon)
+
+    Zwraca:
+        Zbiór dozwolonych wartości
+
+    Wyjątki:
+        ValueError: Gdy pole jest niepoprawne
+    """
+    def value(text: str) -> int:
+        text = text.lower()
+        number = names[text] if names and text in names else int(text)
+        if not low <= number <= high:
+            raise ValueError(f"wartość {text} poza zakresem {low}-{high}")
+        return number
+
+    values = set()
+    for part in field.split(','):
+        part, _, step = part.partition('/')
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            first, last = part.split('-', 1)
+            start, end = value(first), value(last)
+        else:
+            start = end = value(part)
+            if step:
+                end = high
+        step_size = int(step) if step else 1
+        if step_size < 1 or start > end:
+            raise ValueError(f"niepoprawne pole '{field}'")
+        values.update(range(start, end + 1, step_size))
+    return values
+
+
+class CronSchedule:
+    """Jedno wyrażenie cron w podanej strefie czasowej."""
+
+    def __init__(self, expression: str, timezone: Optional[str] = None):
+        self.expression = expression.strip()
+        fields = ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Wyrażenie cron wymaga 5 pól: '{expression}'")
+        minute, hour, day, month, weekday = fields
+
+        self.minutes = sorted(parse_field(minute, 0, 59))
+        self.hours = sorted(parse_field(hour, 0, 23))
+        self.days = parse_field(day, 1, 31)
+        self.months = parse_field(month, 1, 12, MONTH_NAMES)
+        # 7 to także niedziela
+        self.weekdays = {day % 7 for day in parse_field(weekday, 0, 7, DAY_NAMES)}
+        # Jak w cronie: gdy oba pola dni są ograniczone, wystarczy zgodność jednego
+        self.any_day = day == '*' or weekday == '*'
+        self.timezone = pytz.timezone(timezone or Config.TIMEZONE)
+
+    def matches_day(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        in_month = day.day in self.days
+        in_week = (day.weekday() + 1) % 7 in self.weekdays
+        return in_month and in_week if self.any_day else in_month or in_week
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        Zwraca najbliższy termin późniejszy niż `moment`.
+
+        Argumenty:
+            moment: Czas odniesienia (ze strefą czasową)
+
+        Zwraca:
+            Termin w strefie harmonogramu
+
+        Wyjątki:
+            ValueError: Gdy wyrażenie nie ma terminu (np. 31 lutego)
+        """
+        # Szukamy w czasie ściennym strefy, od następnej pełnej minuty
+        local = moment.astimezone(self.timezone).replace(tzinfo=None, second=0, microsecond=0)
+        start = local + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for _ in range(MAX_SEARCH_DAYS):
+            if self.matches_day(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            # Termin w "dziurze" przy zmianie czasu przesuwa się o godzinę
+                            return self.timezone.normalize(self.timezone.localize(candidate))
+            day += timedelta(days=1)
+        raise ValueError(f"Wyrażenie cron nie ma terminu: '{self.expression}'")
+
+
+class Schedule:
+    """Zestaw wyrażeń cron - termin to najbliższy z nich."""
+
+    def __init__(self, expressions: Iterable[str], timezone: Optional[str] = None):
+        self.crons = [CronSchedule(expression, timezone) for expression in expressions if expression.strip()]
+        if not self.crons:
+            raise ValueError("Harmonogram nie zawiera żadnego wyrażenia cron")
+
+    @classmethod
+    def from_config(cls, text: Optional[str] = None) -> 'Schedule':
+        """Tworzy harmonogram z wyrażeń oddzielonych średnikami (domyślnie Config.DAEMON_SCHEDULE)."""
+        return cls((text or Config.DAEMON_SCHEDULE).split(';'))
+
+    @property
+    def expressions(self) -> List[str]:
+        return [cron.expression for cron in self.crons]
+
+    def next_after(self, moment: datetime) -> datetime:
+        return min(cron.next_after(moment) for cron in self.crons)
+
+    def latest_time(self) -> str:
+        """Zwraca najpóźniejszą godzinę terminu w ciągu dnia ('HH:MM')."""
+        return max(f"{cron.hours[-1]:02d}:{cron.minutes[-1]:02d}" for cron in self.crons)
+
+    def upcoming(self, moment: datetime, count: int) -> List[datetime]:
+        """Zwraca `count` kolejnych terminów po `moment`."""
+        times = []
+        for _ in range(count):
+            moment = self.next_after(moment)
+            times.append(moment)
+        return times
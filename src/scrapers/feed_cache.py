@@ -0,0 +1,243 @@
+"""
+Pamięć podręczna kanałów RSS
+Przechowuje na dysku nagłówki ETag/Last-Modified oraz sparsowane wpisy
+dla każdego kanału i wysyła żądania warunkowe przez wspólny klient HTTP.
+Gdy serwer odpowie 304 (Not Modified), wpisy są brane z dysku bez ponownego
+pobierania i parsowania. Nowe odpowiedzi są parsowane strumieniowo, a zapisywane
+jest do Config.FEED_MAX_SCAN wpisów - tyle, ile może przejrzeć pobieranie.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from contextlib import closing
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from config import Config
+from http_client import http_get
+from metrics import get_metrics
+from scrapers.feed_stream import CHUNK_SIZE, iter_feed_stream
+
+
+# Pola wpisu, które zachowujemy w pamięci podręcznej
+ENTRY_FIELDS = ('title', 'summary', 'description', 'link', 'published', 'updated')
+
+# Stan kanałów wczytany lub zapisany w tym procesie (tryb demona nie czyta go
+# ponownie z dysku przy każdym wydaniu); wpisy traktujemy jako tylko do odczytu
+_memory: Dict[str, Dict] = {}
+_memory_lock = threading.Lock()
+
+
+def get_cache_path(url: str) -> str:
+    """
+    Zwraca ścieżkę pliku pamięci podręcznej dla danego kanału.
+
+    Argumenty:
+        url: URL kanału RSS
+
+    Zwraca:
+        Ścieżka do pliku JSON
+    """
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return os.path.join(Config.CACHE_DIR, 'feeds', f"{key}.json")
+
+
+def load_cached_feed(url: str) -> Optional[Dict]:
+    """
+    Wczytuje zapisany stan kanału (nagłówki i wpisy).
+
+    Zwraca:
+        Słownik z kluczami url, etag, modified, entries lub None
+    """
+    with _memory_lock:
+        if url in _memory:
+            return _memory[url]
+    try:
+        with open(get_cache_path(url), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    with _memory_lock:
+        _memory[url] = data
+    return data
+
+
+def save_cached_feed(url: str, etag: Optional[str], modified: Optional[str], entries: List[Dict],
+                     complete: bool = False) -> None:
+    """
+    Zapisuje stan kanału atomowo (plik tymczasowy + zamiana nazwy).
+
+    Argumenty:
+        complete: Czy entries to wszystkie wpisy kanału (przy 304 nie trzeba go dociągać)
+    """
+    path = get_cache_path(url)
+    data = {'url': url, 'etag': etag, 'modified': modified, 'entries': entries, 'complete': complete}
+    with _memory_lock:
+        _memory[url] = data
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[OSTRZEŻENIE] Nie można zapisać pamięci podręcznej kanału {url}: {e}")
+
+
+def to_plain_entry(entry: Dict) -> Dict[str, str]:
+    """Zamienia wpis feedparsera na zwykły słownik z polami tekstowymi."""
+    return {field: entry[field] for field in ENTRY_FIELDS if isinstance(entry.get(field), str)}
+
+
+def parse_full_feed(url: str) -> List[Dict[str, str]]:
+    """
+    Pobiera cały kanał i parsuje go feedparserem (tolerancyjnym dla błędnego XML).
+
+    Argumenty:
+        url: URL kanału RSS
+
+    Zwraca:
+        Lista wpisów
+    """
+    # feedparser jest potrzebny tylko dla błędnego XML - nie spowalnia startu
+    import feedparser
+
+    response = http_get(url)
+    response.raise_for_status()
+    feed = feedparser.parse(
+        response.content,
+        response_headers={
+            'content-location': response.url,
+            'content-type': response.headers.get('Content-Type', ''),
+        }
+    )
+    return [to_plain_entry(entry) for entry in feed.entries]
+
+
+def iter_response_entries(url: str, response) -> Iterator[Dict[str, str]]:
+    """
+    Zwraca wpisy z odpowiedzi strumieniowo, a dla błędnego XML przechodzi na feedparser.
+    """
+    yielded = 0
+    try:
+        for entry in iter_feed_stream(get_metrics().iter_counted(response.iter_content(CHUNK_SIZE))):
+            yielded += 1
+            yield entry
+    except ET.ParseError as e:
+        print(f"[OSTRZEŻENIE] Kanał {url} nie jest poprawnym XML ({e}), parsuję feedparserem")
+        response.close()
+        yield from parse_full_feed(url)[yielded:]
+
+
+def read_ahead(stream: Iterator[Dict[str, str]], entries: List[Dict[str, str]]) -> bool:
+    """
+    Doczytuje wpisy ze strumienia do Config.FEED_MAX_SCAN (na potrzeby pamięci podręcznej).
+
+    Zwraca:
+        True, gdy kanał został przeczytany do końca
+    """
+    try:
+        for entry in stream:
+            if len(entries) >= Config.FEED_MAX_SCAN:
+                return False
+            entries.append(entry)
+    except Exception as e:
+        print(f"[OSTRZEŻENIE] Nie można doczytać kanału do pamięci podręcznej: {e}")
+        return False
+    return True
+
+
+def iter_feed_entries(url: str) -> Iterator[Dict[str, str]]:
+    """
+    Zwraca wpisy kanału RSS jako generator, z użyciem żądania warunkowego.
+
+    Odpowiedź jest parsowana strumieniowo. Gdy konsument przestanie pobierać
+    wpisy (np. po osiągnięciu limitu), kanał jest doczytywany tylko do
+    Config.FEED_MAX_SCAN wpisów, a połączenie zamykane bez czytania reszty
+    dokumentu. Wpisy trafiają do pamięci podręcznej, więc odpowiedź 304 jest
+    obsługiwana w całości z dysku - także gdy indeks wysłanych pominie wszystkie
+    zapisane wpisy. Kanał jest dociągany bez nagłówków warunkowych tylko wtedy,
+    gdy konsument potrzebuje więcej wpisów, niż zapisano z niepełnego kanału.
+
+    Argumenty:
+        url: URL kanału RSS
+
+    Zwraca:
+        Generator wpisów (słowniki z polami title, summary, link, published, ...)
+    """
+    cached = load_cached_feed(url)
+
+    headers = {}
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached and cached.get('modified'):
+        headers['If-Modified-Since'] = cached['modified']
+
+    try:
+        response = http_get(url, headers=headers, stream=True)
+    except Exception as e:
+        # Błąd sieci - lepiej pokazać ostatnie znane wpisy niż nic
+        if cached:
+            print(f"[OSTRZEŻENIE] Błąd pobierania {url} ({e}), używam zapisanych wpisów")
+            yield from cached.get('entries', [])
+            return
+        raise
+
+    entries: List[Dict[str, str]] = []
+    stream = None
+    complete = False
+    try:
+        if response.status_code == 304 and cached:
+            response.close()
+            # Kanał się nie zmienił - zapisane wpisy
+            entries = list(cached.get('entries', []))
+            yield from entries
+            if cached.get('complete'):
+                return
+
+            # Konsument chce więcej niż zapisano - dociągamy kanał od początku
+            response = http_get(url, stream=True)
+
+        response.raise_for_status()
+
+        skip = len(entries)
+        stream = iter_response_entries(url, response)
+        for index, entry in enumerate(stream):
+            if index < skip:
+                continue
+            entries.append(entry)
+            yield entry
+        complete = True
+    except GeneratorExit:
+        # Konsument przerwał - zapisujemy tyle wpisów, ile może przejrzeć następne pobieranie
+        if stream is not None and response.status_code == 200:
+            complete = read_ahead(stream, entries)
+        raise
+    finally:
+        if stream is not None:
+            stream.close()
+        response.close()
+        if response.status_code == 200 and entries:
+            save_cached_feed(
+                url, response.headers.get('ETag'), response.headers.get('Last-Modified'), entries, complete
+            )
+
+
+def fetch_feed_entries(url: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Pobiera wpisy kanału RSS (co najwyżej limit pierwszych).
+
+    Argumenty:
+        url: URL kanału RSS
+        limit: Maksymalna liczba wpisów (None = wszystkie)
+
+    Zwraca:
+        Lista wpisów (słowniki z polami title, summary, link, published, ...)
+    """
+    with closing(iter_feed_entries(url)) as entries:
+        return list(islice(entries, limit))
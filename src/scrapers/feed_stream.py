@@ -0,0 +1,108 @@
+"""
+Strumieniowy parser kanałów RSS/Atom
+Parsuje odpowiedź przyrostowo (XMLPullParser) i zwraca wpisy jako generator,
+więc czytanie z gniazda kończy się, gdy konsument ma już dość wpisów.
+"""
+
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator, List
+
+
+# Elementy oznaczające pojedynczy wpis (RSS 2.0, RSS 1.0/RDF, Atom)
+ITEM_TAGS = frozenset(['item', 'entry'])
+
+# Rozmiar porcji czytanej z gniazda
+CHUNK_SIZE = 16 * 1024
+
+
+def local_name(tag: str) -> str:
+    """Zwraca nazwę elementu bez przestrzeni nazw ('{http://...}entry' -> 'entry')."""
+    return tag.rsplit('}', 1)[-1] if tag[:1] == '{' else tag
+
+
+def element_to_entry(element: ET.Element) -> Dict[str, str]:
+    """
+    Zamienia element <item>/<entry> na słownik pól w formacie feedparsera.
+
+    W przeciwieństwie do feedparsera pola nie są sanityzowane (opis może zawierać
+    dowolny HTML kanału) - generator HTML wstawia je z kodowaniem HTML.
+
+    Argumenty:
+        element: Sparsowany element wpisu
+
+    Zwraca:
+        Słownik z polami title, link, summary, published, updated (jeśli występują)
+    """
+    entry: Dict[str, str] = {}
+    content = None
+
+    for child in element:
+        name = local_name(child.tag)
+        text = ''.join(child.itertext()).strip()
+
+        if name == 'title':
+            entry['title'] = text
+        elif name == 'link':
+            # Atom: <link rel="alternate" href="..."/>, RSS: <link>...</link>
+            href = child.get('href')
+            if href is None:
+                entry.setdefault('link', text)
+            elif child.get('rel', 'alternate') == 'alternate':
+                entry.setdefault('link', href)
+        elif name in ('description', 'summary'):
+            entry.setdefault('summary', text)
+        elif name in ('content', 'encoded'):
+            content = text
+        elif name in ('pubDate', 'published', 'date', 'issued'):
+            entry.setdefault('published', text)
+        elif name in ('updated', 'modified'):
+            entry.setdefault('updated', text)
+
+    if 'summary' not in entry and content:
+        entry['summary'] = content
+    if 'published' not in entry and 'updated' in entry:
+        entry['published'] = entry['updated']
+
+    return entry
+
+
+def iter_feed_stream(chunks: Iterable[bytes]) -> Iterator[Dict[str, str]]:
+    """
+    Parsuje dokument kanału porcjami i zwraca kolejne wpisy.
+
+    Przetworzone wpisy są usuwane z drzewa, więc zużycie pamięci nie rośnie
+    z długością kanału. Gdy konsument przestanie pobierać wpisy, dalsze porcje
+    nie są już czytane.
+
+    Argumenty:
+        chunks: Porcje bajtów dokumentu (np. response.iter_content())
+
+    Zwraca:
+        Generator słowników wpisów
+
+    Wyjątki:
+        xml.etree.ElementTree.ParseError: gdy dokument nie jest poprawnym XML
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack: List[ET.Element] = []
+
+    def drain() -> Iterator[Dict[str, str]]:
+        for event, element in parser.read_events():
+            if event == 'start':
+                stack.append(element)
+                continue
+
+            stack.pop()
+            if local_name(element.tag) in ITEM_TAGS:
+                yield element_to_entry(element)
+                # Odczep wpis od rodzica - drzewo nie trzyma przetworzonych wpisów
+                if stack:
+                    stack[-1].remove(element)
+
+    for chunk in chunks:
+        if chunk:
+            parser.feed(chunk)
+            yield from drain()
+
+    parser.close()
+    yield from drain()
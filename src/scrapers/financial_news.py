@@ -1,92 +1,77 @@
 """
 Skraper Danych Finansowych
-Pobiera ceny metali szlachetnych (złoto, srebro) i trendy rynkowe.
+Pobiera ceny instrumentów z rejestru (domyślnie złoto i srebro) i trendy rynkowe.
 """
 
-import requests
-import yfinance as yf
-from typing import Dict, List, Optional
+from typing import Dict, Optional
+
+from config import Config
+from http_client import http_get
+from metrics import get_metrics
+from scrapers.market_data import fetch_market_data
+from scrapers.price_store import compute_changes, load_series, update_series
+from scrapers.rss_pipeline import load_registry
 
 
 def fetch_financial_data() -> Dict[str, any]:
     """
-    Pobiera dane finansowe o metalach szlachetnych i trendach rynkowych.
+    Pobiera dane finansowe dla wszystkich instrumentów z rejestru źródeł.
+    
+    Notowania wszystkich instrumentów są liczone razem (market_data);
+    dla złota i srebra bez danych ze Stooq używane są zapasowe źródła.
     
     Zwraca:
-        Słownik zawierający:
-        - gold: Dane o cenie złota (z NBP lub Stooq)
+        Słownik klucz instrumentu -> dane, m.in.:
+        - gold: Dane o cenie złota (ze Stooq lub NBP)
         - silver: Dane o cenie srebra (ze Stooq lub yfinance)
     """
-    financial_data = {
-        'gold': get_gold_price(),
-        'silver': get_silver_price(),
-        # 'trends': [] # Trendy tymczasowo usunięte
+    fallbacks = {
+        'gold': ('nbp', get_gold_price_nbp),
+        'silver': ('yfinance', get_silver_price_yfinance),
     }
+
+    metrics = get_metrics()
+    try:
+        with metrics.source('financial_data/stooq'):
+            market_data = fetch_market_data()
+            metrics.count(items=sum(1 for data in market_data.values() if data is not None))
+    except Exception as e:
+        print(f"[OSTRZEŻENIE] Błąd analityki rynkowej: {e}")
+        metrics.error(str(e), source='financial_data/stooq')
+        market_data = {key: None for key in fallbacks}
+
+    names = {instrument['key']: instrument['name'] for instrument in load_registry()['markets']['instruments']}
+
+    financial_data = {}
+    for key, data in market_data.items():
+        if data is None and key in fallbacks:
+            name, fallback = fallbacks[key]
+            source = f"financial_data/{name}"
+            with metrics.source(source):
+                data = fallback()
+            if data is None:
+                metrics.error(f"brak danych dla {key}", source=source)
+        financial_data[key] = data or get_fallback_data(names.get(key, key))
+    # 'trends': [] # Trendy tymczasowo usunięte
     
     return financial_data
 
 
 def fetch_stooq_history(symbol: str) -> Dict[str, any]:
     """
-    Pomocnicza funkcja do pobierania i parsowania danych historycznych ze Stooq (CSV).
+    Pomocnicza funkcja zwracająca dane historyczne ze Stooq z lokalnego magazynu notowań.
+    Ze Stooq dociągane są tylko notowania nowsze niż ostatnia zapisana data.
     Zwraca słownik z ceną, zmianą dzienną i miesięczną lub None.
     """
     try:
-        url = f"https://stooq.pl/q/d/l/?s={symbol}&i=d"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            content = response.text.strip().split('\n')
-            # Nagłówek CSV: Date, Open, High, Low, Close, Volume
-            # Potrzebujemy co najmniej 2 linii (nagłówek + 1 dana), aby mieć jakąkolwiek cenę
-            # Aby obliczyć zmianę dzienną, potrzebujemy 3 linii (Nagłówek + poprzednia + obecna)
-            
-            lines = [line.split(',') for line in content[1:] if line] # Pomiń nagłówek
-            
-            if len(lines) >= 1:
-                # Ostatni wiersz to bieżące dane
-                current = lines[-1]
-                # Close (zamknięcie) jest na indeksie 4
-                price = float(current[4])
-                
-                daily_change = 0.0
-                daily_change_percent = 0.0
-                monthly_change = 0.0
-                monthly_change_percent = 0.0
-                
-                # Zmiana dzienna (vs Poprzednie zamknięcie)
-                if len(lines) >= 2:
-                    prev = lines[-2]
-                    prev_close = float(prev[4])
-                    daily_change = price - prev_close
-                    daily_change_percent = (daily_change / prev_close) * 100
-                    
-                # Zmiana miesięczna (vs ~22 dni handlowe temu)
-                if len(lines) >= 22:
-                    month_ago = lines[-22]
-                    month_close = float(month_ago[4])
-                    monthly_change = price - month_close
-                    monthly_change_percent = (monthly_change / month_close) * 100
-                elif len(lines) >= 2: # Fallback jeśli historia jest krótka
-                     month_ago = lines[0]
-                     month_close = float(month_ago[4])
-                     monthly_change = price - month_close
-                     monthly_change_percent = (monthly_change / month_close) * 100
-                     
-                return {
-                    'price': price,
-                    'daily_change': daily_change,
-                    'daily_change_percent': daily_change_percent,
-                    'monthly_change': monthly_change,
-                    'monthly_change_percent': monthly_change_percent
-                }
+        _, closes = update_series(symbol)
     except Exception as e:
         print(f"[OSTRZEŻENIE] Błąd w fetch_stooq_history dla {symbol}: {e}")
+        # Brak połączenia - korzystamy z ostatnio zapisanych notowań (jeśli są)
+        _, closes = load_series(symbol)
     
-    return None
+    return compute_changes(closes)
+
 
 def get_gold_price() -> Dict[str, any]:
     """
@@ -109,9 +94,16 @@ def get_gold_price() -> Dict[str, any]:
         }
 
     # Fallback do NBP jeśli Stooq zawiedzie
+    return get_gold_price_nbp() or get_fallback_data('Złoto')
+
+
+def get_gold_price_nbp() -> Optional[Dict[str, any]]:
+    """
+    Pobiera cenę złota z API NBP (zmiana tylko dzienna). Zwraca None przy błędzie.
+    """
     try:
         url_current = "http://api.nbp.pl/api/cenyzlota/last/2/?format=json"
-        response = requests.get(url_current, timeout=10)
+        response = http_get(url_current)
         
         if response.status_code == 200:
             data = response.json()
@@ -144,7 +136,7 @@ def get_gold_price() -> Dict[str, any]:
         print(f"[OSTRZEŻENIE] Błąd pobierania złota z NBP: {e}")
         pass
         
-    return get_fallback_data('Złoto')
+    return None
 
 
 def get_usd_pln_rate() -> float:
@@ -153,7 +145,7 @@ def get_usd_pln_rate() -> float:
     """
     try:
         url = "http://api.nbp.pl/api/exchangerates/rates/a/usd/?format=json"
-        response = requests.get(url, timeout=5)
+        response = http_get(url, timeout=5)
         if response.status_code == 200:
             data = response.json()
             return data['rates'][0]['mid']
@@ -184,10 +176,21 @@ def get_silver_price() -> Dict[str, any]:
         }
 
     # Fallback do yfinance (XAGUSD=X)
+    return get_silver_price_yfinance() or get_fallback_data('Srebro')
+
+
+def get_silver_price_yfinance() -> Optional[Dict[str, any]]:
+    """
+    Pobiera cenę srebra z yfinance (XAGUSD=X) przeliczoną kursem NBP. Zwraca None przy błędzie.
+    """
     nbp_rate = get_usd_pln_rate()
     try:
+        # yfinance (z pandas) ładuje się ~0,5 s - importujemy go tylko w tej rzadkiej ścieżce zapasowej
+        import yfinance as yf
+
         silver = yf.Ticker("XAGUSD=X")
-        hist = silver.history(period="1mo") # Pobierz historię z miesiąca
+        # Z limitem czasu - porzucony po terminie wątek nie może blokować zakończenia procesu
+        hist = silver.history(period="1mo", timeout=Config.HTTP_TIMEOUT) # Pobierz historię z miesiąca
         
         if not hist.empty and len(hist) >= 1:
             usd_price = hist['Close'].iloc[-1]
@@ -224,7 +227,7 @@ def get_silver_price() -> Dict[str, any]:
         print(f"[OSTRZEŻENIE] Błąd pobierania srebra z yfinance: {e}")
         pass
 
-    return get_fallback_data('Srebro')
+    return None
 
 
 def get_fallback_data(name: str) -> Dict:
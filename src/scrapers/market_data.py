@@ -0,0 +1,183 @@
+"""
+Analityka rynkowa dla wielu instrumentów
+Pobiera notowania wszystkich instrumentów z rejestru źródeł (sekcja "markets")
+i w jednym zwektoryzowanym przebiegu (NumPy, macierz instrument x sesja) liczy
+zmiany, średnie kroczące, zmienność oraz minimum/maksimum w kilku oknach.
+"""
+
+import contextvars
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config import Config
+from metrics import get_metrics
+from scrapers.price_store import MONTH_SESSIONS, load_series, update_series
+from scrapers.rss_pipeline import load_registry
+
+
+# Liczba sesji w roku - do annualizacji zmienności
+SESSIONS_PER_YEAR = 252
+
+
+def fetch_closes(symbols: Sequence[str]) -> Dict[str, Sequence[float]]:
+    """
+    Aktualizuje magazyn notowań dla wszystkich symboli równolegle.
+
+    Symbol, którego nie udało się zaktualizować, korzysta z ostatnio zapisanych danych.
+
+    Zwraca:
+        Słownik symbol -> ceny zamknięcia (od najstarszej)
+    """
+    def fetch(symbol: str):
+        try:
+            return update_series(symbol)[1]
+        except Exception as e:
+            print(f"[OSTRZEŻENIE] Błąd aktualizacji notowań {symbol}: {e}")
+            get_metrics().error(f"{symbol}: {e}")
+            return load_series(symbol)[1]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(len(symbols), Config.HTTP_POOL_SIZE))) as executor:
+        # Kopia kontekstu dla każdego zadania - metryki pobrań trafiają do źródła wywołującego
+        futures = [executor.submit(contextvars.copy_context().run, fetch, symbol) for symbol in symbols]
+        return {symbol: future.result() for symbol, future in zip(symbols, futures)}
+
+
+def build_price_matrix(series: Sequence[Sequence[float]], depth: int) -> np.ndarray:
+    """
+    Układa ostatnie `depth` zamknięć każdego instrumentu w macierz wyrównaną do prawej.
+
+    Brakująca (krótsza) historia jest uzupełniana z lewej wartością NaN.
+
+    Zwraca:
+        Macierz float64 o kształcie (liczba instrumentów, depth)
+    """
+    matrix = np.full((len(series), depth), np.nan)
+    for row, closes in enumerate(series):
+        tail = np.asarray(closes[-depth:], dtype=np.float64)
+        if tail.size:
+            matrix[row, depth - tail.size:] = tail
+    return matrix
+
+
+def compute_analytics(matrix: np.ndarray, windows: Sequence[int]) -> Dict[str, np.ndarray]:
+    """
+    Liczy wskaźniki dla wszystkich instrumentów naraz.
+
+    Argumenty:
+        matrix: Macierz zamknięć (instrument x sesja), NaN dla brakującej historii
+        windows: Okna analizy w sesjach
+
+    Zwraca:
+        Słownik nazwa wskaźnika -> wektor (jedna wartość na instrument), np.
+        'price', 'daily_change', 'monthly_change', 'return_22', 'ma_22', 'volatility_22', 'min_22', 'max_22'
+    """
+    rows = np.arange(matrix.shape[0])
+    valid = ~np.isnan(matrix)
+    # Indeks pierwszej dostępnej sesji w wierszu (dla krótkiej historii)
+    first_valid = np.where(valid.any(axis=1), valid.argmax(axis=1), matrix.shape[1] - 1)
+    first_close = matrix[rows, first_valid]
+
+    price = matrix[:, -1]
+    prev = matrix[:, -2] if matrix.shape[1] >= 2 else np.full_like(price, np.nan)
+
+    def change_from(reference: np.ndarray):
+        delta = np.where(np.isnan(reference), 0.0, price - reference)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent = np.where(np.isnan(reference) | (reference == 0), 0.0, delta / reference * 100)
+        return delta, percent
+
+    result: Dict[str, np.ndarray] = {'price': price}
+    result['daily_change'], result['daily_change_percent'] = change_from(prev)
+
+    # Zmiana miesięczna (vs ~22 sesje temu, a przy krótkiej historii vs pierwsza sesja)
+    month_col = matrix.shape[1] - MONTH_SESSIONS
+    month_ref = matrix[:, month_col] if month_col >= 0 else first_close
+    month_ref = np.where(np.isnan(month_ref), first_close, month_ref)
+    month_ref = np.where(valid.sum(axis=1) >= 2, month_ref, np.nan)
+    result['monthly_change'], result['monthly_change_percent'] = change_from(month_ref)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_returns = np.diff(np.log(matrix), axis=1)
+
+    # Instrument bez danych w oknie daje NaN - to oczekiwane, bez ostrzeżeń
+    with np.errstate(all='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        for window in windows:
+            window_slice = matrix[:, -window:]
+            reference = matrix[:, -window - 1] if window < matrix.shape[1] else np.full_like(price, np.nan)
+            result[f'return_{window}'] = (price / reference - 1) * 100
+            result[f'ma_{window}'] = np.nanmean(window_slice, axis=1)
+            result[f'min_{window}'] = np.nanmin(window_slice, axis=1)
+            result[f'max_{window}'] = np.nanmax(window_slice, axis=1)
+            result[f'volatility_{window}'] = (
+                np.nanstd(log_returns[:, -window:], axis=1, ddof=1) * np.sqrt(SESSIONS_PER_YEAR) * 100
+            )
+
+    return result
+
+
+def to_optional(value: float, digits: int = 2) -> Optional[float]:
+    """Zaokrągla wartość, zamieniając NaN na None."""
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def fetch_market_data(instruments: Optional[List[Dict]] = None,
+                      windows: Optional[Sequence[int]] = None) -> Dict[str, Optional[Dict]]:
+    """
+    Pobiera notowania i liczy analitykę dla listy instrumentów.
+
+    Argumenty:
+        instruments: Opisy instrumentów (domyślnie wszystkie z rejestru źródeł)
+        windows: Okna analizy w sesjach (domyślnie z rejestru źródeł)
+
+    Zwraca:
+        Słownik klucz instrumentu -> dane w formacie oczekiwanym przez create_financial_section
+        (None dla instrumentów bez żadnych notowań)
+    """
+    markets = load_registry()['markets']
+    instruments = markets['instruments'] if instruments is None else instruments
+    windows = markets['windows'] if windows is None else windows
+    if not instruments:
+        return {}
+
+    symbols = [instrument['symbol'] for instrument in instruments]
+    closes = fetch_closes(symbols)
+    depth = max(max(windows, default=1), MONTH_SESSIONS) + 1
+    analytics = compute_analytics(build_price_matrix([closes[s] for s in symbols], depth), windows)
+
+    market_data: Dict[str, Optional[Dict]] = {}
+    for row, instrument in enumerate(instruments):
+        if np.isnan(analytics['price'][row]):
+            market_data[instrument['key']] = None
+            continue
+
+        daily_change = float(analytics['daily_change'][row])
+        market_data[instrument['key']] = {
+            'symbol': instrument['display_symbol'],
+            'name': instrument['name'],
+            'label': instrument['label'],
+            'price': round(float(analytics['price'][row]), 2),
+            'currency': instrument['currency'],
+            'unit': instrument['unit'],
+            'daily_change': round(daily_change, 2),
+            'daily_change_percent': round(float(analytics['daily_change_percent'][row]), 2),
+            # Klucz weekly_change mapuje dane miesięczne w szablonie
+            'weekly_change': round(float(analytics['monthly_change'][row]), 2),
+            'weekly_change_percent': round(float(analytics['monthly_change_percent'][row]), 2),
+            'trend': 'up' if daily_change > 0 else 'down',
+            'analytics': {
+                window: {
+                    'return_percent': to_optional(analytics[f'return_{window}'][row]),
+                    'moving_average': to_optional(analytics[f'ma_{window}'][row]),
+                    'volatility_percent': to_optional(analytics[f'volatility_{window}'][row]),
+                    'min': to_optional(analytics[f'min_{window}'][row]),
+                    'max': to_optional(analytics[f'max_{window}'][row]),
+                }
+                for window in windows
+            }
+        }
+
+    return market_data
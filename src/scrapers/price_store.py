@@ -0,0 +1,216 @@
+"""
+Lokalny magazyn notowań ze Stooq
+Przechowuje historię cen zamknięcia w jednym pliku kolumnowym na symbol
+(nagłówek z liczbą wierszy, daty jako YYYYMMDD w int32, ceny w float64)
+i dociąga ze Stooq tylko wiersze nowsze niż ostatnia zapisana data.
+Obie kolumny są zamieniane jednym os.replace, więc nie mogą się rozjechać.
+"""
+
+import os
+import struct
+import threading
+from array import array
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+
+from config import Config
+from http_client import http_get
+
+
+# Historia pobierana przy pierwszym uruchomieniu dla nowego symbolu (dni kalendarzowe)
+INITIAL_HISTORY_DAYS = 400
+
+# Liczba sesji wstecz używana jako "miesiąc"
+MONTH_SESSIONS = 22
+
+# Nagłówek pliku historii: znacznik formatu i liczba wierszy
+SERIES_MAGIC = b'STQ1'
+SERIES_HEADER = struct.Struct('<4sI')
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _symbol_lock(symbol: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(symbol, threading.Lock())
+
+
+def get_series_path(symbol: str) -> str:
+    """Zwraca ścieżkę pliku historii symbolu."""
+    return os.path.join(Config.CACHE_DIR, 'prices', f"{symbol.lower()}.series")
+
+
+def get_legacy_paths(symbol: str) -> Tuple[str, str]:
+    """Zwraca ścieżki osobnych plików kolumn (daty, zamknięcia) z poprzedniego formatu."""
+    base = os.path.join(Config.CACHE_DIR, 'prices', symbol.lower())
+    return f"{base}.dates", f"{base}.close"
+
+
+def load_legacy_series(symbol: str) -> Tuple[array, array]:
+    """Wczytuje historię zapisaną w osobnych plikach kolumn (przed przejściem na jeden plik)."""
+    dates, closes = array('i'), array('d')
+    dates_path, close_path = get_legacy_paths(symbol)
+    try:
+        with open(dates_path, 'rb') as f:
+            dates.frombytes(f.read())
+        with open(close_path, 'rb') as f:
+            closes.frombytes(f.read())
+    except (OSError, ValueError):
+        return array('i'), array('d')
+    if len(dates) != len(closes):
+        return array('i'), array('d')
+    return dates, closes
+
+
+def load_series(symbol: str) -> Tuple[array, array]:
+    """
+    Wczytuje zapisaną historię symbolu.
+
+    Zwraca:
+        Krotka (daty YYYYMMDD, ceny zamknięcia); puste tablice, jeśli brak danych
+    """
+    dates, closes = array('i'), array('d')
+    try:
+        with open(get_series_path(symbol), 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return load_legacy_series(symbol)
+    except OSError:
+        return dates, closes
+
+    # Uszkodzony plik (obcy nagłówek lub długość niezgodna z liczbą wierszy) - zaczynamy od nowa
+    if len(data) < SERIES_HEADER.size:
+        return dates, closes
+    magic, count = SERIES_HEADER.unpack_from(data)
+    split = SERIES_HEADER.size + count * dates.itemsize
+    if magic != SERIES_MAGIC or len(data) != split + count * closes.itemsize:
+        return dates, closes
+
+    dates.frombytes(data[SERIES_HEADER.size:split])
+    closes.frombytes(data[split:])
+    return dates, closes
+
+
+def save_series(symbol: str, dates: array, closes: array) -> None:
+    """Zapisuje obie kolumny symbolu w jednym pliku atomowo (plik tymczasowy + zamiana nazwy)."""
+    path = get_series_path(symbol)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(SERIES_HEADER.pack(SERIES_MAGIC, len(dates)))
+        dates.tofile(f)
+        closes.tofile(f)
+    os.replace(tmp_path, path)
+
+    # Historia jest już w nowym pliku - stare kolumny nie są potrzebne
+    for legacy_path in get_legacy_paths(symbol):
+        try:
+            os.remove(legacy_path)
+        except FileNotFoundError:
+            pass
+
+
+def parse_stooq_csv(text: str) -> Tuple[array, array]:
+    """
+    Wyciąga z CSV Stooq tylko datę i cenę zamknięcia.
+
+    Nagłówek CSV: Data, Otwarcie, Najwyzszy, Najnizszy, Zamkniecie, Wolumen
+
+    Zwraca:
+        Krotka (daty YYYYMMDD, ceny zamknięcia)
+    """
+    dates, closes = array('i'), array('d')
+
+    for line in text.splitlines()[1:]:
+        fields = line.split(',', 5)
+        if len(fields) < 5:
+            continue
+        try:
+            day = int(fields[0].replace('-', ''))
+            close = float(fields[4])
+        except ValueError:
+            continue
+        dates.append(day)
+        closes.append(close)
+
+    return dates, closes
+
+
+def update_series(symbol: str) -> Tuple[array, array]:
+    """
+    Dociąga ze Stooq notowania nowsze niż ostatnia zapisana data i zapisuje je.
+
+    Ostatni zapisany dzień jest pobierany ponownie, bo jego zamknięcie mogło
+    się zmienić (notowania w trakcie sesji).
+
+    Argumenty:
+        symbol: Symbol Stooq (np. 'xaupln')
+
+    Zwraca:
+        Krotka (daty YYYYMMDD, ceny zamknięcia) po aktualizacji
+
+    Wyjątki:
+        requests.RequestException przy błędzie sieci (zapisane dane pozostają bez zmian)
+    """
+    with _symbol_lock(symbol):
+        dates, closes = load_series(symbol)
+
+        if dates:
+            start = str(dates[-1])
+        else:
+            start = (date.today() - timedelta(days=INITIAL_HISTORY_DAYS)).strftime('%Y%m%d')
+        end = date.today().strftime('%Y%m%d')
+
+        response = http_get(f"https://stooq.pl/q/d/l/?s={symbol}&i=d&d1={start}&d2={end}")
+        response.raise_for_status()
+        new_dates, new_closes = parse_stooq_csv(response.text)
+
+        if new_dates:
+            # Zastąp wiersze od pierwszej pobranej daty (zwykle tylko ostatni dzień)
+            keep = len(dates)
+            while keep and dates[keep - 1] >= new_dates[0]:
+                keep -= 1
+            dates = dates[:keep] + new_dates
+            closes = closes[:keep] + new_closes
+            save_series(symbol, dates, closes)
+
+        return dates, closes
+
+
+def compute_changes(closes: array) -> Optional[Dict[str, float]]:
+    """
+    Oblicza cenę oraz zmianę dzienną i miesięczną z kolumny zamknięć.
+
+    Zwraca:
+        Słownik z ceną, zmianą dzienną i miesięczną lub None, jeśli brak danych
+    """
+    if not closes:
+        return None
+
+    price = closes[-1]
+    daily_change = 0.0
+    daily_change_percent = 0.0
+    monthly_change = 0.0
+    monthly_change_percent = 0.0
+
+    # Zmiana dzienna (vs Poprzednie zamknięcie)
+    if len(closes) >= 2:
+        prev_close = closes[-2]
+        daily_change = price - prev_close
+        daily_change_percent = (daily_change / prev_close) * 100
+
+    # Zmiana miesięczna (vs ~22 dni handlowe temu, a przy krótkiej historii vs pierwszy wiersz)
+    if len(closes) >= 2:
+        month_close = closes[-MONTH_SESSIONS] if len(closes) >= MONTH_SESSIONS else closes[0]
+        monthly_change = price - month_close
+        monthly_change_percent = (monthly_change / month_close) * 100
+
+    return {
+        'price': price,
+        'daily_change': daily_change,
+        'daily_change_percent': daily_change_percent,
+        'monthly_change': monthly_change,
+        'monthly_change_percent': monthly_change_percent
+    }
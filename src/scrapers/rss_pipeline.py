@@ -0,0 +1,206 @@
+"""
+Generyczny potok RSS
+Obsługuje wszystkie sekcje wiadomości opisane w rejestrze źródeł (sources.json):
+pobiera kanały, czyści wpisy według reguł sekcji, usuwa duplikaty i wybiera
+najlepsze wiadomości do limitu sekcji (ranking.py).
+"""
+
+import json
+from contextlib import closing
+from itertools import islice
+from typing import Dict, List, Optional
+
+from config import Config
+from ranking import rank_items
+from scrapers.feed_cache import iter_feed_entries
+from scrapers.text_cleaning import strip_html_tags
+from seen_index import get_seen_index
+
+
+_registry: Optional[Dict] = None
+
+# Reguły rankingu sekcji, gdy rejestr ich nie podaje
+DEFAULT_RANKING = {'half_life_hours': 12, 'coverage_weight': 0.5, 'keywords': {}}
+
+
+def load_registry(path: Optional[str] = None) -> Dict:
+    """
+    Wczytuje rejestr źródeł i uzupełnia wartości domyślne.
+
+    Argumenty:
+        path: Ścieżka do pliku JSON (domyślnie Config.SOURCES_FILE)
+
+    Zwraca:
+        Słownik z kluczami 'sections' (nazwa sekcji -> opis sekcji)
+        oraz 'markets' (instrumenty i okna analizy sekcji finansowej)
+    """
+    global _registry
+    if _registry is not None and path is None:
+        return _registry
+
+    with open(path or Config.SOURCES_FILE, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    defaults = raw.get('defaults', {})
+    default_cleaning = defaults.get('cleaning', {})
+    default_ranking = {**DEFAULT_RANKING, **defaults.get('ranking', {})}
+
+    sections = {}
+    for name, section in raw.get('sections', {}).items():
+        feed_limit = section.get('feed_limit', defaults.get('feed_limit', 5))
+        sections[name] = {
+            'name': name,
+            'label': section.get('label', name.upper()),
+            'description': section.get('description', name),
+            'limit': section.get('limit', defaults.get('section_limit', 3)),
+            'cleaning': {**default_cleaning, **section.get('cleaning', {})},
+            'ranking': {
+                **default_ranking,
+                **section.get('ranking', {}),
+                # Słowa kluczowe sekcji uzupełniają (nie zastępują) słowa domyślne
+                'keywords': {**default_ranking['keywords'], **section.get('ranking', {}).get('keywords', {})},
+            },
+            'feeds': [
+                {**feed, 'limit': feed.get('limit', feed_limit)}
+                for feed in section.get('feeds', [])
+            ],
+        }
+
+    markets = raw.get('markets', {})
+    instruments = []
+    for instrument in markets.get('instruments', []):
+        symbol = instrument['symbol']
+        name = instrument.get('name', symbol.upper())
+        instruments.append({
+            'key': instrument.get('key', symbol),
+            'symbol': symbol,
+            'display_symbol': instrument.get('display_symbol', symbol.upper()),
+            'name': name,
+            'label': instrument.get('label', name.upper()),
+            'currency': instrument.get('currency', 'PLN'),
+            'unit': instrument.get('unit', ''),
+        })
+
+    registry = {
+        'sections': sections,
+        'markets': {'instruments': instruments, 'windows': list(markets.get('windows', [5, 22, 66]))},
+    }
+    if path is None:
+        _registry = registry
+    return registry
+
+
+def get_section(name: str) -> Dict:
+    """Zwraca opis sekcji z rejestru (KeyError, jeśli sekcja nie istnieje)."""
+    return load_registry()['sections'][name]
+
+
+def build_news_item(entry: Dict, feed: Dict, cleaning: Dict) -> Dict[str, str]:
+    """
+    Tworzy ujednolicony element wiadomości z wpisu kanału.
+
+    Argumenty:
+        entry: Wpis kanału RSS
+        feed: Opis kanału z rejestru
+        cleaning: Reguły czyszczenia sekcji
+
+    Zwraca:
+        Słownik z kluczami title, summary, link, source, published
+    """
+    title = entry.get('title', 'Brak tytułu')
+    summary = entry.get('summary', entry.get('description', 'Brak opisu'))
+
+    if cleaning.get('strip_html'):
+        title = strip_html_tags(title)
+        summary = strip_html_tags(summary)
+
+    # Ogranicz długość podsumowania
+    max_length = cleaning.get('max_summary_length')
+    if max_length and len(summary) > max_length:
+        summary = summary[:max_length] + '...'
+
+    return {
+        'title': title,
+        'summary': summary,
+        'link': entry.get('link', ''),
+        'source': feed['name'],
+        'published': entry.get('published') or entry.get('updated') or 'Nieznana data'
+    }
+
+
+def fetch_feed_items(feed: Dict, cleaning: Dict) -> List[Dict[str, str]]:
+    """
+    Pobiera i czyści wpisy jednego kanału.
+
+    Artykuły wysłane już w poprzednich wydaniach są pomijane, a kanał jest
+    czytany dalej (do Config.FEED_MAX_SCAN wpisów), aby wypełnić limit.
+
+    Argumenty:
+        feed: Opis kanału z rejestru (name, url, limit)
+        cleaning: Reguły czyszczenia sekcji
+
+    Zwraca:
+        Lista elementów wiadomości (pusta w przypadku błędu)
+    """
+    seen = get_seen_index()
+    items = []
+
+    try:
+        # Strumieniowo - czytamy kanał tylko do osiągnięcia limitu
+        with closing(iter_feed_entries(feed['url'])) as entries:
+            for entry in islice(entries, max(Config.FEED_MAX_SCAN, feed['limit'])):
+                item = build_news_item(entry, feed, cleaning)
+                if seen is not None and seen.contains(item):
+                    continue
+                items.append(item)
+                if len(items) >= feed['limit']:
+                    break
+        return items
+    except Exception as e:
+        print(f"[OSTRZEŻENIE] Błąd pobierania z {feed['name']}: {e}")
+        return []
+
+
+def assemble_section(section: Dict, feed_items: List[List[Dict]]) -> List[Dict[str, str]]:
+    """
+    Łączy wyniki kanałów sekcji (w kolejności z rejestru) i usuwa duplikaty.
+
+    Wynik nie jest przycinany - to kandydaci dla rankingu (rank_items), który
+    wybiera section['limit'] najlepszych po scaleniu duplikatów między źródłami.
+
+    Argumenty:
+        section: Opis sekcji z rejestru
+        feed_items: Listy elementów z kolejnych kanałów sekcji
+
+    Zwraca:
+        Lista wszystkich elementów sekcji bez duplikatów
+    """
+    all_news = []
+    seen_links = set()
+    dedupe = section['cleaning'].get('dedupe_links', True)
+
+    for items in feed_items:
+        for item in items:
+            # Prosta deduplikacja po linku
+            if dedupe:
+                if item['link'] in seen_links:
+                    continue
+                seen_links.add(item['link'])
+            all_news.append(item)
+
+    return all_news
+
+
+def fetch_section(name: str) -> List[Dict[str, str]]:
+    """
+    Pobiera kolejno wszystkie kanały sekcji i wybiera najlepsze wiadomości.
+
+    Argumenty:
+        name: Nazwa sekcji z rejestru (np. 'world_news')
+
+    Zwraca:
+        Lista co najwyżej section['limit'] elementów wiadomości sekcji
+    """
+    section = get_section(name)
+    feed_items = [fetch_feed_items(feed, section['cleaning']) for feed in section['feeds']]
+    return rank_items(assemble_section(section, feed_items), section['limit'], section['ranking'])
@@ -0,0 +1,55 @@
+"""
+Narzędzia czyszczenia tekstu
+Wspólne funkcje porządkujące treść pobieraną z kanałów RSS.
+"""
+
+import html
+import re
+from functools import lru_cache
+
+
+# Skrypty i style usuwane razem z treścią, potem znaczniki HTML oraz markery CDATA
+# (treść CDATA zostaje zachowana)
+_MARKUP_RE = re.compile(
+    r'<(script|style)\b[^>]*>.*?</\1\s*>|<!\[CDATA\[|\]\]>|<[^>]+>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Encje nazwane i numeryczne (&amp; &bdquo; &#322; &#x27; ...)
+_ENTITY_RE = re.compile(r'&(?:#[0-9]{1,7}|#[xX][0-9a-fA-F]{1,6}|[A-Za-z][A-Za-z0-9]{1,31});')
+
+# Kanały używają w kółko tych samych kilkunastu encji - dekodujemy każdą raz
+_decode_entity = lru_cache(maxsize=2048)(html.unescape)
+
+
+def _replace_entity(match: 're.Match') -> str:
+    return _decode_entity(match.group())
+
+
+def strip_html_tags(text: str) -> str:
+    """
+    Usuwa znaczniki HTML i czyści treść tekstową.
+
+    Usuwa skrypty i style (razem z treścią), znaczniki i markery CDATA
+    (zachowując ich treść), dekoduje wszystkie
+    encje HTML (nazwane i numeryczne) i zwija białe znaki do pojedynczej spacji.
+    Etapy, których tekst nie potrzebuje (brak '<' lub '&'), są pomijane.
+
+    Argumenty:
+        text: Tekst potencjalnie zawierający HTML
+
+    Zwraca:
+        Czysty tekst bez znaczników HTML
+    """
+    if not text:
+        return ""
+
+    if '<' in text or ']]>' in text:
+        text = _MARKUP_RE.sub('', text)
+
+    if '&' in text:
+        text = _ENTITY_RE.sub(_replace_entity, text)
+
+    # split() bez argumentów zwija wszystkie białe znaki (także zdekodowane &nbsp;)
+    # i obcina je na końcach - w jednym przebiegu po stronie C
+    return ' '.join(text.split())
@@ -3,13 +3,15 @@ Skraper wiadomości ze świata
 Pobiera 3 najważniejsze wiadomości ze świata z międzynarodowych kanałów RSS.
 """
 
-import feedparser
+from scrapers.feed_cache import fetch_feed_entries
+from scrapers.rss_pipeline import fetch_section, get_section
+from ranking import rank_items
 from typing import List, Dict
 
 
 def fetch_world_news() -> List[Dict[str, str]]:
     """
-    Pobiera 3 najważniejsze wiadomości ze świata wyłącznie z BBC (Top Stories oraz World).
+    Pobiera 3 najważniejsze wiadomości ze świata (kanały sekcji 'world_news' z rejestru źródeł).
     
     Zwraca:
         Lista słowników zawierających wiadomości z kluczami:
@@ -19,46 +21,7 @@ def fetch_world_news() -> List[Dict[str, str]]:
         - source: Nazwa źródła wiadomości
         - published: Data publikacji
     """
-    news_sources = [
-        {
-            'url': 'http://feeds.bbci.co.uk/news/rss.xml', # Top Stories
-            'name': 'BBC Info'
-        },
-        {
-            'url': 'http://feeds.bbci.co.uk/news/world/rss.xml', # World
-            'name': 'BBC World'
-        }
-    ]
-    
-    all_news = []
-    seen_links = set()
-    
-    for source in news_sources:
-        try:
-            feed = feedparser.parse(source['url'])
-            # Pobierz nieco więcej, aby po deduplikacji zostało wystarczająco dużo
-            for entry in feed.entries[:5]:
-                link = entry.get('link', '')
-                
-                # Prosta deduplikacja po linku
-                if link in seen_links:
-                    continue
-                seen_links.add(link)
-
-                news_item = {
-                    'title': entry.get('title', 'Brak tytułu'),
-                    'summary': entry.get('summary', entry.get('description', 'Brak dostępnego podsumowania')),
-                    'link': link,
-                    'source': source['name'],
-                    'published': entry.get('published', 'Nieznana data')
-                }
-                all_news.append(news_item)
-        except Exception as e:
-            print(f"[OSTRZEŻENIE] Błąd pobierania z {source['name']}: {e}")
-            continue
-    
-    # Zwróć 3 najlepsze unikalne wiadomości
-    return all_news[:3]
+    return fetch_section('world_news')
 
 
 def parse_rss_feed(url: str) -> List[Dict]:
@@ -72,8 +35,7 @@ def parse_rss_feed(url: str) -> List[Dict]:
         Lista sparsowanych wiadomości
     """
     try:
-        feed = feedparser.parse(url)
-        return feed.entries
+        return fetch_feed_entries(url)
     except Exception as e:
         print(f"Błąd parsowania kanału RSS {url}: {e}")
         return []
@@ -81,17 +43,16 @@ def parse_rss_feed(url: str) -> List[Dict]:
 
 def filter_and_rank_news(items: List[Dict]) -> List[Dict]:
     """
-    Filtruje i rankuje wiadomości według trafności i aktualności.
+    Filtruje i rankuje wiadomości według trafności i aktualności
+    (reguły rankingu sekcji 'world_news' z rejestru źródeł).
     
     Argumenty:
         items: Lista wiadomości
         
     Zwraca:
-        Przefiltrowana i posortowana lista
+        Lista bez duplikatów, posortowana od najwyżej ocenionej
     """
-    # Na razie zwracam elementy bez zmian
-    # Można dodać bardziej zaawansowany ranking później
-    return items
+    return rank_items(items, len(items), get_section('world_news')['ranking'])
 
 
 if __name__ == "__main__":
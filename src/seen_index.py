@@ -0,0 +1,193 @@
+"""
+Indeks wysłanych artykułów
+Trwały, zwarty zbiór artykułów, które trafiły już do newslettera.
+Artykuł rozpoznajemy po znormalizowanym URL lub po tytule (skrót 64-bitowy),
+a wpisy starsze niż okres retencji są usuwane przy wczytaniu.
+Artykuły wysłane części subskrybentów czekają jako wpisy oczekujące - nie są
+pomijane, dopóki tego dnia nie zostaną obsłużeni wszyscy subskrybenci
+(lub nie zacznie się kolejny dzień w strefie Config.TIMEZONE).
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import pytz
+
+from config import Config
+
+
+# Parametry śledzące dodawane przez kanały RSS (BBC: at_medium, at_campaign)
+TRACKING_PARAMS = frozenset(['at_medium', 'at_campaign', 'fbclid', 'gclid', 'ocid'])
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizuje URL artykułu: bez schematu, 'www.', fragmentu, parametrów śledzących
+    i końcowego ukośnika; pozostałe parametry posortowane.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith('utm_')
+    )
+    path = parts.path.rstrip('/')
+    return f"{host}{path}?{urlencode(query)}" if query else f"{host}{path}"
+
+
+def normalize_title(title: str) -> str:
+    """Normalizuje tytuł: małe litery, same słowa oddzielone spacją."""
+    return ' '.join(_WORD_RE.findall(title.casefold()))
+
+
+def digest(value: str) -> str:
+    """Zwraca 64-bitowy skrót tekstu (16 znaków hex)."""
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def start_of_day(timestamp: Optional[float] = None) -> float:
+    """Zwraca początek dnia (północ w Config.TIMEZONE) zawierającego podaną chwilę."""
+    tz = pytz.timezone(Config.TIMEZONE)
+    local = datetime.fromtimestamp(time.time() if timestamp is None else timestamp, tz)
+    midnight = local.replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+    return tz.localize(midnight).timestamp()
+
+
+class SeenIndex:
+    """Trwały indeks wysłanych artykułów z wygasaniem po czasie."""
+
+    def __init__(self, path: str, retention_days: float):
+        self.path = path
+        self.retention = retention_days * 86400
+        self._entries: Dict[str, int] = {}
+        # Wysłane tylko części dzisiejszych subskrybentów - jeszcze nie pomijane
+        self._pending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def keys_for(item: Dict) -> List[str]:
+        """Zwraca klucze artykułu: 'u' + skrót URL oraz 't' + skrót tytułu."""
+        keys = []
+        if item.get('link'):
+            keys.append('u' + digest(normalize_url(item['link'])))
+        title = normalize_title(item.get('title', ''))
+        if title:
+            keys.append('t' + digest(title))
+        return keys
+
+    def load(self) -> None:
+        """
+        Wczytuje indeks z dysku, pomijając wpisy starsze niż okres retencji.
+
+        Wpisy oczekujące z poprzednich dni stają się zwykłymi wpisami.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+
+        cutoff = time.time() - self.retention
+        self._entries = {key: ts for key, ts in stored.get('entries', {}).items() if ts >= cutoff}
+        self._pending = {key: ts for key, ts in stored.get('pending', {}).items() if ts >= cutoff}
+        self.commit_pending(before=start_of_day())
+
+    def contains(self, item: Dict) -> bool:
+        """Sprawdza w O(1), czy artykuł (po URL lub tytule) był już wysłany."""
+        return any(key in self._entries for key in self.keys_for(item))
+
+    def add(self, items: Iterable[Dict], timestamp: Optional[float] = None, pending: bool = False) -> None:
+        """
+        Dodaje artykuły do indeksu.
+
+        Argumenty:
+            items: Wysłane artykuły
+            timestamp: Czas wysłania (domyślnie teraz)
+            pending: Zapisz jako oczekujące - contains() uwzględni je dopiero po commit_pending()
+        """
+        ts = int(timestamp or time.time())
+        target = self._pending if pending else self._entries
+        with self._lock:
+            for item in items:
+                for key in self.keys_for(item):
+                    target[key] = ts
+
+    def commit_pending(self, before: Optional[float] = None) -> int:
+        """
+        Zamienia wpisy oczekujące w zwykłe (od teraz pomijane przez contains()).
+
+        Argumenty:
+            before: Tylko wpisy dodane przed tą chwilą (domyślnie wszystkie)
+
+        Zwraca:
+            Liczba zatwierdzonych kluczy
+        """
+        with self._lock:
+            committed = {key: ts for key, ts in self._pending.items() if before is None or ts < before}
+            for key in committed:
+                del self._pending[key]
+            self._entries.update(committed)
+        return len(committed)
+
+    def save(self) -> None:
+        """Zapisuje indeks atomowo (plik tymczasowy + zamiana nazwy)."""
+        with self._lock:
+            # Proces demona nie wczytuje indeksu ponownie - wygasłe wpisy usuwamy przy zapisie
+            cutoff = time.time() - self.retention
+            self._entries = {key: ts for key, ts in self._entries.items() if ts >= cutoff}
+            data = {'version': 1, 'entries': dict(self._entries), 'pending': dict(self._pending)}
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[OSTRZEŻENIE] Nie można zapisać indeksu wysłanych artykułów: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_index: Optional[SeenIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_seen_index() -> Optional[SeenIndex]:
+    """
+    Zwraca współdzielony indeks wysłanych artykułów.
+
+    Proces demona trzyma indeks w pamięci, więc wpisy oczekujące z poprzednich
+    dni są zatwierdzane przy każdym pobraniu indeksu.
+
+    Zwraca:
+        SeenIndex lub None, jeśli deduplikacja między uruchomieniami jest wyłączona
+    """
+    global _index
+    if not Config.SEEN_INDEX_ENABLED:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SeenIndex(
+                    os.path.join(Config.CACHE_DIR, 'seen_articles.json'),
+                    Config.SEEN_RETENTION_DAYS
+                )
+    elif _index._pending:
+        _index.commit_pending(before=start_of_day())
+    return _index
@@ -0,0 +1,93 @@
+"""
+Migawka wiadomości dla dwufazowej pracy
+Faza pobierania (python src/main.py collect) zapisuje wynik collect_all_news
+po scaleniu duplikatów, a faza wysyłki (python src/main.py send) tylko
+renderuje i wysyła z tej migawki - czas wysyłki nie zależy od czasu
+odpowiedzi BBC, Gazety Wyborczej, Bankier.pl, Stooq czy NBP.
+"""
+
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from config import Config
+from seen_index import get_seen_index
+
+
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(news_data: Dict, path: Optional[str] = None) -> None:
+    """
+    Zapisuje migawkę atomowo (plik tymczasowy + zamiana nazwy).
+
+    Argumenty:
+        news_data: Dane wiadomości gotowe do renderowania
+        path: Ścieżka pliku (domyślnie Config.SNAPSHOT_FILE)
+
+    Wyjątki:
+        OSError: Gdy migawki nie można zapisać
+    """
+    path = path or Config.SNAPSHOT_FILE
+    data = {'version': SNAPSHOT_VERSION, 'created_at': time.time(), 'news_data': news_data}
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(max_age_minutes: Optional[float] = None, path: Optional[str] = None) -> Optional[Dict]:
+    """
+    Wczytuje aktualną migawkę. Artykuły oznaczone jako wysłane po jej
+    utworzeniu (np. wcześniejsza wysyłka z tej samej migawki) są pomijane.
+
+    Argumenty:
+        max_age_minutes: Maksymalny wiek migawki (domyślnie Config.SNAPSHOT_MAX_AGE_MINUTES)
+        path: Ścieżka pliku (domyślnie Config.SNAPSHOT_FILE)
+
+    Zwraca:
+        Dane wiadomości lub None, gdy migawki brak albo jest nieaktualna
+    """
+    path = path or Config.SNAPSHOT_FILE
+    max_age = Config.SNAPSHOT_MAX_AGE_MINUTES if max_age_minutes is None else max_age_minutes
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        print(f"[OSTRZEŻENIE] Brak migawki wiadomości {path} - pobieranie na miejscu")
+        return None
+    except (OSError, ValueError) as e:
+        print(f"[OSTRZEŻENIE] Nie można wczytać migawki wiadomości {path}: {e}")
+        return None
+
+    if data.get('version') != SNAPSHOT_VERSION:
+        print(f"[OSTRZEŻENIE] Nieobsługiwana wersja migawki {path} - pobieranie na miejscu")
+        return None
+    created = datetime.fromtimestamp(data['created_at']).strftime('%Y-%m-%d %H:%M')
+    age_minutes = (time.time() - data['created_at']) / 60
+    if age_minutes > max_age:
+        print(f"[OSTRZEŻENIE] Migawka z {created} jest starsza niż {max_age:.0f} min - pobieranie na miejscu")
+        return None
+
+    print(f"[MIGAWKA] Wiadomości z {created} ({age_minutes:.0f} min temu)")
+    return drop_seen(data['news_data'])
+
+
+def drop_seen(news_data: Dict) -> Dict:
+    """Usuwa z sekcji artykuły, które są już w indeksie wysłanych."""
+    seen = get_seen_index()
+    if seen is None:
+        return news_data
+    return {
+        key: [item for item in items if not seen.contains(item)] if isinstance(items, list) else items
+        for key, items in news_data.items()
+    }
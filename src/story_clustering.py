@@ -0,0 +1,212 @@
+"""
+Grupowanie bliskich duplikatów
+Wykrywa ten sam temat opublikowany pod różnymi adresami (np. BBC Info i BBC World,
+przedruki między polskimi serwisami). Sygnatury MinHash tytułu i opisu trafiają
+do indeksu LSH, więc porównywane są tylko pary kandydatów, a nie wszystkie pary.
+"""
+
+import hashlib
+import random
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import Config
+from scrapers.text_cleaning import strip_html_tags
+
+
+# Liczba permutacji MinHash; podział na pasma zależy od progu (lsh_parameters)
+NUM_PERMUTATIONS = 32
+# Minimalne prawdopodobieństwo, że para o podobieństwie równym progowi trafi do kandydatów
+MIN_CANDIDATE_PROBABILITY = 0.95
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Stałe współczynniki permutacji - sygnatury porównywalne między uruchomieniami
+_rng = random.Random(1234)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_WORD_RE = re.compile(r'\w{3,}')
+
+
+def tokenize(item: Dict) -> Set[str]:
+    """Zwraca zbiór słów (min. 3 znaki) z tytułu i opisu wiadomości."""
+    text = f"{item.get('title', '')} {strip_html_tags(item.get('summary', ''))}"
+    return set(_WORD_RE.findall(text.casefold()))
+
+
+def minhash(tokens: Set[str]) -> Tuple[int, ...]:
+    """
+    Oblicza sygnaturę MinHash zbioru słów.
+
+    Argumenty:
+        tokens: Zbiór słów
+
+    Zwraca:
+        Krotka NUM_PERMUTATIONS wartości minimalnych
+    """
+    hashes = [
+        int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little')
+        for token in tokens
+    ]
+    if not hashes:
+        return (_MAX_HASH,) * NUM_PERMUTATIONS
+
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    )
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Dokładne podobieństwo Jaccarda dwóch zbiorów."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def candidate_probability(similarity: float, bands: int, rows: int) -> float:
+    """Prawdopodobieństwo, że para o danym podobieństwie Jaccarda wspólnie trafi do któregoś pasma LSH."""
+    return 1 - (1 - similarity ** rows) ** bands
+
+
+def lsh_parameters(threshold: float) -> Tuple[int, int]:
+    """
+    Dobiera podział sygnatury na pasma do progu podobieństwa.
+
+    Więcej wierszy w paśmie to mniej par kandydatów, ale też mniejsza szansa,
+    że para na progu zostanie w ogóle porównana. Wybierany jest podział z największą
+    liczbą wierszy, przy którym para o podobieństwie równym progowi jest kandydatem
+    z prawdopodobieństwem co najmniej MIN_CANDIDATE_PROBABILITY (dla progu 0.5:
+    16 pasm po 2 wiersze).
+
+    Argumenty:
+        threshold: Próg podobieństwa Jaccarda
+
+    Zwraca:
+        Krotka (liczba pasm, liczba wierszy w paśmie)
+    """
+    for rows in sorted((r for r in range(1, NUM_PERMUTATIONS + 1) if NUM_PERMUTATIONS % r == 0), reverse=True):
+        bands = NUM_PERMUTATIONS // rows
+        if candidate_probability(threshold, bands, rows) >= MIN_CANDIDATE_PROBABILITY:
+            return bands, rows
+    return NUM_PERMUTATIONS, 1
+
+
+def find_duplicate_groups(items: List[Dict], threshold: float) -> List[List[int]]:
+    """
+    Znajduje grupy bliskich duplikatów.
+
+    Argumenty:
+        items: Lista wiadomości
+        threshold: Minimalne podobieństwo Jaccarda, by uznać dwie wiadomości za ten sam temat
+
+    Zwraca:
+        Lista grup (indeksy w items, rosnąco); tylko grupy z co najmniej dwoma elementami
+    """
+    token_sets = [tokenize(item) for item in items]
+    bands, rows = lsh_parameters(threshold)
+
+    # Indeks LSH: (pasmo, wartości pasma) -> indeksy wiadomości
+    buckets: Dict[Tuple, List[int]] = defaultdict(list)
+    for index, tokens in enumerate(token_sets):
+        if not tokens:
+            continue
+        signature = minhash(tokens)
+        for band in range(bands):
+            buckets[(band, signature[band * rows:(band + 1) * rows])].append(index)
+
+    # Union-find po parach kandydatów potwierdzonych dokładnym Jaccardem
+    parent = list(range(len(items)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    checked = set()
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:]:
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                if jaccard(token_sets[i], token_sets[j]) >= threshold:
+                    root_i, root_j = find(i), find(j)
+                    if root_i != root_j:
+                        # Reprezentantem zostaje wiadomość występująca wcześniej
+                        parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for index in range(len(items)):
+        groups[find(index)].append(index)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def cluster_news(news_data: Dict, threshold: Optional[float] = None) -> Dict:
+    """
+    Scala bliskie duplikaty w jedną wiadomość w każdej sekcji.
+
+    Duplikaty są wyszukiwane we wszystkich sekcjach naraz, ale scalane tylko
+    w obrębie sekcji: w każdej sekcji zostaje jej najwcześniejsza wiadomość
+    z grupy, a pozostałe wiadomości grupy (także z innych sekcji) trafiają
+    do jej listy 'alternative_sources'. Temat nie znika więc z sekcji, gdy inna
+    sekcja podała go wcześniej - subskrybent, który wybrał tylko jedną z nich,
+    nadal go dostanie.
+
+    Argumenty:
+        news_data: Słownik z pobranymi danymi (sekcje jako listy wiadomości)
+        threshold: Próg podobieństwa (domyślnie Config.DUPLICATE_THRESHOLD)
+
+    Zwraca:
+        Nowy słownik news_data bez duplikatów
+    """
+    threshold = Config.DUPLICATE_THRESHOLD if threshold is None else threshold
+
+    # Spłaszczenie wszystkich sekcji z zapamiętaniem pochodzenia
+    positions = []
+    items = []
+    for section, section_items in news_data.items():
+        if isinstance(section_items, list):
+            for item in section_items:
+                positions.append(section)
+                items.append(item)
+
+    removed = set()
+    merged = {}
+    for group in find_duplicate_groups(items, threshold):
+        keepers: Dict[str, int] = {}
+        for index in group:
+            keepers.setdefault(positions[index], index)
+
+        for keeper in keepers.values():
+            alternatives = list(items[keeper].get('alternative_sources', []))
+            links = {items[keeper].get('link')} | {alternative.get('link') for alternative in alternatives}
+            for index in group:
+                duplicate = items[index]
+                if index == keeper or duplicate.get('link') in links:
+                    continue
+                links.add(duplicate.get('link'))
+                alternatives.append({
+                    'source': duplicate.get('source', ''),
+                    'link': duplicate.get('link', ''),
+                    'title': duplicate.get('title', '')
+                })
+            merged[keeper] = {**items[keeper], 'alternative_sources': alternatives}
+        removed.update(index for index in group if index not in merged)
+
+    result = {key: value for key, value in news_data.items() if not isinstance(value, list)}
+    for section in news_data:
+        if isinstance(news_data[section], list):
+            result[section] = []
+    for index, (section, item) in enumerate(zip(positions, items)):
+        if index not in removed:
+            result[section].append(merged.get(index, item))
+
+    # Zachowaj kolejność kluczy z wejścia
+    return {key: result[key] for key in news_data}
@@ -0,0 +1,399 @@
+"""
+Baza subskrybentów
+Przechowuje subskrybentów newslettera w SQLite wraz z preferencjami:
+wybrane sekcje, liczba wiadomości w sekcji i godzina wysyłki.
+Dane pobierane są raz na uruchomienie, a każdy subskrybent dostaje
+wydanie złożone z tych samych, wspólnych danych.
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pytz
+
+from config import Config
+from scheduler import Schedule
+from scrapers.rss_pipeline import load_registry
+
+
+# Sekcje do wyboru: klucze news_data (sekcje z rejestru źródeł + sekcja finansowa)
+FINANCIAL_SECTION = 'financial_data'
+DEFAULT_SECTIONS = ('world_news', 'polish_news', 'bankier_news', FINANCIAL_SECTION)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscribers (
+    email TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    sections TEXT NOT NULL,
+    items_per_section INTEGER,
+    delivery_time TEXT,
+    active INTEGER NOT NULL DEFAULT 1,
+    last_sent TEXT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def row_to_subscriber(row: sqlite3.Row) -> Dict:
+    """Zamienia wiersz tabeli na słownik subskrybenta."""
+    return {
+        'email': row['email'],
+        'name': row['name'],
+        'sections': tuple(row['sections'].split(',')) if row['sections'] else (),
+        'items_per_section': row['items_per_section'],
+        'delivery_time': row['delivery_time'],
+        'active': bool(row['active']),
+        'last_sent': row['last_sent'],
+    }
+
+
+def default_subscriber(email: str) -> Dict:
+    """Subskrybent z domyślnymi preferencjami (wszystkie sekcje, limity z rejestru)."""
+    return {
+        'email': email,
+        'name': '',
+        'sections': DEFAULT_SECTIONS,
+        'items_per_section': None,
+        'delivery_time': None,
+        'active': True,
+        'last_sent': None,
+    }
+
+
+def local_now() -> datetime:
+    """Zwraca bieżący czas w strefie Config.TIMEZONE."""
+    return datetime.now(pytz.timezone(Config.TIMEZONE))
+
+
+class SubscriberStore:
+    """Subskrybenci i ich preferencje w bazie SQLite."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.SUBSCRIBERS_DB
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def add(self, email: str, sections: Optional[Iterable[str]] = None,
+            items_per_section: Optional[int] = None, delivery_time: Optional[str] = None,
+            name: str = '') -> Dict:
+        """
+        Dodaje subskrybenta lub aktualizuje jego preferencje.
+
+        Argumenty:
+            email: Adres email
+            sections: Wybrane sekcje (domyślnie wszystkie z DEFAULT_SECTIONS)
+            items_per_section: Liczba wiadomości w sekcji (None = limit z rejestru)
+            delivery_time: Godzina wysyłki 'HH:MM' w Config.TIMEZONE (None = każde uruchomienie)
+            name: Imię lub opis subskrybenta
+
+        Zwraca:
+            Zapisany subskrybent
+        """
+        sections = tuple(sections) if sections else DEFAULT_SECTIONS
+        unknown = [section for section in sections if section not in DEFAULT_SECTIONS]
+        if unknown:
+            raise ValueError(f"Nieznane sekcje: {', '.join(unknown)}")
+        if delivery_time is not None:
+            delivery_time = datetime.strptime(delivery_time, '%H:%M').strftime('%H:%M')
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO subscribers (email, name, sections, items_per_section, delivery_time, active)
+                VALUES (?, ?, ?, ?, ?, 1)
+                ON CONFLICT(email) DO UPDATE SET
+                    name = excluded.name,
+                    sections = excluded.sections,
+                    items_per_section = excluded.items_per_section,
+                    delivery_time = excluded.delivery_time,
+                    active = 1
+                """,
+                (email.strip().lower(), name, ','.join(sections), items_per_section, delivery_time)
+            )
+        return self.get(email)
+
+    def get(self, email: str) -> Optional[Dict]:
+        """Zwraca subskrybenta o podanym adresie lub None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM subscribers WHERE email = ?", (email.strip().lower(),)
+            ).fetchone()
+        return row_to_subscriber(row) if row else None
+
+    def remove(self, email: str) -> bool:
+        """Usuwa subskrybenta. Zwraca True, jeśli istniał."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM subscribers WHERE email = ?", (email.strip().lower(),))
+        return cursor.rowcount > 0
+
+    def set_active(self, email: str, active: bool) -> bool:
+        """Wstrzymuje lub wznawia wysyłkę do subskrybenta. Zwraca True, jeśli istniał."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE subscribers SET active = ? WHERE email = ?", (int(active), email.strip().lower())
+            )
+        return cursor.rowcount > 0
+
+    def list(self, active_only: bool = False) -> List[Dict]:
+        """Zwraca wszystkich (lub tylko aktywnych) subskrybentów."""
+        query = "SELECT * FROM subscribers"
+        if active_only:
+            query += " WHERE active = 1"
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY email").fetchall()
+        return [row_to_subscriber(row) for row in rows]
+
+    def due(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Zwraca aktywnych subskrybentów, którym należy się dzisiejsze wydanie.
+
+        Subskrybent jest "do wysłania", jeśli nie dostał jeszcze wydania z dzisiejszą datą
+        i jego godzina wysyłki minęła (lub jej nie ustawił).
+
+        Argumenty:
+            now: Bieżący czas lokalny (domyślnie teraz w Config.TIMEZONE)
+        """
+        now = now or local_now()
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT * FROM subscribers
+                WHERE active = 1
+                  AND (last_sent IS NULL OR last_sent < ?)
+                  AND (delivery_time IS NULL OR delivery_time <= ?)
+                ORDER BY email
+                """,
+                (now.strftime('%Y-%m-%d'), now.strftime('%H:%M'))
+            ).fetchall()
+        return [row_to_subscriber(row) for row in rows]
+
+    def awaiting(self, now: Optional[datetime] = None) -> int:
+        """
+        Zwraca liczbę aktywnych subskrybentów bez dzisiejszego wydania
+        (także tych, których godzina wysyłki jeszcze nie minęła).
+
+        Argumenty:
+            now: Bieżący czas lokalny (domyślnie teraz w Config.TIMEZONE)
+        """
+        now = now or local_now()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM subscribers WHERE active = 1 AND (last_sent IS NULL OR last_sent < ?)",
+                (now.strftime('%Y-%m-%d'),)
+            ).fetchone()
+        return row[0]
+
+    def mark_sent(self, emails: Iterable[str], now: Optional[datetime] = None) -> None:
+        """Zapisuje datę wysłania wydania dla podanych subskrybentów."""
+        day = (now or local_now()).strftime('%Y-%m-%d')
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE subscribers SET last_sent = ? WHERE email = ?",
+                [(day, email.strip().lower()) for email in emails]
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> 'SubscriberStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def get_due_subscribers() -> List[Dict]:
+    """
+    Zwraca subskrybentów do obsłużenia w tym uruchomieniu.
+
+    Gdy baza subskrybentów jest pusta lub nie istnieje, odbiorcami są adresy
+    z Config.EMAIL_RECIPIENTS z domyślnymi preferencjami (zgodność wstecz).
+    """
+    if os.path.exists(Config.SUBSCRIBERS_DB):
+        with SubscriberStore() as store:
+            if store.list():
+                return store.due()
+    return [default_subscriber(email) for email in Config.EMAIL_RECIPIENTS]
+
+
+def get_active_subscribers() -> List[Dict]:
+    """Zwraca wszystkich aktywnych subskrybentów (bez względu na godzinę wysyłki)."""
+    if os.path.exists(Config.SUBSCRIBERS_DB):
+        with SubscriberStore() as store:
+            if store.list():
+                return store.list(active_only=True)
+    return [default_subscriber(email) for email in Config.EMAIL_RECIPIENTS]
+
+
+def mark_subscribers_sent(emails: Iterable[str]) -> None:
+    """Zapisuje wysłanie wydania w bazie (jeśli istnieje)."""
+    if not os.path.exists(Config.SUBSCRIBERS_DB):
+        return
+    with SubscriberStore() as store:
+        store.mark_sent(emails)
+
+
+def candidate_depth(subscribers: Iterable[Dict]) -> int:
+    """
+    Zwraca największą liczbę wiadomości w sekcji zamówioną przez subskrybentów.
+
+    Ranking zostawia w każdej sekcji tylu kandydatów (co najmniej limit z rejestru),
+    a select_edition przycina je dla każdego subskrybenta osobno.
+    """
+    return max((subscriber.get('items_per_section') or 0 for subscriber in subscribers), default=0)
+
+
+def all_served_today() -> bool:
+    """
+    Sprawdza, czy wszyscy aktywni subskrybenci dostali już dzisiejsze wydanie.
+
+    Do tego czasu wysłane artykuły są w indeksie tylko jako oczekujące, żeby
+    subskrybenci z późniejszą godziną wysyłki dostali te same wiadomości.
+    Bez bazy subskrybentów (EMAIL_RECIPIENTS) każde uruchomienie obsługuje wszystkich.
+    """
+    if not os.path.exists(Config.SUBSCRIBERS_DB):
+        return True
+    with SubscriberStore() as store:
+        return store.awaiting() == 0
+
+
+def select_edition(news_data: Dict, subscriber: Dict) -> Dict:
+    """
+    Wybiera z pobranych danych sekcje i liczbę wiadomości według preferencji subskrybenta.
+
+    Argumenty:
+        news_data: Wspólne dane pobrane w tym uruchomieniu (sekcje od najwyżej ocenionej
+                   wiadomości, z zapasem kandydatów ponad limit sekcji)
+        subscriber: Subskrybent z preferencjami
+
+    Zwraca:
+        Słownik news_data dla subskrybenta; niewybrane sekcje mają wartość None,
+        a sekcje z listą mają items_per_section wiadomości (lub limit sekcji z rejestru)
+    """
+    sections = load_registry()['sections']
+    edition = {}
+    for key, value in news_data.items():
+        if key not in subscriber['sections']:
+            edition[key] = None
+        elif isinstance(value, list) and key in sections:
+            edition[key] = value[:subscriber.get('items_per_section') or sections[key]['limit']]
+        else:
+            edition[key] = value
+    return edition
+
+
+def preference_signature(subscriber: Dict) -> Tuple:
+    """
+    Zwraca podpis preferencji wpływających na treść wydania.
+
+    Subskrybenci o tym samym podpisie dostają identyczne wydanie (godzina wysyłki
+    nie zmienia treści), więc wystarczy je wyrenderować raz.
+    """
+    sections = tuple(section for section in DEFAULT_SECTIONS if section in subscriber['sections'])
+    return sections, subscriber.get('items_per_section')
+
+
+def group_by_preferences(subscribers: Iterable[Dict]) -> Dict[Tuple, List[Dict]]:
+    """Grupuje subskrybentów w segmenty o jednakowym podpisie preferencji."""
+    segments: Dict[Tuple, List[Dict]] = {}
+    for subscriber in subscribers:
+        segments.setdefault(preference_signature(subscriber), []).append(subscriber)
+    return segments
+
+
+def merge_editions(editions: Iterable[Dict]) -> Dict:
+    """
+    Łączy wydania w dane zawierające każdą wiadomość, która trafiła do któregoś z nich.
+
+    Służy do oznaczania artykułów jako wysłanych - wiadomości pominięte przez
+    wszystkie preferencje mogą pojawić się w kolejnym wydaniu.
+
+    Argumenty:
+        editions: Wydania (wyniki select_edition) dostarczone subskrybentom
+    """
+    merged: Dict = {}
+    for edition in editions:
+        for key, value in edition.items():
+            if value is None:
+                continue
+            if isinstance(value, list) and len(merged.get(key) or ()) > len(value):
+                continue
+            merged[key] = value
+    return merged
+
+
+def check_delivery_time(delivery_time: Optional[str]) -> Optional[str]:
+    """
+    Sprawdza, czy demon obsłuży godzinę wysyłki.
+
+    Uruchomienie obsługuje tylko subskrybentów, których godzina już minęła, więc
+    godzina późniejsza niż ostatni termin Config.DAEMON_SCHEDULE nigdy nie zostanie obsłużona.
+
+    Zwraca:
+        Ostrzeżenie lub None, gdy godzina jest osiągalna (albo nie jest ustawiona)
+    """
+    if not delivery_time:
+        return None
+    try:
+        latest = Schedule.from_config(Config.DAEMON_SCHEDULE).latest_time()
+    except ValueError:
+        return None
+    if delivery_time > latest:
+        return (f"Godzina wysyłki {delivery_time} jest późniejsza niż ostatni termin DAEMON_SCHEDULE "
+                f"({latest}) - demon nie wyśle temu subskrybentowi wydania")
+    return None
+
+
+def main() -> None:
+    """Narzędzie wiersza poleceń do zarządzania subskrybentami."""
+    parser = argparse.ArgumentParser(description="Zarządzanie subskrybentami newslettera")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="Dodaj lub zaktualizuj subskrybenta")
+    add.add_argument('email')
+    add.add_argument('--sections', help=f"Sekcje oddzielone przecinkami ({', '.join(DEFAULT_SECTIONS)})")
+    add.add_argument('--items', type=int, help="Liczba wiadomości w sekcji")
+    add.add_argument('--time', help="Godzina wysyłki HH:MM")
+    add.add_argument('--name', default='')
+
+    for command, help_text in (('remove', "Usuń subskrybenta"), ('pause', "Wstrzymaj wysyłkę"),
+                               ('resume', "Wznów wysyłkę")):
+        commands.add_parser(command, help=help_text).add_argument('email')
+    commands.add_parser('list', help="Wyświetl subskrybentów")
+
+    args = parser.parse_args()
+    with SubscriberStore() as store:
+        if args.command == 'add':
+            sections = args.sections.split(',') if args.sections else None
+            subscriber = store.add(args.email, sections, args.items, args.time, args.name)
+            print(f"[OK] Zapisano: {subscriber['email']} ({', '.join(subscriber['sections'])})")
+            warning = check_delivery_time(subscriber['delivery_time'])
+            if warning:
+                print(f"[OSTRZEŻENIE] {warning}")
+        elif args.command == 'remove':
+            print("[OK] Usunięto" if store.remove(args.email) else "[OSTRZEŻENIE] Brak subskrybenta")
+        elif args.command in ('pause', 'resume'):
+            found = store.set_active(args.email, args.command == 'resume')
+            print("[OK] Zapisano" if found else "[OSTRZEŻENIE] Brak subskrybenta")
+        else:
+            for subscriber in store.list():
+                status = 'aktywny' if subscriber['active'] else 'wstrzymany'
+                print(
+                    f"{subscriber['email']:<35} {status:<10} {','.join(subscriber['sections']):<50} "
+                    f"wiad.: {subscriber['items_per_section'] or '-':<3} godz.: {subscriber['delivery_time'] or '-':<5} "
+                    f"ostatnio: {subscriber['last_sent'] or '-'}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Streszczenia ekstrakcyjne
+Zamiast ucinać opis po 200 znakach (w połowie słowa) wybiera z tekstu
+artykułu (lub opisu z kanału) najważniejsze całe zdania mieszczące się
+w limicie bajtów. Zdania są oceniane podobieństwem TF-IDF do całego
+artykułu - liczonym naraz dla wszystkich artykułów uruchomienia na rzadkich
+tablicach numpy (bez modeli i bez sieci).
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config import Config
+from scrapers.text_cleaning import strip_html_tags
+
+
+# Koniec zdania: . ! ? … (ew. cudzysłów/nawias) i odstęp przed wielką literą lub cyfrą
+_SENTENCE_RE = re.compile(r'(?<=[.!?…])["”»)]*\s+(?=["„«(]?[A-ZĄĆĘŁŃÓŚŹŻ0-9])')
+_WORD_RE = re.compile(r'\w{3,}')
+
+# Skróty, po których kropka nie kończy zdania (przed nazwą lub liczbą); skróty
+# jednostek (tys., mln, proc., r.) często kończą zdanie, więc ich tu nie ma
+ABBREVIATIONS = frozenset([
+    'np', 'm.in', 'tzw', 'tj', 'ok', 'godz', 'prof', 'dr', 'hab', 'inż', 'mgr',
+    'ul', 'al', 'pl', 'św', 'gen', 'płk', 'ks', 'red', 'por', 'zob', 'wg', 'ws', 'nr', 'art', 'ust',
+    'mr', 'mrs', 'ms', 'st', 'vs', 'etc', 'jr', 'sr', 'inc', 'ltd', 'co', 'no',
+])
+STOPWORDS = frozenset([
+    'oraz', 'jest', 'się', 'nie', 'jak', 'ale', 'dla', 'przez', 'przy', 'pod', 'nad', 'czy', 'też', 'także',
+    'który', 'która', 'które', 'których', 'którzy', 'tego', 'tej', 'ten', 'ta', 'to', 'tym', 'jego', 'jej',
+    'ich', 'był', 'była', 'było', 'były', 'będzie', 'są', 'już', 'jeszcze', 'tylko', 'może', 'ma', 'mają',
+    'the', 'and', 'for', 'that', 'with', 'was', 'were', 'are', 'has', 'have', 'had', 'from', 'this', 'said',
+    'his', 'her', 'its', 'will', 'would', 'not', 'but', 'they', 'been', 'who', 'which', 'their', 'about',
+])
+# Premia za pozycję: początkowe zdania wiadomości zwykle niosą jej sedno
+LEAD_WEIGHT = 0.5
+ELLIPSIS = '…'
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Dzieli tekst na zdania (pomijając kropki po skrótach i inicjałach imion).
+
+    Argumenty:
+        text: Tekst artykułu lub opisu
+
+    Zwraca:
+        Lista zdań bez zbędnych białych znaków
+    """
+    sentences: List[str] = []
+    for part in _SENTENCE_RE.split(' '.join(text.split())):
+        if sentences:
+            word = sentences[-1].rsplit(' ', 1)[-1][:-1]
+            if word.casefold() in ABBREVIATIONS or (len(word) == 1 and word.isupper()):
+                sentences[-1] += ' ' + part
+                continue
+        sentences.append(part)
+    return [sentence for sentence in sentences if sentence]
+
+
+def fit_bytes(text: str, max_bytes: int) -> str:
+    """Skraca tekst do max_bytes bajtów UTF-8 na granicy słowa (z wielokropkiem)."""
+    if len(text.encode('utf-8')) <= max_bytes:
+        return text
+    cut = text.encode('utf-8')[:max_bytes - len(ELLIPSIS.encode('utf-8'))].decode('utf-8', 'ignore')
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;:-') + ELLIPSIS
+
+
+def score_sentences(sentences: List[str], docs: np.ndarray, positions: np.ndarray, num_docs: int) -> np.ndarray:
+    """
+    Ocenia zdania podobieństwem kosinusowym TF-IDF do ich artykułu.
+
+    Macierz zdanie x termin jest trzymana jako lista niezerowych par; wagi
+    artykułów, normy i iloczyny skalarne są liczone przez np.unique i
+    np.bincount dla całej partii naraz.
+
+    Argumenty:
+        sentences: Zdania wszystkich artykułów partii
+        docs: Numer artykułu dla każdego zdania
+        positions: Pozycja zdania w artykule
+        num_docs: Liczba artykułów
+
+    Zwraca:
+        Ocena każdego zdania
+    """
+    # Słownik terminów przez np.unique na wszystkich tokenach partii (bez pętli po tokenach)
+    tokens: List[str] = []
+    counts: List[int] = []
+    for sentence in sentences:
+        sentence_tokens = _WORD_RE.findall(sentence.casefold())
+        tokens.extend(sentence_tokens)
+        counts.append(len(sentence_tokens))
+
+    num_sentences = len(sentences)
+    if not tokens:
+        return np.zeros(num_sentences)
+    vocabulary, cols_array = np.unique(np.array(tokens), return_inverse=True)
+    rows_array = np.repeat(np.arange(num_sentences, dtype=np.int64), counts)
+    keep = ~np.isin(vocabulary, list(STOPWORDS))[cols_array]
+    rows_array, cols_array = rows_array[keep], cols_array[keep].astype(np.int64)
+    if not len(rows_array):
+        return np.zeros(num_sentences)
+    size = len(vocabulary)
+
+    # Częstość terminu w zdaniu: unikalne pary (zdanie, termin)
+    pair_keys, pair_counts = np.unique(rows_array * size + cols_array, return_counts=True)
+    pair_sentence = pair_keys // size
+    pair_term = pair_keys % size
+
+    # Częstość dokumentowa: unikalne pary (artykuł, termin)
+    doc_keys, doc_inverse = np.unique(docs[pair_sentence] * size + pair_term, return_inverse=True)
+    df = np.bincount(doc_keys % size, minlength=size)
+    idf = np.log((1 + num_docs) / (1 + df)) + 1
+
+    weights = (1 + np.log(pair_counts)) * idf[pair_term]
+    doc_weights = np.bincount(doc_inverse, weights=weights)
+
+    dot = np.bincount(pair_sentence, weights=weights * doc_weights[doc_inverse], minlength=num_sentences)
+    sentence_norm = np.sqrt(np.bincount(pair_sentence, weights=weights * weights, minlength=num_sentences))
+    doc_norm = np.sqrt(np.bincount(doc_keys // size, weights=doc_weights * doc_weights, minlength=num_docs))
+    similarity = dot / np.maximum(sentence_norm * doc_norm[docs], 1e-12)
+    return similarity * (1 + LEAD_WEIGHT / (1 + positions))
+
+
+def summarize_texts(texts: Sequence[str], max_bytes: Optional[int] = None) -> List[str]:
+    """
+    Streszcza teksty do co najwyżej max_bytes bajtów UTF-8 każdy.
+
+    Teksty mieszczące się w limicie zostają bez zmian. Z pozostałych wybierane są
+    zdania o najwyższej ocenie, które razem mieszczą się w limicie, w kolejności
+    z oryginału; gdy nawet najlepsze zdanie się nie mieści, jest skracane na granicy słowa.
+
+    Argumenty:
+        texts: Teksty artykułów (lub opisy z kanałów)
+        max_bytes: Limit streszczenia (domyślnie Config.SUMMARY_MAX_BYTES)
+
+    Zwraca:
+        Streszczenia w kolejności tekstów
+    """
+    max_bytes = max_bytes or Config.SUMMARY_MAX_BYTES
+    summaries = [' '.join(text.split()) for text in texts]
+    long_texts = [index for index, text in enumerate(summaries) if len(text.encode('utf-8')) > max_bytes]
+    if not long_texts:
+        return summaries
+
+    sentences: List[str] = []
+    docs: List[int] = []
+    positions: List[int] = []
+    for doc, index in enumerate(long_texts):
+        for position, sentence in enumerate(split_sentences(summaries[index])):
+            sentences.append(sentence)
+            docs.append(doc)
+            positions.append(position)
+    docs_array = np.asarray(docs, dtype=np.int64)
+    scores = score_sentences(sentences, docs_array, np.asarray(positions), len(long_texts))
+    sizes = [len(sentence.encode('utf-8')) + 1 for sentence in sentences]
+
+    # Kolejność: artykuł rosnąco, w artykule ocena malejąco (przy remisie wcześniejsze zdanie)
+    order = np.lexsort((np.asarray(positions), -scores, docs_array))
+    chosen: List[List[int]] = [[] for _ in long_texts]
+    best: Dict[int, int] = {}
+    remaining = [max_bytes + 1] * len(long_texts)
+    for sentence in order.tolist():
+        doc = docs[sentence]
+        best.setdefault(doc, sentence)
+        if sizes[sentence] <= remaining[doc]:
+            chosen[doc].append(sentence)
+            remaining[doc] -= sizes[sentence]
+
+    for doc, index in enumerate(long_texts):
+        if chosen[doc]:
+            summaries[index] = ' '.join(sentences[sentence] for sentence in sorted(chosen[doc]))
+        else:
+            summaries[index] = fit_bytes(sentences[best[doc]] if doc in best else summaries[index], max_bytes)
+    return summaries
+
+
+def summarize_news(news_data: Dict, max_bytes: Optional[int] = None) -> int:
+    """
+    Zastępuje opisy wiadomości streszczeniami (w miejscu).
+
+    Źródłem jest pełna treść artykułu ('article_text', usuwana po streszczeniu,
+    aby nie trafiała do migawki i kolejki wysyłki), a bez niej opis z kanału.
+    Opisy sekcji z "strip_html": false mogą zawierać znaczniki - zdania są dzielone
+    i przycinane na czystym tekście (przycięcie w środku znacznika psułoby HTML),
+    więc streszczenie jest zawsze zwykłym tekstem.
+
+    Argumenty:
+        news_data: Dane wiadomości (sekcje jako listy)
+        max_bytes: Limit streszczenia (domyślnie Config.SUMMARY_MAX_BYTES)
+
+    Zwraca:
+        Liczba streszczonych wiadomości
+    """
+    items = [item for value in news_data.values() if isinstance(value, list) for item in value]
+    texts = [strip_html_tags(item.pop('article_text', None) or item.get('summary') or '') for item in items]
+    for item, summary in zip(items, summarize_texts(texts, max_bytes)):
+        if summary:
+            item['summary'] = summary
+    return len(items)
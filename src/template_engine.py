@@ -0,0 +1,82 @@
+"""
+Silnik szablonów HTML
+Szablon jest kompilowany raz (przy imporcie modułu, który go definiuje): źródło
+jest dzielone na krotkę statycznych fragmentów i nazw pól, więc renderowanie
+to jedno złączenie fragmentów i wartości, bez ponownego parsowania.
+"""
+
+from string import Formatter
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+
+# Wartość pola przy renderowaniu strumieniowym: tekst albo sekwencja/generator fragmentów
+Fragment = Union[str, Iterable[str]]
+
+
+class CompiledTemplate:
+    """
+    Skompilowany szablon z polami w składni {nazwa}.
+
+    Pola nie obsługują specyfikatorów formatu - wartości formatuje kod wywołujący,
+    a szablon zawiera wyłącznie statyczną treść.
+    """
+
+    __slots__ = ('parts', 'fields', 'pieces', 'slots')
+
+    def __init__(self, source: str, name: str = 'template'):
+        parts: List[Tuple[str, Optional[str]]] = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if field is not None and (spec or conversion or not field.isidentifier()):
+                raise ValueError(f"Nieprawidłowe pole szablonu '{field}' w {name}")
+            parts.append((literal, field))
+
+        self.parts: Tuple[Tuple[str, Optional[str]], ...] = tuple(parts)
+        self.fields = frozenset(field for _, field in parts if field is not None)
+
+        # Płaska krotka fragmentów (miejsca pól puste) i pozycje pól w niej -
+        # renderowanie tylko wstawia wartości w kopię i łączy całość raz
+        pieces: List[str] = []
+        slots: List[Tuple[int, str]] = []
+        for literal, field in parts:
+            if literal:
+                pieces.append(literal)
+            if field is not None:
+                slots.append((len(pieces), field))
+                pieces.append('')
+        self.pieces: Tuple[str, ...] = tuple(pieces)
+        self.slots: Tuple[Tuple[int, str], ...] = tuple(slots)
+
+    def render(self, **values: str) -> str:
+        """
+        Renderuje szablon do jednego ciągu.
+
+        Argumenty:
+            values: Wartości pól (tekst)
+
+        Zwraca:
+            Wyrenderowany tekst (KeyError, jeśli brakuje wartości pola)
+        """
+        pieces = list(self.pieces)
+        for position, field in self.slots:
+            pieces[position] = values[field]
+        return ''.join(pieces)
+
+    def iter_render(self, **values: Fragment) -> Iterator[str]:
+        """
+        Zwraca kolejne fragmenty wyrenderowanego szablonu.
+
+        Argumenty:
+            values: Wartości pól; tekst lub sekwencja/generator fragmentów
+
+        Zwraca:
+            Iterator fragmentów tekstu (KeyError, jeśli brakuje wartości pola)
+        """
+        for literal, field in self.parts:
+            if literal:
+                yield literal
+            if field is not None:
+                value = values[field]
+                if isinstance(value, str):
+                    yield value
+                else:
+                    yield from value
@@ -0,0 +1,15 @@
+"""
+Wspólna konfiguracja testów: moduły z src/ importowane jak w main.py
+(płaskie importy), a pamięć podręczna w katalogu tymczasowym.
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+# Przed importem config - Config czyta zmienne środowiskowe przy imporcie
+os.environ['CACHE_DIR'] = tempfile.mkdtemp(prefix='newsletter-tests-')
+os.environ['TZ'] = 'Europe/Warsaw'
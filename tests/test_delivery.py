@@ -0,0 +1,122 @@
+"""Testy klasyfikacji błędów wysyłki (tymczasowe i trwałe) i przerywania wysyłki bez połączenia."""
+
+import errno
+import smtplib
+import socket
+import ssl
+import threading
+
+import pytest
+
+from delivery import ConnectFailed, DeliveryScheduler, is_transient
+
+
+@pytest.mark.parametrize('error', [
+    smtplib.SMTPResponseException(421, b'Service not available'),
+    smtplib.SMTPSenderRefused(451, b'Try again later', 'a@b.pl'),
+    smtplib.SMTPDataError(452, b'Insufficient storage'),
+    smtplib.SMTPRecipientsRefused({'a@b.pl': (450, b'Mailbox busy'), 'c@d.pl': (451, b'Later')}),
+    smtplib.SMTPServerDisconnected('Connection unexpectedly closed'),
+    ConnectionResetError(),
+    BrokenPipeError(),
+    TimeoutError(),
+    socket.timeout(),
+    ConnectionRefusedError(errno.ECONNREFUSED, 'Connection refused'),
+    socket.gaierror(socket.EAI_AGAIN, 'Temporary failure in name resolution'),
+    socket.gaierror(socket.EAI_NONAME, 'Name or service not known'),
+    OSError(errno.ENETUNREACH, 'Network is unreachable'),
+    OSError(errno.EHOSTUNREACH, 'No route to host'),
+    ConnectFailed(ConnectionRefusedError(errno.ECONNREFUSED, 'Connection refused')),
+])
+def test_transient_errors(error):
+    assert is_transient(error)
+
+
+@pytest.mark.parametrize('error', [
+    smtplib.SMTPResponseException(554, b'Transaction failed'),
+    smtplib.SMTPAuthenticationError(535, b'Authentication failed'),
+    smtplib.SMTPRecipientsRefused({'a@b.pl': (450, b'Mailbox busy'), 'c@d.pl': (550, b'No such user')}),
+    ssl.SSLCertVerificationError('certificate verify failed'),
+    ConnectFailed(ssl.SSLCertVerificationError('certificate verify failed')),
+    OSError(errno.EACCES, 'Permission denied'),
+    ValueError('bad message'),
+])
+def test_permanent_errors(error):
+    assert not is_transient(error)
+
+
+class FailingSession:
+    """Sesja, która nie może połączyć się z serwerem (liczy próby połączenia)."""
+
+    attempts = 0
+    lock = threading.Lock()
+
+    def __init__(self, error):
+        self.error = error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def send(self, sender, recipient, message_factory):
+        with FailingSession.lock:
+            FailingSession.attempts += 1
+        raise ConnectFailed(self.error)
+
+
+def run_without_server(error, recipients):
+    FailingSession.attempts = 0
+    recorded = {}
+    scheduler = DeliveryScheduler(
+        lambda: FailingSession(error), workers=2, rate_per_minute=0, max_attempts=4, backoff=0
+    )
+    results = scheduler.run(
+        'nadawca@x.pl', [(recipient, lambda: [b'']) for recipient in recipients],
+        on_result=lambda recipient, message, transient: recorded.__setitem__(recipient, (message, transient))
+    )
+    return results, recorded
+
+
+def test_connect_failure_aborts_run_and_leaves_recipients_for_retry():
+    recipients = [f'odbiorca{index}@x.pl' for index in range(20)]
+
+    results, recorded = run_without_server(ConnectionRefusedError(errno.ECONNREFUSED, 'Connection refused'), recipients)
+
+    # Najwyżej jedna próba połączenia na wątek, bez ponowień w tym uruchomieniu
+    assert FailingSession.attempts <= 2
+    assert set(results) == set(recipients)
+    assert all(error for error in results.values())
+    # Wszyscy zostają w trwałej kolejce do następnego uruchomienia
+    assert all(transient for _, transient in recorded.values())
+    assert len(recorded) == len(recipients)
+
+
+def test_permanent_connect_failure_aborts_run_as_failed():
+    recipients = [f'odbiorca{index}@x.pl' for index in range(10)]
+
+    _, recorded = run_without_server(ssl.SSLCertVerificationError('certificate verify failed'), recipients)
+
+    assert FailingSession.attempts <= 2
+    assert len(recorded) == len(recipients)
+    assert not any(transient for _, transient in recorded.values())
+
+
+def refuse():
+    raise ConnectionRefusedError(errno.ECONNREFUSED, 'Connection refused')
+
+
+def reject_login():
+    raise smtplib.SMTPAuthenticationError(535, b'Authentication failed')
+
+
+def test_session_reports_connection_setup_errors_as_connect_failed():
+    from email_sender import SmtpSession
+
+    with pytest.raises(ConnectFailed) as failure:
+        SmtpSession(connect=refuse).send('nadawca@x.pl', 'odbiorca@x.pl', lambda: [b''])
+    assert isinstance(failure.value.error, ConnectionRefusedError)
+
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        SmtpSession(connect=reject_login).send('nadawca@x.pl', 'odbiorca@x.pl', lambda: [b''])
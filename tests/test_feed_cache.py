@@ -0,0 +1,86 @@
+"""Testy pamięci podręcznej kanałów: odpowiedź 304 obsługiwana w całości z dysku."""
+
+import threading
+from contextlib import closing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+
+import pytest
+
+from config import Config
+from scrapers import feed_cache
+from scrapers.feed_cache import fetch_feed_entries, iter_feed_entries
+
+ETAG = '"v1"'
+
+
+def rss(count):
+    items = ''.join(
+        f'<item><title>Wiadomość {index}</title><link>https://example.com/{index}</link></item>'
+        for index in range(count)
+    )
+    return f'<?xml version="1.0"?><rss><channel>{items}</channel></rss>'.encode('utf-8')
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = rss(self.server.items)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def feed_server(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(feed_cache, '_memory', {})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+    server.requests = []
+    server.items = 10
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f'http://127.0.0.1:{server.server_address[1]}/rss'
+    server.shutdown()
+    server.server_close()
+
+
+def test_not_modified_feed_is_served_from_cache_without_refetch(feed_server):
+    server, url = feed_server
+
+    assert len(fetch_feed_entries(url, 2)) == 2
+
+    # Konsument przegląda wszystkie wpisy (np. indeks wysłanych pominął pierwsze)
+    entries = list(iter_feed_entries(url))
+
+    assert [entry['link'] for entry in entries] == [f'https://example.com/{index}' for index in range(10)]
+    assert server.requests == [None, ETAG]
+
+
+def test_cache_keeps_up_to_feed_max_scan_entries(feed_server, monkeypatch):
+    server, url = feed_server
+    server.items = 20
+    monkeypatch.setattr(Config, 'FEED_MAX_SCAN', 5)
+
+    with closing(iter_feed_entries(url)) as entries:
+        assert len(list(islice(entries, 2))) == 2
+
+    with closing(iter_feed_entries(url)) as entries:
+        assert len(list(islice(entries, 5))) == 5
+    assert server.requests == [None, ETAG]
+
+    # Więcej niż zapisano z niepełnego kanału - dociągnięcie bez nagłówków warunkowych
+    assert len(list(iter_feed_entries(url))) == 20
+    assert server.requests == [None, ETAG, ETAG, None]
@@ -0,0 +1,36 @@
+"""Testy szablonu HTML: pola z kanałów i danych rynkowych wstawiane z kodowaniem HTML."""
+
+from html_template import create_instrument_card, create_news_section
+
+
+def test_news_fields_are_escaped_and_links_restricted():
+    html = create_news_section('ŚWIAT', [{
+        'title': '<script>alert(1)</script>',
+        'summary': 'Zysk > 5% & więcej',
+        'link': 'javascript:alert(1)',
+        'source': 'BBC',
+        'published': 'dziś',
+    }], 'world')
+
+    assert '<script>' not in html
+    assert '&lt;script&gt;' in html and 'Zysk &gt; 5% &amp; więcej' in html
+    assert 'javascript:' not in html
+
+
+def test_instrument_card_escapes_names_and_error_text():
+    html = create_instrument_card(
+        {'name': 'Ropa <Brent>', 'error': "HTTPError: 404 for url <https://stooq.pl/?s=x&i=d>"}
+    )
+
+    assert '<Brent>' not in html and 'Ropa &lt;Brent&gt;' in html
+    assert '&lt;https://stooq.pl/?s=x&amp;i=d&gt;' in html
+
+
+def test_instrument_card_escapes_label_and_unit():
+    html = create_instrument_card(
+        {'name': 'Złoto', 'price': 9000.5, 'currency': 'PLN', 'unit': 'uncja <troy>', 'daily_change': 1.0},
+        label='ZŁOTO & CO'
+    )
+
+    assert '[ZŁOTO &amp; CO] Złoto' in html
+    assert ' / uncja &lt;troy&gt;' in html
@@ -0,0 +1,61 @@
+"""Testy strumieniowej wysyłki wiadomości: łączenie małych bloków i duże bloki bez kopiowania."""
+
+from mime_stream import SEND_BYTES, send_streamed_message
+
+
+class RecordingServer:
+    """Zamiast gniazda zapamiętuje kolejne zapisy (jak smtplib.SMTP.send)."""
+
+    def __init__(self):
+        self.writes = []
+
+    def ehlo_or_helo_if_needed(self):
+        pass
+
+    def mail(self, sender):
+        return 250, b'OK'
+
+    def rcpt(self, recipient):
+        return 250, b'OK'
+
+    def putcmd(self, command):
+        pass
+
+    def getreply(self):
+        return (354, b'Go ahead') if not self.writes else (250, b'Queued')
+
+    def send(self, data):
+        # Bufor jest czyszczony po zapisie - kopia jak przy sendall(); widok zostaje widokiem
+        self.writes.append(data if isinstance(data, memoryview) else bytes(data))
+
+    def rset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_small_chunks_are_coalesced_with_final_dot():
+    server = RecordingServer()
+    chunks = [b'Subject: test\r\n', b'\r\n', b'QUJD\r\n'] * 10
+
+    send_streamed_message(server, 'a@x.pl', ['b@x.pl'], chunks)
+
+    assert len(server.writes) == 1
+    assert bytes(server.writes[0]) == b''.join(chunks) + b'.\r\n'
+
+
+def test_large_chunk_is_sent_without_copy():
+    server = RecordingServer()
+    headers = b'Subject: test\r\n\r\n'
+    body = b'QUJD' * (SEND_BYTES // 2 + 123)
+    closing = b'--granica--\r\n'
+
+    send_streamed_message(server, 'a@x.pl', ['b@x.pl'], [headers, body, closing])
+
+    assert b''.join(bytes(write) for write in server.writes) == headers + body + closing + b'.\r\n'
+    views = [write for write in server.writes if isinstance(write, memoryview)]
+    assert len(views) == 1 and views[0].obj is body
+    assert len(views[0]) == len(body) - len(body) % SEND_BYTES
+    # Reszta treści trafia do ostatniego zapisu razem z kropką kończącą DATA
+    assert len(server.writes[-1]) < SEND_BYTES + len(closing) + 3
@@ -0,0 +1,66 @@
+"""Testy trwałej kolejki wysyłki: wznowienie przerwanego wydania."""
+
+from outbox import FAILED, PENDING, SENT, Outbox
+
+RECIPIENTS = ['a@x.pl', 'b@x.pl', 'c@x.pl']
+
+
+def queue_run(path):
+    with Outbox(path) as outbox:
+        return outbox.create_run('Newsletter', [
+            (b'PGh0bWw+', {'world_news': [{'title': 'A', 'link': 'https://a.pl/1'}]}, RECIPIENTS[:2]),
+            (b'PGh0bWw+Mg==', {'world_news': []}, RECIPIENTS[2:]),
+        ])
+
+
+def test_resume_skips_recipients_delivered_before_interruption(tmp_path):
+    path = str(tmp_path / 'outbox.db')
+    run_id = queue_run(path)
+
+    # Pierwsze uruchomienie: jeden odbiorca wysłany, potem awaria procesu
+    first = Outbox(path)
+    first.record(run_id, 'a@x.pl', None)
+    first.close()
+
+    with Outbox(path) as outbox:
+        run = outbox.unfinished_run()
+        assert run['id'] == run_id and run['subject'] == 'Newsletter'
+
+        pending = list(outbox.pending(run_id))
+        assert pending == [(b'PGh0bWw+', ['b@x.pl']), (b'PGh0bWw+Mg==', ['c@x.pl'])]
+
+        for _, recipients in pending:
+            for recipient in recipients:
+                outbox.record(run_id, recipient, None)
+
+        assert outbox.finish_if_done(run_id)
+        assert outbox.unfinished_run() is None
+        assert outbox.delivered(run_id) == RECIPIENTS
+        assert outbox.counts(run_id) == {PENDING: 0, SENT: 3, FAILED: 0}
+
+
+def test_transient_error_stays_pending_until_next_run(tmp_path):
+    path = str(tmp_path / 'outbox.db')
+    run_id = queue_run(path)
+
+    with Outbox(path) as outbox:
+        outbox.record(run_id, 'a@x.pl', None)
+        outbox.record(run_id, 'b@x.pl', '451 Try again later', transient=True)
+        outbox.record(run_id, 'c@x.pl', '550 No such user')
+        assert not outbox.finish_if_done(run_id)
+
+    with Outbox(path) as outbox:
+        assert outbox.unfinished_run()['id'] == run_id
+        assert list(outbox.pending(run_id)) == [(b'PGh0bWw+', ['b@x.pl'])]
+        assert outbox.delivered_editions(run_id) == [
+            {'world_news': [{'title': 'A', 'link': 'https://a.pl/1'}]}
+        ]
+
+
+def test_expire_abandons_stale_unfinished_run(tmp_path):
+    path = str(tmp_path / 'outbox.db')
+    run_id = queue_run(path)
+
+    with Outbox(path) as outbox:
+        assert outbox.expire(max_age_hours=0) == 1
+        assert outbox.unfinished_run() is None
@@ -0,0 +1,49 @@
+"""Testy magazynu notowań: zapis obu kolumn w jednym pliku i odczyt uszkodzonych danych."""
+
+import os
+from array import array
+
+import pytest
+
+from config import Config
+from scrapers.price_store import get_legacy_paths, get_series_path, load_series, save_series
+
+DATES = array('i', [20261013, 20261014, 20261015])
+CLOSES = array('d', [9120.5, 9134.25, 9101.0])
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'CACHE_DIR', str(tmp_path))
+
+
+def test_save_and_load_round_trip():
+    save_series('XAUPLN', DATES, CLOSES)
+
+    assert load_series('xaupln') == (DATES, CLOSES)
+
+
+def test_truncated_file_is_discarded():
+    save_series('xaupln', DATES, CLOSES)
+    path = get_series_path('xaupln')
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:-4])
+
+    assert load_series('xaupln') == (array('i'), array('d'))
+
+
+def test_legacy_column_files_are_migrated():
+    dates_path, close_path = get_legacy_paths('xaupln')
+    os.makedirs(os.path.dirname(dates_path))
+    with open(dates_path, 'wb') as f:
+        DATES.tofile(f)
+    with open(close_path, 'wb') as f:
+        CLOSES.tofile(f)
+
+    assert load_series('xaupln') == (DATES, CLOSES)
+
+    save_series('xaupln', DATES, CLOSES)
+    assert not os.path.exists(dates_path) and not os.path.exists(close_path)
+    assert load_series('xaupln') == (DATES, CLOSES)
@@ -0,0 +1,73 @@
+"""Testy harmonogramu cron: kolejne terminy w czasie lokalnym, także przy zmianie czasu."""
+
+from datetime import datetime
+
+import pytest
+import pytz
+
+from scheduler import CronSchedule, Schedule
+
+WARSAW = pytz.timezone('Europe/Warsaw')
+
+
+def local(*args):
+    return WARSAW.localize(datetime(*args))
+
+
+def test_daily_run_keeps_local_time_across_spring_forward():
+    cron = CronSchedule('30 11 * * *', 'Europe/Warsaw')
+
+    before, after = cron.next_after(local(2026, 3, 28, 12, 0)), cron.next_after(local(2026, 3, 29, 12, 0))
+
+    assert before.isoformat() == '2026-03-29T11:30:00+02:00'
+    assert after.isoformat() == '2026-03-30T11:30:00+02:00'
+    assert cron.next_after(local(2026, 3, 27, 12, 0)).isoformat() == '2026-03-28T11:30:00+01:00'
+
+
+def test_time_in_spring_gap_moves_forward_one_hour():
+    cron = CronSchedule('30 2 * * *', 'Europe/Warsaw')
+
+    gap = cron.next_after(local(2026, 3, 28, 12, 0))
+
+    assert gap.isoformat() == '2026-03-29T03:30:00+02:00'
+    assert cron.next_after(gap).isoformat() == '2026-03-30T02:30:00+02:00'
+
+
+def test_repeated_hour_in_autumn_fires_once():
+    cron = CronSchedule('30 2 * * *', 'Europe/Warsaw')
+
+    first = cron.next_after(local(2026, 10, 24, 12, 0))
+
+    # Niejednoznaczna 02:30 - termin raz, po powrocie do czasu zimowego
+    assert first.isoformat() == '2026-10-25T02:30:00+01:00'
+    assert cron.next_after(first).isoformat() == '2026-10-26T02:30:00+01:00'
+
+
+def test_daily_run_keeps_local_time_across_fall_back():
+    cron = CronSchedule('30 11 * * *', 'Europe/Warsaw')
+
+    assert cron.next_after(local(2026, 10, 24, 12, 0)).isoformat() == '2026-10-25T11:30:00+01:00'
+
+
+def test_next_after_accepts_other_timezones():
+    cron = CronSchedule('0 7 * * 1-5', 'Europe/Warsaw')
+
+    # Piątek 23:30 UTC = sobota 00:30 w Warszawie - następny termin w poniedziałek
+    moment = pytz.utc.localize(datetime(2026, 10, 16, 23, 30))
+
+    assert cron.next_after(moment).isoformat() == '2026-10-19T07:00:00+02:00'
+
+
+def test_schedule_takes_earliest_expression():
+    schedule = Schedule(['30 11 * * *', '0 7 * * *'], 'Europe/Warsaw')
+
+    times = schedule.upcoming(local(2026, 10, 17, 8, 0), 3)
+
+    assert [moment.strftime('%d %H:%M') for moment in times] == ['17 11:30', '18 07:00', '18 11:30']
+    assert schedule.latest_time() == '11:30'
+
+
+@pytest.mark.parametrize('expression', ['61 * * * *', '0 0 31 2 *', '* * *'])
+def test_invalid_expression(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression, 'Europe/Warsaw').next_after(local(2026, 1, 1, 0, 0))
@@ -0,0 +1,67 @@
+"""Testy indeksu wysłanych artykułów: retencja i wpisy oczekujące."""
+
+import json
+import time
+
+from seen_index import SeenIndex, start_of_day
+
+ARTICLE = {'title': 'Inflacja w Polsce spada', 'link': 'https://www.example.com/news/1?utm_source=rss'}
+
+
+def write_index(path, entries, pending=None):
+    path.write_text(json.dumps({'version': 1, 'entries': entries, 'pending': pending or {}}))
+
+
+def test_add_and_contains_by_url_or_title(tmp_path):
+    index = SeenIndex(str(tmp_path / 'seen.json'), retention_days=7)
+    index.add([ARTICLE])
+
+    assert index.contains({'link': 'http://example.com/news/1/'})
+    assert index.contains({'title': 'INFLACJA w Polsce  spada!'})
+    assert not index.contains({'title': 'Inna wiadomość', 'link': 'https://example.com/news/2'})
+
+
+def test_load_drops_entries_older_than_retention(tmp_path):
+    path = tmp_path / 'seen.json'
+    keys = SeenIndex.keys_for(ARTICLE)
+    now = int(time.time())
+    write_index(path, {keys[0]: now - 8 * 86400, keys[1]: now - 86400})
+
+    index = SeenIndex(str(path), retention_days=7)
+
+    assert len(index) == 1
+    assert index.contains({'title': ARTICLE['title']})
+    assert not index.contains({'link': ARTICLE['link']})
+
+
+def test_save_prunes_expired_entries(tmp_path):
+    path = tmp_path / 'seen.json'
+    index = SeenIndex(str(path), retention_days=1)
+    index.add([ARTICLE], timestamp=time.time() - 2 * 86400)
+    index.add([{'title': 'Świeża wiadomość'}])
+
+    index.save()
+
+    stored = json.loads(path.read_text())['entries']
+    assert list(stored) == SeenIndex.keys_for({'title': 'Świeża wiadomość'})
+
+
+def test_pending_entries_are_skipped_only_after_commit(tmp_path):
+    path = tmp_path / 'seen.json'
+    index = SeenIndex(str(path), retention_days=7)
+    index.add([ARTICLE], pending=True)
+    index.save()
+
+    assert not index.contains(ARTICLE)
+    assert not SeenIndex(str(path), retention_days=7).contains(ARTICLE)
+
+    assert index.commit_pending() == 2
+    assert index.contains(ARTICLE)
+
+
+def test_pending_entries_from_previous_day_are_committed_on_load(tmp_path):
+    path = tmp_path / 'seen.json'
+    yesterday = int(start_of_day()) - 3600
+    write_index(path, {}, pending={key: yesterday for key in SeenIndex.keys_for(ARTICLE)})
+
+    assert SeenIndex(str(path), retention_days=7).contains(ARTICLE)
@@ -0,0 +1,68 @@
+"""Testy scalania bliskich duplikatów: parametry LSH z progu i scalanie w sekcjach."""
+
+import pytest
+
+from story_clustering import (
+    MIN_CANDIDATE_PROBABILITY, NUM_PERMUTATIONS, candidate_probability, cluster_news,
+    find_duplicate_groups, jaccard, lsh_parameters, tokenize
+)
+
+
+def story(title, link, source='Src'):
+    return {'title': title, 'link': link, 'source': source, 'summary': ''}
+
+
+# Jaccard = 4/8 = 0.5 (wspólne: rada, ministrów, przyjęła, budżet)
+BASE = story('Rada ministrów przyjęła budżet państwa wczoraj', 'https://a.pl/1', 'A')
+HALF = story('Rada ministrów przyjęła budżet miasta dzisiaj', 'https://b.pl/1', 'B')
+# Jaccard = 2/10 = 0.2
+FAR = story('Rada ministrów omówiła pogodę nad morzem latem', 'https://c.pl/1', 'C')
+
+
+@pytest.mark.parametrize('threshold, expected', [(0.5, (16, 2)), (0.8, (8, 4)), (0.3, (32, 1))])
+def test_lsh_parameters_follow_threshold(threshold, expected):
+    assert lsh_parameters(threshold) == expected
+
+
+@pytest.mark.parametrize('threshold', [0.3, 0.5, 0.6, 0.7, 0.8, 0.9])
+def test_pair_at_threshold_is_likely_candidate(threshold):
+    bands, rows = lsh_parameters(threshold)
+    assert bands * rows == NUM_PERMUTATIONS
+    assert candidate_probability(threshold, bands, rows) >= MIN_CANDIDATE_PROBABILITY
+
+
+def test_pair_at_threshold_is_merged_and_pair_below_is_not():
+    assert jaccard(tokenize(BASE), tokenize(HALF)) == 0.5
+    assert jaccard(tokenize(BASE), tokenize(FAR)) < 0.5
+
+    assert find_duplicate_groups([BASE, HALF, FAR], threshold=0.5) == [[0, 1]]
+    assert find_duplicate_groups([BASE, HALF, FAR], threshold=0.6) == []
+
+
+def test_duplicates_across_sections_keep_one_story_per_section():
+    news_data = {
+        'world_news': [BASE],
+        'polish_news': [FAR, HALF],
+        'financial_data': {'gold': {}},
+    }
+
+    result = cluster_news(news_data, threshold=0.5)
+
+    assert [item['link'] for item in result['world_news']] == ['https://a.pl/1']
+    assert [item['link'] for item in result['polish_news']] == ['https://c.pl/1', 'https://b.pl/1']
+    assert result['world_news'][0]['alternative_sources'] == [
+        {'source': 'B', 'link': 'https://b.pl/1', 'title': HALF['title']}
+    ]
+    assert result['polish_news'][1]['alternative_sources'][0]['link'] == 'https://a.pl/1'
+    assert 'alternative_sources' not in result['polish_news'][0]
+    assert result['financial_data'] == {'gold': {}}
+
+
+def test_duplicates_within_section_keep_earliest():
+    copy = story(BASE['title'], 'https://d.pl/1', 'D')
+
+    result = cluster_news({'world_news': [BASE, copy]}, threshold=0.5)
+
+    assert len(result['world_news']) == 1
+    assert result['world_news'][0]['link'] == 'https://a.pl/1'
+    assert result['world_news'][0]['alternative_sources'][0]['source'] == 'D'